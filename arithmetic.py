@@ -0,0 +1,77 @@
+import math
+
+from factorization import factorize
+from primality import primes_up_to
+
+# Numbers per segment of the range sieve; five Python lists of this length
+# are live at a time.
+SEGMENT_SIZE = 1 << 16
+
+
+def from_factors(factors):
+    # tau (divisor count), sigma (divisor sum), phi (Euler's totient) and mu
+    # (Moebius) of the number whose factorization is {p: e}.
+    tau = sigma = phi = 1
+    mu = 1
+    for p, e in factors.items():
+        tau *= e + 1
+        sigma *= (p ** (e + 1) - 1) // (p - 1)
+        phi *= p ** (e - 1) * (p - 1)
+        mu = 0 if e > 1 else -mu
+    return {"tau": tau, "sigma": sigma, "phi": phi, "mu": mu}
+
+
+def analyze(n, progress=None):
+    # Factorization of n together with its divisor functions.
+    if n < 1:
+        raise ValueError("n must be positive")
+    factors = factorize(n, progress)
+    return {"number": n, "factors": factors, **from_factors(factors)}
+
+
+def iter_arithmetic(low, high, segment_size=SEGMENT_SIZE, progress=None):
+    # Yields one list of (n, tau, sigma, phi, mu) tuples per segment for every
+    # n in [low, high], in order. Each segment starts with n itself as the
+    # unfactored remainder; every base prime p divides its multiples out once,
+    # so the whole range costs about sum(1/p) steps per number instead of a
+    # factorization each. Whatever remains above 1 afterwards is a single
+    # prime larger than sqrt(high).
+    low = max(low, 1)
+    if low > high:
+        return
+    base_primes = primes_up_to(math.isqrt(high))
+    start = low
+    while start <= high:
+        end = min(start + segment_size - 1, high)
+        size = end - start + 1
+        rest = list(range(start, end + 1))
+        tau = [1] * size
+        sigma = [1] * size
+        phi = [1] * size
+        mu = [1] * size
+        for p in base_primes:
+            if p * p > end:
+                break
+            for i in range(-start % p, size, p):
+                r = rest[i] // p
+                pe = p
+                e = 1
+                while r % p == 0:
+                    r //= p
+                    pe *= p
+                    e += 1
+                rest[i] = r
+                tau[i] *= e + 1
+                sigma[i] *= (pe * p - 1) // (p - 1)
+                phi[i] *= pe // p * (p - 1)
+                mu[i] = 0 if e > 1 else -mu[i]
+        for i, r in enumerate(rest):
+            if r > 1:
+                tau[i] *= 2
+                sigma[i] *= r + 1
+                phi[i] *= r - 1
+                mu[i] = -mu[i]
+        if progress is not None:
+            progress.update((end - low + 1) / (high - low + 1))
+        yield list(zip(range(start, end + 1), tau, sigma, phi, mu))
+        start = end + 1
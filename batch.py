@@ -0,0 +1,82 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from parallel_sieve import wait_result
+from vectorized import is_prime_mask
+
+CHUNK_SIZE = 8192
+TOKEN_SEPARATORS = re.compile(r"[\s,;]+")
+
+
+def parse_numbers(text):
+    # Accepts newline-, comma- or semicolon-separated lists; returns the valid
+    # positive integers and the number of tokens that were skipped.
+    numbers = []
+    invalid = 0
+    for token in TOKEN_SEPARATORS.split(text):
+        if not token:
+            continue
+        if token.isdecimal() and int(token) > 0:
+            numbers.append(int(token))
+        else:
+            invalid += 1
+    return numbers, invalid
+
+
+def chunked(numbers, size):
+    numbers = iter(numbers)
+    while True:
+        chunk = list(islice(numbers, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def check_chunk(numbers):
+    # Uses the NumPy mask when available; it falls back to per-number checks.
+    return [(n, bool(prime)) for n, prime in zip(numbers, is_prime_mask(numbers))]
+
+
+def _report(progress, done, total):
+    if progress is None:
+        return
+    if total:
+        progress.update(done / total)
+    else:
+        progress.check()
+
+
+def iter_batch_results(numbers, workers=None, chunk_size=CHUNK_SIZE, progress=None, executor=None, total=None):
+    # Yields one list of (number, is_prime) pairs per chunk, in input order.
+    # numbers may be any iterable; it is consumed lazily. Progress is the
+    # share of total (default: len(numbers) when it has one) checked so far;
+    # without a total it is only polled for cancellation.
+    # At most a few chunks per process are in flight, so memory stays bounded
+    # however long the input is. Closing the generator or cancelling the
+    # progress tracker drops every chunk that has not started yet. Chunks go
+    # to executor (a scheduler's JobExecutor) when given, else to a new pool.
+    if executor is not None:
+        workers = executor.workers
+    workers = workers or os.cpu_count() or 1
+    if total is None and hasattr(numbers, "__len__"):
+        total = len(numbers)
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    done = 0
+    try:
+        pending = []
+        for chunk in chunked(numbers, chunk_size):
+            pending.append(pool.submit(check_chunk, chunk))
+            if len(pending) >= workers * 4:
+                results = wait_result(pending.pop(0), progress)
+                done += len(results)
+                _report(progress, done, total)
+                yield results
+        for future in pending:
+            results = wait_result(future, progress)
+            done += len(results)
+            _report(progress, done, total)
+            yield results
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,154 @@
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+
+CACHE_FILE = "prime_cache.db"
+MEMORY_ENTRIES = 10000
+DISK_ENTRIES = 1000000
+SQL_BATCH = 500
+
+
+class ResultCache:
+    # Two-tier verdict cache keyed by number: an in-memory LRU in front of a
+    # SQLite table that survives restarts. Entries store (is_prime, divisors);
+    # divisors is None when only the verdict is known (batch results).
+
+    def __init__(self, path=CACHE_FILE, memory_entries=MEMORY_ENTRIES, disk_entries=DISK_ENTRIES):
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.writes_since_trim = 0
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "number TEXT PRIMARY KEY, is_prime INTEGER NOT NULL, "
+            "divisors TEXT, accessed REAL NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results(accessed)")
+        self.db.commit()
+
+    def get(self, number, need_divisors=False):
+        entry = self.memory.get(number)
+        if entry is not None:
+            self.memory.move_to_end(number)
+        if entry is None or (need_divisors and entry[1] is None):
+            entry = self._load(number) or entry
+
+        if entry is None or (need_divisors and entry[1] is None):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def get_many(self, numbers):
+        # Verdict-only lookup for batches; returns {number: is_prime} for hits.
+        found = {}
+        missing = []
+        for n in numbers:
+            entry = self.memory.get(n)
+            if entry is not None:
+                self.memory.move_to_end(n)
+                found[n] = entry[0]
+            else:
+                missing.append(n)
+
+        keys = list(dict.fromkeys(str(n) for n in missing))
+        now = time.time()
+        for i in range(0, len(keys), SQL_BATCH):
+            part = keys[i:i + SQL_BATCH]
+            marks = ",".join("?" * len(part))
+            rows = self.db.execute(
+                f"SELECT number, is_prime, divisors FROM results WHERE number IN ({marks})", part
+            ).fetchall()
+            for number, is_prime, divisors in rows:
+                entry = self._decode((is_prime, divisors))
+                self._remember(int(number), entry)
+                found[int(number)] = entry[0]
+            self.db.execute(
+                f"UPDATE results SET accessed = ? WHERE number IN ({marks})", [now] + part
+            )
+        self.db.commit()
+
+        hits = sum(1 for n in numbers if n in found)
+        self.hits += hits
+        self.misses += len(numbers) - hits
+        return found
+
+    def put(self, number, is_prime, divisors=None):
+        self.put_many([(number, is_prime, divisors)])
+
+    def put_many(self, entries):
+        now = time.time()
+        rows = []
+        for number, is_prime, divisors in entries:
+            if is_prime:
+                divisors = []
+            current = self.memory.get(number)
+            if divisors is None and current is not None and current[1] is not None:
+                # Never downgrade a full entry to a verdict-only one.
+                continue
+            self._remember(number, (is_prime, divisors))
+            rows.append((
+                str(number), int(is_prime),
+                None if divisors is None else json.dumps(divisors), now,
+            ))
+        verdict_rows = [r for r in rows if r[2] is None]
+        full_rows = [r for r in rows if r[2] is not None]
+        self.db.executemany(
+            "INSERT OR IGNORE INTO results (number, is_prime, divisors, accessed) VALUES (?, ?, ?, ?)",
+            verdict_rows,
+        )
+        self.db.executemany(
+            "INSERT OR REPLACE INTO results (number, is_prime, divisors, accessed) VALUES (?, ?, ?, ?)",
+            full_rows,
+        )
+        self.db.commit()
+        self.writes_since_trim += len(rows)
+        if self.writes_since_trim >= max(1, self.disk_entries // 100):
+            self.trim()
+
+    def trim(self):
+        self.writes_since_trim = 0
+        (count,) = self.db.execute("SELECT COUNT(*) FROM results").fetchone()
+        excess = count - self.disk_entries
+        if excess > 0:
+            self.db.execute(
+                "DELETE FROM results WHERE number IN "
+                "(SELECT number FROM results ORDER BY accessed LIMIT ?)", (excess,)
+            )
+            self.db.commit()
+
+    def clear(self):
+        self.memory.clear()
+        self.db.execute("DELETE FROM results")
+        self.db.commit()
+        self.hits = self.misses = 0
+
+    def close(self):
+        self.db.close()
+
+    def _load(self, number):
+        row = self.db.execute(
+            "SELECT is_prime, divisors FROM results WHERE number = ?", (str(number),)
+        ).fetchone()
+        if row is None:
+            return None
+        entry = self._decode(row)
+        self.db.execute("UPDATE results SET accessed = ? WHERE number = ?", (time.time(), str(number)))
+        self.db.commit()
+        self._remember(number, entry)
+        return entry
+
+    def _remember(self, number, entry):
+        self.memory[number] = entry
+        self.memory.move_to_end(number)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    @staticmethod
+    def _decode(row):
+        is_prime, divisors = row
+        return bool(is_prime), None if divisors is None else json.loads(divisors)
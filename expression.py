@@ -0,0 +1,170 @@
+import math
+import re
+
+# Inputs such as 2^127-1, 3*2^5000+1, 2**(2**12)+1, 1000!-1, M127 (the
+# Mersenne number 2^127-1) or F12 (the Fermat number 2^4096+1) are read by a
+# small recursive-descent parser; nothing is handed to eval(). Sizes are
+# checked before anything is computed, so an input cannot exhaust memory.
+# Converting to and from decimal (display, cache, history) is quadratic, so
+# the bound also keeps that well under a second: 2^18 bits are 78,914 digits.
+MAX_RESULT_BITS = 1 << 18
+# 20000! has 256,909 bits.
+MAX_FACTORIAL = 20000
+# Nesting of parentheses, signs, exponents and M/F prefixes; the parser
+# recurses once per level.
+MAX_DEPTH = 100
+
+_TOKEN = re.compile(r"\s*(?:(\d+)|(\*\*|[-+*×·^!()])|([MF])_?(?=[\d(]))")
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+def _tokens(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if match is None:
+            raise ExpressionError(f"unexpected {text[pos:].strip()[:10]!r}")
+        number, op, name = match.groups()
+        if number is not None:
+            tokens.append(("num", int(number)))
+        elif name is not None:
+            tokens.append(("name", name))
+        else:
+            tokens.append(("op", "^" if op == "**" else "*" if op in "×·" else op))
+        pos = match.end()
+    return tokens
+
+
+def _bits(n):
+    return abs(n).bit_length()
+
+
+def _check(bits):
+    if bits > MAX_RESULT_BITS:
+        raise ExpressionError(f"the result would exceed {MAX_RESULT_BITS} bits")
+
+
+def _power(base, exp):
+    if exp < 0:
+        raise ExpressionError("negative exponents are not supported")
+    if abs(base) > 1:
+        # The bit length of base^exp, up to float rounding.
+        _check(int(exp * math.log2(abs(base))) + 1)
+    return base ** exp
+
+
+def _factorial(n):
+    if n < 0:
+        raise ExpressionError("factorial of a negative number")
+    if n > MAX_FACTORIAL:
+        raise ExpressionError(f"factorials are limited to {MAX_FACTORIAL}!")
+    return math.factorial(n)
+
+
+class _Parser:
+    # expr := term (("+" | "-") term)*
+    # term := unary ("*" unary)*
+    # unary := ("-" | "+") unary | power
+    # power := postfix ("^" unary)?          (right-associative)
+    # postfix := atom "!"*
+    # atom := number | "(" expr ")" | ("M" | "F") atom
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        self.depth = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, op):
+        if self.peek() == ("op", op):
+            self.pos += 1
+            return True
+        return False
+
+    def expr(self):
+        value = self.term()
+        while True:
+            if self.take("+"):
+                value += self.term()
+            elif self.take("-"):
+                value -= self.term()
+            else:
+                return value
+
+    def term(self):
+        value = self.unary()
+        while self.take("*"):
+            other = self.unary()
+            _check(_bits(value) + _bits(other))
+            value *= other
+        return value
+
+    def nested(self, parse):
+        # Every recursive step goes through here, so deep input fails with
+        # an ExpressionError instead of exhausting the stack.
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise ExpressionError(f"the expression is nested more than {MAX_DEPTH} levels deep")
+        try:
+            return parse()
+        finally:
+            self.depth -= 1
+
+    def unary(self):
+        if self.take("-"):
+            return -self.nested(self.unary)
+        if self.take("+"):
+            return self.nested(self.unary)
+        return self.power()
+
+    def power(self):
+        base = self.postfix()
+        if self.take("^"):
+            return _power(base, self.nested(self.unary))
+        return base
+
+    def postfix(self):
+        value = self.atom()
+        while self.take("!"):
+            value = _factorial(value)
+        return value
+
+    def atom(self):
+        kind, value = self.peek()
+        self.pos += 1
+        if kind == "num":
+            return value
+        if kind == "name":
+            n = self.nested(self.atom)
+            if value == "M":
+                return _power(2, n) - 1
+            return _power(2, _power(2, n)) + 1
+        if (kind, value) == ("op", "("):
+            inner = self.nested(self.expr)
+            if not self.take(")"):
+                raise ExpressionError("missing ')'")
+            return inner
+        raise ExpressionError("incomplete expression" if kind is None else f"unexpected {value!r}")
+
+
+def parse_number(text):
+    # The integer that text denotes: plain digits, or an expression with
+    # + - * ^ (or **), ! and parentheses. Raises ExpressionError.
+    text = text.strip()
+    if text.isdecimal():
+        return int(text)
+    tokens = _tokens(text)
+    if not tokens:
+        raise ExpressionError("empty input")
+    parser = _Parser(tokens)
+    value = parser.expr()
+    if parser.pos != len(tokens):
+        raise ExpressionError(f"unexpected {parser.peek()[1]!r}")
+    return value
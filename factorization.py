@@ -0,0 +1,324 @@
+import bisect
+import math
+import random
+
+import siqs
+from primality import SMALL_PRIMES, gmpy2, is_prime, primes_up_to
+
+# (largest cofactor digits, B1) -- stage 1 bounds follow the usual ECM tables for
+# the factor size that is worth looking for at each cofactor size.
+ECM_SCHEDULE = (
+    (30, 2000),
+    (40, 11000),
+    (50, 50000),
+    (60, 250000),
+    (None, 1000000),
+)
+ECM_STAGE2_FACTOR = 50
+ECM_WHEEL = 210
+
+RHO_ITERATIONS = 200000
+
+# Cofactors in this digit range go to the quadratic sieve once Pollard-Rho
+# and a short ECM pass for small factors have failed: SIQS takes about the
+# same time whatever the factor sizes, while ECM on a balanced semiprime of
+# 45+ digits can take ten times longer than SIQS.
+SIQS_DIGITS = (30, 70)
+# (largest cofactor digits, B1, curves) for that ECM pass.
+SIQS_ECM_PREPASS = (
+    (45, 2000, 10),
+    (60, 11000, 10),
+    (None, 50000, 10),
+)
+
+
+def factorize(n, progress=None, executor=None):
+    factors = {}
+    if n < 2:
+        return factors
+
+    # Progress is the share of n's bits that have been split off into primes,
+    # plus the stage reached on the cofactor currently being worked on.
+    total_bits = n.bit_length()
+    n = trial_divide(n, factors)
+    resolved_bits = total_bits - n.bit_length()
+    pending = [n] if n > 1 else []
+    while pending:
+        m = pending.pop()
+        if is_prime(m):
+            factors[m] = factors.get(m, 0) + 1
+            resolved_bits += m.bit_length()
+            continue
+        base, exp = perfect_power(m)
+        if exp > 1:
+            pending.extend([base] * exp)
+            continue
+        tick = None
+        if progress is not None:
+            def tick(stage, done=resolved_bits, size=m.bit_length()):
+                progress.update((done + stage * size) / total_bits)
+        d = find_factor(m, tick, executor)
+        pending.append(d)
+        pending.append(m // d)
+
+    return dict(sorted(factors.items()))
+
+
+def divisors_from_factors(factors):
+    divisors = [1]
+    for p, e in factors.items():
+        divisors = [d * p ** k for d in divisors for k in range(e + 1)]
+    divisors.sort()
+    return divisors
+
+
+def divisors(n, progress=None, executor=None):
+    return divisors_from_factors(factorize(n, progress, executor))
+
+
+def trial_divide(n, factors, primes=SMALL_PRIMES):
+    for p in primes:
+        if p * p > n:
+            break
+        if n % p == 0:
+            count = 0
+            while n % p == 0:
+                n //= p
+                count += 1
+            factors[p] = factors.get(p, 0) + count
+    if 1 < n < primes[-1] ** 2:
+        factors[n] = factors.get(n, 0) + 1
+        n = 1
+    return n
+
+
+def integer_root(n, k):
+    if n < 2:
+        return n
+    x = 1 << -(-n.bit_length() // k)
+    while True:
+        y = ((k - 1) * x + n // x ** (k - 1)) // k
+        if y >= x:
+            return x
+        x = y
+
+
+def perfect_power(n):
+    for k in SMALL_PRIMES:
+        if (1 << k) > n:
+            break
+        r = integer_root(n, k)
+        if r ** k == n:
+            base, exp = perfect_power(r)
+            return base, exp * k
+    return n, 1
+
+
+def find_factor(n, tick=None, executor=None):
+    # tick(stage) receives a rough 0..1 estimate of how far the search got:
+    # Pollard-Rho covers the first half, each doubling of the ECM bound
+    # halves the remaining distance. On the SIQS path the ECM pass takes the
+    # next tenth and relation collection the rest, on executor's pool when
+    # one is given.
+    if gmpy2 is not None:
+        # The search code is type-agnostic; with an mpz modulus every product
+        # and reduction runs on GMP.
+        return int(_find_factor(gmpy2.mpz(n), tick, executor))
+    return _find_factor(n, tick, executor)
+
+
+def _find_factor(n, tick, executor):
+    rho_tick = None
+    if tick is not None:
+        def rho_tick(fraction):
+            tick(0.5 * fraction)
+    d = pollard_rho_brent(n, RHO_ITERATIONS, rho_tick)
+    if d:
+        return d
+    digits = len(str(n))
+    if SIQS_DIGITS[0] <= digits <= SIQS_DIGITS[1] and siqs.available():
+        for max_digits, b1, curves in SIQS_ECM_PREPASS:
+            if max_digits is None or digits <= max_digits:
+                break
+        ecm_tick = siqs_tick = None
+        if tick is not None:
+            def ecm_tick(fraction):
+                tick(0.5 + 0.1 * fraction)
+
+            def siqs_tick(fraction):
+                tick(0.6 + 0.4 * fraction)
+        d = ecm(n, b1, curves, tick=ecm_tick)
+        if d:
+            return d
+        return siqs.siqs(n, tick=siqs_tick, executor=executor)
+    for max_digits, b1 in ECM_SCHEDULE:
+        if max_digits is None or digits <= max_digits:
+            break
+    level = 0
+    while True:
+        ecm_tick = None
+        if tick is not None:
+            def ecm_tick(fraction, level=level):
+                tick(1 - 0.5 ** (level + 1 + fraction))
+        d = ecm(n, b1, curves=max(8, b1 // 1000), tick=ecm_tick)
+        if d:
+            return d
+        b1 *= 2
+        level += 1
+
+
+def pollard_rho_brent(n, max_iterations, tick=None):
+    if n % 2 == 0:
+        return 2
+    rng = random.Random(int(n))
+    batch = 128
+    iterations = 0
+    while iterations < max_iterations:
+        y = rng.randrange(1, n)
+        c = rng.randrange(1, n)
+        g = r = q = 1
+        x = ys = y
+        while g == 1 and iterations < max_iterations:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(batch, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += batch
+            iterations += r
+            r *= 2
+            if tick is not None:
+                tick(min(iterations / max_iterations, 1.0))
+        if g == n:
+            # The batched gcd overshot; replay the last block one step at a time.
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if 1 < g < n:
+            return g
+    return None
+
+
+def ecm(n, b1, curves, b2=None, tick=None):
+    if b2 is None:
+        b2 = b1 * ECM_STAGE2_FACTOR
+    primes = _primes_up_to(b1)
+    rng = random.Random(int(n) ^ b1)
+    for curve in range(curves):
+        curve_tick = None
+        if tick is not None:
+            def curve_tick(fraction, curve=curve):
+                tick((curve + fraction) / curves)
+            curve_tick(0.0)
+        d = _ecm_curve(n, b1, b2, primes, rng.randrange(6, 2 ** 31), curve_tick)
+        if d:
+            return d
+    return None
+
+
+_prime_cache = []
+
+
+def _primes_up_to(limit):
+    global _prime_cache
+    if not _prime_cache or _prime_cache[-1] < limit:
+        _prime_cache = primes_up_to(max(limit, 2 * (_prime_cache[-1] if _prime_cache else 0)))
+    return _prime_cache[:bisect.bisect_right(_prime_cache, limit)]
+
+
+# Montgomery-curve arithmetic in projective (X : Z) coordinates.
+
+def _xdbl(x, z, a24, n):
+    s = (x + z) * (x + z) % n
+    d = (x - z) * (x - z) % n
+    t = s - d
+    return s * d % n, t * (d + a24 * t) % n
+
+
+def _xadd(xp, zp, xq, zq, xd, zd, n):
+    u = (xp - zp) * (xq + zq)
+    v = (xp + zp) * (xq - zq)
+    return zd * (u + v) ** 2 % n, xd * (u - v) ** 2 % n
+
+
+def _ladder(k, x, z, a24, n):
+    x0, z0 = x, z
+    x1, z1 = _xdbl(x, z, a24, n)
+    for bit in bin(k)[3:]:
+        if bit == '1':
+            x0, z0 = _xadd(x1, z1, x0, z0, x, z, n)
+            x1, z1 = _xdbl(x1, z1, a24, n)
+        else:
+            x1, z1 = _xadd(x0, z0, x1, z1, x, z, n)
+            x0, z0 = _xdbl(x0, z0, a24, n)
+    return x0, z0
+
+
+def _ecm_curve(n, b1, b2, primes, sigma, tick=None):
+    # Suyama's parametrisation gives a curve with a point of known coordinates.
+    u = (sigma * sigma - 5) % n
+    v = 4 * sigma % n
+    x = pow(u, 3, n)
+    z = pow(v, 3, n)
+    num = pow(v - u, 3, n) * (3 * u + v) % n
+    den = 16 * x * v % n
+    g = math.gcd(den, n)
+    if g != 1:
+        return g if g != n else None
+    a24 = num * pow(den, -1, n) % n
+
+    # Stage 1
+    for i, p in enumerate(primes):
+        pk = p
+        while pk * p <= b1:
+            pk *= p
+        x, z = _ladder(pk, x, z, a24, n)
+        if tick is not None and i % 512 == 0:
+            tick(0.5 * i / len(primes))
+    g = math.gcd(z, n)
+    if g == n:
+        return None
+    if g > 1:
+        return g
+
+    # Stage 2: baby-step giant-step over m * D +/- j for B1 < q <= B2
+    wheel = ECM_WHEEL
+    x2, z2 = _xdbl(x, z, a24, n)
+    baby = []
+    px, pz = x, z
+    jx, jz = x, z
+    for j in range(1, wheel // 2, 2):
+        if math.gcd(j, wheel) == 1:
+            baby.append((jx, jz))
+        if j == 1:
+            nx, nz = _xadd(x2, z2, x, z, x, z, n)
+        else:
+            nx, nz = _xadd(jx, jz, x2, z2, px, pz, n)
+        px, pz = jx, jz
+        jx, jz = nx, nz
+
+    m = max(2, b1 // wheel)
+    dx, dz = _ladder(wheel, x, z, a24, n)
+    rx, rz = _ladder(m * wheel, x, z, a24, n)
+    px, pz = _ladder((m - 1) * wheel, x, z, a24, n)
+    acc = 1
+    first_m = m
+    while m * wheel - wheel // 2 <= b2:
+        if tick is not None and (m - first_m) % 64 == 0:
+            tick(0.5 + 0.5 * m * wheel / b2)
+        for bx, bz in baby:
+            acc = acc * (rx * bz - bx * rz) % n
+        nx, nz = _xadd(rx, rz, dx, dz, px, pz, n)
+        px, pz = rx, rz
+        rx, rz = nx, nz
+        m += 1
+    g = math.gcd(acc, n)
+    if 1 < g < n:
+        return g
+    return None
@@ -0,0 +1,200 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+
+from metrics import metrics
+
+HISTORY_DB = "prime_history.db"
+LEGACY_HISTORY_FILE = "prime_history.json"
+HISTORY_LIMIT = 100000
+PRUNE_EVERY = 1000
+WRITE_BATCH = 1000
+
+
+class HistoryManager:
+    # Append-only history in SQLite. Each check is a single INSERT, so a crash
+    # can lose at most the entry being written, and filtered queries run on the
+    # timestamp and number indexes instead of loading every entry.
+    #
+    # Numbers are stored as decimal text next to their digit count; ordering by
+    # (digits, number) is numeric order for integers of any size.
+
+    def __init__(self, path=HISTORY_DB, limit=HISTORY_LIMIT):
+        self.limit = limit
+        self.inserts_since_prune = 0
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, "
+            "number TEXT NOT NULL, digits INTEGER NOT NULL, is_prime INTEGER NOT NULL, "
+            "divisors TEXT NOT NULL, language TEXT)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS history_timestamp ON history(timestamp)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS history_number ON history(digits, number)")
+        self.db.commit()
+        self.import_legacy_history()
+
+    def import_legacy_history(self, legacy_file=LEGACY_HISTORY_FILE):
+        if not os.path.exists(legacy_file):
+            return
+        try:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        # The JSON file was newest-first; insert oldest-first to keep ids in order.
+        self.db.executemany(
+            "INSERT INTO history (timestamp, number, digits, is_prime, divisors, language) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [self._row(e["timestamp"], e["number"], e["is_prime"], e.get("divisors", []), e.get("language"))
+             for e in reversed(entries)],
+        )
+        self.db.commit()
+        os.replace(legacy_file, legacy_file + ".migrated")
+
+    def add_entry(self, number, is_prime, divisors, lang):
+        self.add_entries([(datetime.now().isoformat(), number, is_prime, divisors, lang)])
+
+    def add_entries(self, entries):
+        # entries are (timestamp, number, is_prime, divisors, lang) tuples,
+        # written in one transaction.
+        if not entries:
+            return
+        self.db.executemany(
+            "INSERT INTO history (timestamp, number, digits, is_prime, divisors, language) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [self._row(*entry) for entry in entries],
+        )
+        self.db.commit()
+        self.inserts_since_prune += len(entries)
+        if self.inserts_since_prune >= PRUNE_EVERY:
+            self.prune()
+
+    def prune(self):
+        self.inserts_since_prune = 0
+        self.db.execute(
+            "DELETE FROM history WHERE id <= (SELECT MAX(id) FROM history) - ?", (self.limit,)
+        )
+        self.db.commit()
+
+    def get_history(self, limit=100):
+        return list(self.query(limit=limit))
+
+    def query(self, primes_only=False, min_number=None, max_number=None,
+              since=None, until=None, limit=None):
+        # Yields matching entries newest-first, streaming from the cursor.
+        clauses = []
+        params = []
+        if primes_only:
+            clauses.append("is_prime = 1")
+        if min_number is not None:
+            digits = len(str(min_number))
+            clauses.append("(digits > ? OR (digits = ? AND number >= ?))")
+            params += [digits, digits, str(min_number)]
+        if max_number is not None:
+            digits = len(str(max_number))
+            clauses.append("(digits < ? OR (digits = ? AND number <= ?))")
+            params += [digits, digits, str(max_number)]
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since.isoformat() if isinstance(since, datetime) else since)
+        if until is not None:
+            clauses.append("timestamp <= ?")
+            params.append(until.isoformat() if isinstance(until, datetime) else until)
+
+        sql = "SELECT timestamp, number, is_prime, divisors, language FROM history"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        for timestamp, number, is_prime, divisors, language in self.db.execute(sql, params):
+            yield {
+                "timestamp": timestamp,
+                "number": int(number),
+                "is_prime": bool(is_prime),
+                "divisors": json.loads(divisors),
+                "language": language,
+            }
+
+    def clear_history(self):
+        self.db.execute("DELETE FROM history")
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    @staticmethod
+    def _row(timestamp, number, is_prime, divisors, lang):
+        number = str(number)
+        return timestamp, number, len(number), int(is_prime), json.dumps(divisors), lang
+
+
+_CLEAR = object()
+_STOP = object()
+
+
+class HistoryWriter:
+    # Persists entries on a background thread so callers never wait on disk.
+    # The thread owns its own connection; entries that queue up while it is
+    # busy are written together in one transaction. on_commit, if given, is
+    # called from that thread after every write.
+
+    def __init__(self, path=HISTORY_DB, limit=HISTORY_LIMIT, on_commit=None):
+        self.on_commit = on_commit
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, args=(path, limit), name="history-writer", daemon=True)
+        self.thread.start()
+
+    def add_entry(self, number, is_prime, divisors, lang):
+        self.queue.put((datetime.now().isoformat(), number, is_prime, divisors, lang))
+
+    def clear_history(self):
+        # Queued behind pending entries, so nothing submitted earlier survives it.
+        self.queue.put(_CLEAR)
+
+    def flush(self):
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(_STOP)
+        self.thread.join()
+
+    def _run(self, path, limit):
+        manager = HistoryManager(path, limit)
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            while len(batch) < WRITE_BATCH:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            entries = []
+            try:
+                with metrics.timer("history_write"):
+                    for item in batch:
+                        if item is _STOP:
+                            running = False
+                        elif item is _CLEAR:
+                            manager.add_entries(entries)
+                            entries = []
+                            manager.clear_history()
+                        else:
+                            entries.append(item)
+                    manager.add_entries(entries)
+            except sqlite3.Error:
+                # A locked or failing database loses this batch, not the app.
+                pass
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+            if self.on_commit is not None:
+                self.on_commit()
+        manager.close()
@@ -0,0 +1,117 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds, from 10 µs to 100 s.
+BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 100.0)
+# Percentiles are taken over the most recent samples only, so they follow
+# the current workload instead of averaging over the whole session.
+RECENT_SAMPLES = 1000
+PROMETHEUS_PREFIX = "prime_analyzer"
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def snapshot(self):
+        recent = sorted(self.recent)
+
+        def percentile(q):
+            if not recent:
+                return 0.0
+            return recent[min(len(recent) - 1, int(q * len(recent)))]
+
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], self.counts)),
+        }
+
+
+class MetricsRegistry:
+    # Named latency histograms, shared by every thread in the process.
+
+    def __init__(self):
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def snapshot(self):
+        with self.lock:
+            return {name: h.snapshot() for name, h in sorted(self.histograms.items())}
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def to_json(self):
+        return json.dumps({"timestamp": time.time(), "metrics": self.snapshot()}, indent=2)
+
+    def to_prometheus(self, prefix=PROMETHEUS_PREFIX):
+        lines = []
+        for name, snap in self.snapshot().items():
+            metric = f"{prefix}_{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in snap["buckets"].items():
+                cumulative += count
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f"{metric}_sum {snap['sum']}")
+            lines.append(f"{metric}_count {snap['count']}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path, fmt=None):
+        # fmt is "json" or "prometheus"; by default it follows the extension.
+        if fmt is None:
+            fmt = "json" if path.endswith(".json") else "prometheus"
+        text = self.to_json() if fmt == "json" else self.to_prometheus()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def format_table(self):
+        # Plain-text summary for the diagnostics panel, times in milliseconds.
+        rows = [f"{'stage':16} {'count':>8} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"]
+        for name, s in self.snapshot().items():
+            rows.append(
+                f"{name:16} {s['count']:>8} " + " ".join(
+                    f"{s[key] * 1000:>9.3f}" for key in ("mean", "p50", "p95", "p99", "max")
+                )
+            )
+        return "\n".join(rows)
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,232 @@
+import math
+import threading
+from collections import OrderedDict
+
+from primality import SMALL_PRIMES, is_prime_sieved, primes_up_to
+from prime_count import prime_pi
+from sieve import SEGMENT_SIZE, SegmentedSieve
+
+# Neighbours are found by sieving up to here. Above it the base primes
+# alone would no longer fit in memory, so segments are only sieved by the
+# primes below PRESIEVE_LIMIT and the survivors (about a tenth of all
+# numbers) are confirmed by a probable-prime test.
+SIEVE_LIMIT = 10 ** 14
+PRESIEVE_LIMIT = 1 << 16
+WINDOW_SEGMENTS = 16
+EULER_GAMMA = 0.5772156649015329
+# Largest k for nth_prime(): the estimate it counts up to stays below
+# prime_count.LMO_MAX (about 8.5e18 here).
+NTH_PRIME_MAX = 2 * 10 ** 17
+
+
+class SieveWindow:
+    # Keeps the most recently sieved segments so consecutive navigation
+    # queries around the same place reuse them. Segment k covers
+    # [k * span, (k + 1) * span) with span = 2 * segment_size.
+
+    def __init__(self, segment_size=SEGMENT_SIZE, max_segments=WINDOW_SEGMENTS, limit=SIEVE_LIMIT):
+        self.segment_size = segment_size
+        self.span = 2 * segment_size
+        self.max_segments = max_segments
+        self.limit = limit
+        self.segments = OrderedDict()
+        self.base_limit = 0
+        self.base_primes = []
+        self.presieve_primes = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def exact(self, k):
+        # Whether segment k flags primes only; above the limit it flags
+        # numbers free of factors below PRESIEVE_LIMIT.
+        return (k + 1) * self.span - 1 <= self.limit
+
+    def segment(self, k):
+        # Returns (start, flags) for segment k, as produced by SegmentedSieve.
+        with self.lock:
+            entry = self.segments.get(k)
+            if entry is not None:
+                self.segments.move_to_end(k)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            low = k * self.span
+            high = low + self.span - 1
+            if not self.exact(k):
+                if self.presieve_primes is None:
+                    self.presieve_primes = primes_up_to(PRESIEVE_LIMIT)[1:]
+                base_primes = self.presieve_primes
+            else:
+                if math.isqrt(high) > self.base_limit:
+                    self.base_limit = max(math.isqrt(high), 2 * self.base_limit)
+                    self.base_primes = primes_up_to(self.base_limit)[1:]
+                base_primes = self.base_primes
+        sieve = SegmentedSieve(low, high, self.segment_size, base_primes)
+        entry = next(sieve.segments(), (low | 1, bytearray()))
+        with self.lock:
+            self.segments[k] = entry
+            while len(self.segments) > self.max_segments:
+                self.segments.popitem(last=False)
+        return entry
+
+    def primes_from(self, n, progress=None):
+        # Yields the primes >= n in increasing order, without end.
+        if n <= 2:
+            yield 2
+            n = 3
+        k = n // self.span
+        while True:
+            if progress is not None:
+                progress.check()
+            start, flags = self.segment(k)
+            exact = self.exact(k)
+            i = max(n - start + 1, 0) // 2
+            while True:
+                i = flags.find(1, i)
+                if i < 0:
+                    break
+                if exact or is_prime_sieved(start + 2 * i):
+                    yield start + 2 * i
+                i += 1
+            k += 1
+
+    def primes_below(self, n, progress=None):
+        # Yields the primes < n in decreasing order.
+        m = n - 1
+        k = m // self.span
+        while k >= 0 and m >= 3:
+            if progress is not None:
+                progress.check()
+            start, flags = self.segment(k)
+            exact = self.exact(k)
+            j = (m - start) // 2 + 1 if m >= start else 0
+            while True:
+                j = flags.rfind(1, 0, j)
+                if j < 0:
+                    break
+                if exact or is_prime_sieved(start + 2 * j):
+                    yield start + 2 * j
+            k -= 1
+            m = (k + 1) * self.span - 1
+        if n > 2:
+            yield 2
+
+
+shared_window = SieveWindow()
+
+
+def next_prime(n, window=None, progress=None):
+    # Smallest prime strictly greater than n.
+    window = window or shared_window
+    return next(window.primes_from(n + 1, progress))
+
+
+def prev_prime(n, window=None, progress=None):
+    # Largest prime strictly less than n, or None below 3.
+    window = window or shared_window
+    return next(window.primes_below(n, progress), None)
+
+
+def twin_primes(n, window=None, progress=None):
+    # First twin pair (p, p + 2) with p >= n.
+    window = window or shared_window
+    previous = None
+    for p in window.primes_from(n, progress):
+        if previous is not None and p - previous == 2:
+            return previous, p
+        previous = p
+
+
+def prime_gap(n, gap, window=None, progress=None):
+    # First pair of consecutive primes p < q with p >= n and q - p >= gap.
+    window = window or shared_window
+    previous = None
+    for p in window.primes_from(n, progress):
+        if previous is not None and p - previous >= gap:
+            return previous, p
+        previous = p
+
+
+def li(x):
+    # Logarithmic integral by Ramanujan's series; pi(x) ~ li(x).
+    if x < 2:
+        return 0.0
+    log_x = math.log(x)
+    total = 0.0
+    term = 1.0
+    inner = 0.0
+    for k in range(1, 200):
+        term *= log_x / k
+        if k % 2:
+            inner += 1 / k
+        part = term * inner / 2 ** (k - 1)
+        total += part if k % 2 else -part
+        if part < 1e-15 * abs(total):
+            break
+    return EULER_GAMMA + math.log(log_x) + math.sqrt(x) * total
+
+
+def _mobius(n):
+    result = 1
+    p = 2
+    while p * p <= n:
+        if n % p == 0:
+            n //= p
+            if n % p == 0:
+                return 0
+            result = -result
+        p += 1
+    return -result if n > 1 else result
+
+
+def riemann_r(x):
+    # R(x) = sum of mu(n) / n * li(x^(1/n)); closer to pi(x) than li(x) by
+    # a factor of 5 to 25 over 10^12..10^17.
+    total = 0.0
+    n = 1
+    while True:
+        y = x ** (1.0 / n)
+        if y < 2:
+            return total
+        mu = _mobius(n)
+        if mu:
+            total += mu / n * li(y)
+        n += 1
+
+
+def nth_prime_estimate(k):
+    # Solves R(x) = k by Newton's method; typically within a few times
+    # sqrt(x) / log x primes of the k-th.
+    log_k = math.log(k)
+    x = k * (log_k + math.log(log_k))
+    for _ in range(20):
+        step = (riemann_r(x) - k) * math.log(x)
+        x -= step
+        if abs(step) < 1:
+            break
+    return int(x)
+
+
+def nth_prime(k, window=None, progress=None):
+    # The k-th prime, counting 2 as the first. pi() is evaluated exactly at the
+    # estimate and the local window walks the remaining distance.
+    if k < 1:
+        raise ValueError("k must be positive")
+    if k > NTH_PRIME_MAX:
+        raise ValueError(f"k must be at most {NTH_PRIME_MAX}")
+    if k <= len(SMALL_PRIMES):
+        return SMALL_PRIMES[k - 1]
+    window = window or shared_window
+    x = nth_prime_estimate(k)
+    count = prime_pi(x, progress)
+    if count >= k:
+        primes = window.primes_below(x + 1, progress)
+        p = next(primes)
+        for _ in range(count - k):
+            p = next(primes)
+        return p
+    primes = window.primes_from(x + 1, progress)
+    for _ in range(k - count):
+        p = next(primes)
+    return p
@@ -0,0 +1,153 @@
+import atexit
+import math
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from multiprocessing import shared_memory
+
+from primality import primes_up_to
+from sieve import SEGMENT_SIZE, SegmentedSieve, segment_primes
+
+# Each task sieves this many consecutive segments; large enough that the
+# per-task overhead (pickling the request, finding the first multiples of
+# every base prime) stays small next to the sieving itself.
+SEGMENTS_PER_TASK = 16
+# Below this many tasks the pool costs more than it saves.
+PARALLEL_MIN_TASKS = 4
+# How often a cancel request is looked at while waiting on a task.
+CANCEL_POLL_INTERVAL = 0.1
+
+_base_primes = None
+_shared = None
+
+
+def _attach(name, typecode, length):
+    # Maps the parent's base primes instead of receiving a pickled copy with
+    # every task. A pool may be shared by several sieves (see scheduler.py),
+    # so the table is swapped when a task names a different one; a task left
+    # queued by a cancelled sieve finds its table gone and fails harmlessly.
+    global _base_primes, _shared
+    if _shared is not None and _shared.name == name:
+        return
+    if _shared is None:
+        atexit.register(_detach)
+    _detach()
+    _shared = shared_memory.SharedMemory(name=name)
+    _base_primes = _shared.buf.cast(typecode)[:length]
+
+
+def _detach():
+    # The view must go before the mapping, or closing it fails at exit.
+    global _base_primes, _shared
+    if _shared is not None:
+        _base_primes.release()
+        _shared.close()
+        _base_primes = _shared = None
+
+
+def wait_result(future, progress=None):
+    # future.result(), looking at progress for a cancel request while waiting.
+    while progress is not None:
+        try:
+            return future.result(timeout=CANCEL_POLL_INTERVAL)
+        except TimeoutError:
+            progress.check()
+    return future.result()
+
+
+def _sieve_task(table, low, high, segment_size, count_only):
+    _attach(*table)
+    sieve = SegmentedSieve(low, high, segment_size, _base_primes)
+    if count_only:
+        return sum(flags.count(1) for _, flags in sieve.segments())
+    return [(start, bytes(flags)) for start, flags in sieve.segments()]
+
+
+class ParallelSieve:
+    # Drop-in for SegmentedSieve that spreads [low, high] over a process pool.
+    # The range is cut into tasks of SEGMENTS_PER_TASK segments; results are
+    # yielded in range order no matter which process finishes first. The base
+    # primes are computed once and shared with the workers through
+    # multiprocessing.shared_memory. Given an executor (a scheduler's
+    # JobExecutor), tasks go to that shared pool instead of a private one.
+
+    def __init__(self, low, high, workers=None, segment_size=SEGMENT_SIZE,
+                 segments_per_task=SEGMENTS_PER_TASK, executor=None):
+        self.low = max(low, 0)
+        self.high = high
+        self.executor = executor
+        self.workers = executor.workers if executor is not None else workers or os.cpu_count() or 1
+        self.segment_size = segment_size
+        self.task_span = 2 * segment_size * segments_per_task
+
+    def includes_two(self):
+        return self.low <= 2 <= self.high
+
+    def tasks(self):
+        # Odd-aligned [a, b] pieces; every a is odd, as SegmentedSieve expects.
+        start = max(self.low, 3) | 1
+        while start <= self.high:
+            end = min(start + self.task_span - 1, self.high)
+            yield start, end
+            start = end + 1
+
+    def is_parallel(self):
+        # A shared pool is used even with one process: the point is then to
+        # keep the sieving out of the calling process.
+        if self.high < 3 or self.low > self.high:
+            return False
+        if self.executor is None and self.workers < 2:
+            return False
+        return self.high - max(self.low, 3) >= PARALLEL_MIN_TASKS * self.task_span
+
+    def _run(self, count_only, progress=None):
+        # Yields one task result at a time, in range order.
+        if not self.is_parallel():
+            sieve = SegmentedSieve(self.low, self.high, self.segment_size)
+            for start, flags in sieve.segments(progress):
+                yield flags.count(1) if count_only else [(start, flags)]
+            return
+
+        base = primes_up_to(math.isqrt(self.high))[1:]
+        typecode = 'I' if base[-1] < 1 << 32 else 'Q'
+        table = array(typecode, base)
+        del base
+        shared = shared_memory.SharedMemory(create=True, size=max(len(table) * table.itemsize, 1))
+        shared.buf[:len(table) * table.itemsize] = table.tobytes()
+        pool = self.executor or ProcessPoolExecutor(max_workers=self.workers)
+        names = (shared.name, typecode, len(table))
+        first = max(self.low, 3) | 1
+        try:
+            pending = []
+            for low, high in self.tasks():
+                pending.append((high, pool.submit(_sieve_task, names, low, high, self.segment_size, count_only)))
+                if len(pending) >= self.workers * 4:
+                    done, future = pending.pop(0)
+                    yield wait_result(future, progress)
+                    if progress is not None:
+                        progress.update((done - first + 1) / (self.high - first + 1))
+            for done, future in pending:
+                yield wait_result(future, progress)
+                if progress is not None:
+                    progress.update((done - first + 1) / (self.high - first + 1))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            shared.close()
+            shared.unlink()
+
+    def segments(self, progress=None):
+        # Same (start, flags) stream as SegmentedSieve.segments().
+        for result in self._run(False, progress):
+            yield from result
+
+    def prime_chunks(self, progress=None):
+        if self.includes_two():
+            yield [2]
+        for start, flags in self.segments(progress):
+            yield segment_primes(start, flags)
+
+    def count(self, progress=None):
+        total = 1 if self.includes_two() else 0
+        for count in self._run(True, progress):
+            total += count
+        return total
@@ -0,0 +1,265 @@
+import math
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+SMALL_PRIME_LIMIT = 1000
+
+# Miller-Rabin with the first twelve primes as bases is exact for n < 3.3 * 10**24,
+# which covers every 64-bit input.
+MR_BASES_64 = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+MR_LIMIT_64 = 1 << 64
+
+# Above 64 bits, numbers of the forms 2^p - 1, k * 2^m + 1 and k * 2^m - 1
+# (k odd, k < 2^m) are decided by a deterministic test specific to the form:
+# one modular squaring per bit, where BPSW needs a Lucas sequence on top.
+SPECIAL_FORM_MIN_BITS = 64
+# Candidates tried for the auxiliary parameter of the Proth and LLR tests.
+SPECIAL_FORM_SEARCH = 200
+
+
+def simple_sieve(limit):
+    if limit < 2:
+        return []
+    sieve = bytearray([1]) * (limit + 1)
+    sieve[0] = sieve[1] = 0
+    for i in range(2, math.isqrt(limit) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit + 1, i)))
+    return [i for i, flag in enumerate(sieve) if flag]
+
+
+SMALL_PRIMES = simple_sieve(SMALL_PRIME_LIMIT)
+_SMALL_PRIME_SET = frozenset(SMALL_PRIMES)
+
+# Optional precomputed bitmap (see prime_index.py); numbers up to its bound
+# are answered with a single bit test.
+_prime_index = None
+
+
+def install_index(index):
+    global _prime_index
+    _prime_index = index
+
+
+def primes_up_to(limit):
+    # Base primes for sieving and ECM, read from the index when it covers limit.
+    if _prime_index is not None and limit <= _prime_index.bound:
+        return _prime_index.primes(limit)
+    return simple_sieve(limit)
+
+
+def is_prime(n, progress=None):
+    if n < 2:
+        return False
+    if n <= SMALL_PRIME_LIMIT:
+        return n in _SMALL_PRIME_SET
+    if _prime_index is not None and n <= _prime_index.bound:
+        return n in _prime_index
+    for p in SMALL_PRIMES:
+        if n % p == 0:
+            return False
+    if n < SMALL_PRIME_LIMIT * SMALL_PRIME_LIMIT:
+        return True
+    return is_prime_sieved(n, progress)
+
+
+def is_prime_sieved(n, progress=None):
+    # is_prime(n) for n >= SMALL_PRIME_LIMIT^2 already known to have no
+    # factor below SMALL_PRIME_LIMIT, such as a survivor of a partial sieve.
+    form = special_form(n)
+    if form is not None:
+        prime = SPECIAL_FORM_TESTS[form[0]](n, form[1], form[2], progress)
+        if prime is not None:
+            return prime
+    if gmpy2 is not None:
+        # Same tests, run on GMP's arithmetic.
+        if n < MR_LIMIT_64:
+            return all(gmpy2.is_strong_prp(n, a) for a in MR_BASES_64)
+        return gmpy2.is_strong_bpsw_prp(n)
+    if n < MR_LIMIT_64:
+        return all(strong_probable_prime(n, a) for a in MR_BASES_64)
+    return bpsw(n)
+
+
+def backend_for(n):
+    # Names what is_prime(n) is answered by: "index", "python", "gmpy2" or
+    # the special-form test ("lucas-lehmer", "pepin", "proth", "llr").
+    if _prime_index is not None and SMALL_PRIME_LIMIT < n <= _prime_index.bound:
+        return "index"
+    form = special_form(n)
+    if form is not None:
+        return form[0]
+    if gmpy2 is not None and n >= SMALL_PRIME_LIMIT * SMALL_PRIME_LIMIT:
+        return "gmpy2"
+    return "python"
+
+
+def strong_probable_prime(n, a):
+    d = n - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    x = pow(a, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def jacobi(a, n):
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def strong_lucas_probable_prime(n):
+    # Selfridge's method A for choosing D, P = 1, Q = (1 - D) / 4
+    if math.isqrt(n) ** 2 == n:
+        return False
+    d = 5
+    while True:
+        j = jacobi(d, n)
+        if j == -1:
+            break
+        if j == 0 and abs(d) != n:
+            return False
+        d = -d - 2 if d > 0 else -d + 2
+    p = 1
+    q = (1 - d) // 4
+
+    k = n + 1
+    s = 0
+    while k % 2 == 0:
+        k //= 2
+        s += 1
+
+    # Compute U_k, V_k and Q^k by binary expansion of k
+    u, v, qk = 1, p, q % n
+    inv2 = (n + 1) // 2
+    for bit in bin(k)[3:]:
+        u, v = u * v % n, (v * v - 2 * qk) % n
+        qk = qk * qk % n
+        if bit == '1':
+            u, v = (p * u + v) * inv2 % n, (d * u + p * v) * inv2 % n
+            qk = qk * q % n
+
+    if u == 0 or v == 0:
+        return True
+    for _ in range(s - 1):
+        v = (v * v - 2 * qk) % n
+        if v == 0:
+            return True
+        qk = qk * qk % n
+    return False
+
+
+def bpsw(n):
+    return strong_probable_prime(n, 2) and strong_lucas_probable_prime(n)
+
+
+
+def special_form(n):
+    # (test, k, m) when n = 2^m - 1 ("lucas-lehmer", k = 1), n = 2^2^i + 1
+    # ("pepin"), n = k * 2^m + 1 ("proth") or n = k * 2^m - 1 ("llr") with k
+    # odd and k < 2^m; None otherwise or at 64 bits and below.
+    if n.bit_length() <= SPECIAL_FORM_MIN_BITS:
+        return None
+    if n & (n + 1) == 0:
+        return "lucas-lehmer", 1, n.bit_length()
+    m = ((n - 1) & (1 - n)).bit_length() - 1
+    k = (n - 1) >> m
+    if k.bit_length() <= m:
+        return ("pepin" if k == 1 and m & (m - 1) == 0 else "proth"), k, m
+    m = ((n + 1) & -(n + 1)).bit_length() - 1
+    k = (n + 1) >> m
+    if k.bit_length() <= m:
+        return "llr", k, m
+    return None
+
+
+def _big(n):
+    return gmpy2.mpz(n) if gmpy2 is not None else n
+
+
+def lucas_lehmer(n, k, p, progress=None):
+    # 2^p - 1 is prime iff s_(p-2) = 0 with s_0 = 4, s_i = s_(i-1)^2 - 2;
+    # reduction modulo 2^p - 1 is a shift and an add.
+    if not is_prime(p):
+        return False
+    n = _big(n)
+    s = _big(4)
+    for i in range(p - 2):
+        s = s * s + n - 2
+        s = (s & n) + (s >> p)
+        s = (s & n) + (s >> p)
+        if s >= n:
+            s -= n
+        if progress is not None:
+            progress.update(i / p)
+    return s == 0
+
+
+def proth_test(n, k, m, progress=None):
+    # Proth's theorem: k * 2^m + 1 is prime iff a^((n - 1) / 2) = -1 for any
+    # a with (a / n) = -1; Pepin's test for Fermat numbers is the case a = 3.
+    # None if no such a turns up (n is then a square).
+    for a in SMALL_PRIMES[1:SPECIAL_FORM_SEARCH]:
+        if jacobi(a, n) == -1:
+            break
+    else:
+        return None
+    n = _big(n)
+    x = pow(_big(a), k, n)
+    for i in range(m - 1):
+        x = x * x % n
+        if progress is not None:
+            progress.update(i / m)
+    return x == n - 1
+
+
+def llr_test(n, k, m, progress=None):
+    # Lucas-Lehmer-Riesel with Rodseth's choice of start: for P with
+    # (P - 2 / n) = 1 and (P + 2 / n) = -1, k * 2^m - 1 is prime iff
+    # u_(m-2) = 0 where u_0 = V_k(P, 1) and u_i = u_(i-1)^2 - 2.
+    for p in range(3, 3 + SPECIAL_FORM_SEARCH):
+        if jacobi(p - 2, n) == 1 and jacobi(p + 2, n) == -1:
+            break
+    else:
+        return None
+    n = _big(n)
+    # Lucas ladder: (v, w) = (V_j, V_(j+1)) for the leading bits j of k.
+    v, w = _big(2), _big(p)
+    for bit in bin(k)[2:]:
+        if bit == "1":
+            v, w = (v * w - p) % n, (w * w - 2) % n
+        else:
+            v, w = (v * v - 2) % n, (v * w - p) % n
+    for i in range(m - 2):
+        v = (v * v - 2) % n
+        if progress is not None:
+            progress.update(i / m)
+    return v == 0
+
+
+SPECIAL_FORM_TESTS = {
+    "lucas-lehmer": lucas_lehmer,
+    "pepin": proth_test,
+    "proth": proth_test,
+    "llr": llr_test,
+}
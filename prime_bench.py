@@ -0,0 +1,229 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from prime_core import (
+    is_prime, is_prime_mask, factorize, divisors, count_primes, next_prime, SieveWindow, ParallelSieve,
+    iter_arithmetic, lmo_pi,
+)
+
+SEED = 20240601
+DEFAULT_THRESHOLD = 0.15
+
+
+def random_bits(rng, bits, size):
+    return [rng.getrandbits(bits) | (1 << (bits - 1)) | 1 for _ in range(size)]
+
+
+def random_prime(rng, bits):
+    while True:
+        n = rng.getrandbits(bits) | (1 << (bits - 1)) | 1
+        if is_prime(n):
+            return n
+
+
+def carmichael_numbers(rng, size):
+    # Chernick's form (6k+1)(12k+1)(18k+1) is a Carmichael number whenever all
+    # three factors are prime; these are the classic traps for Fermat tests.
+    numbers = []
+    k = 1
+    while len(numbers) < size:
+        a, b, c = 6 * k + 1, 12 * k + 1, 18 * k + 1
+        if is_prime(a) and is_prime(b) and is_prime(c):
+            numbers.append(a * b * c)
+        k += 1
+    return numbers
+
+
+def balanced_semiprimes(bits):
+    def corpus(rng, size):
+        return [random_prime(rng, bits) * random_prime(rng, bits) for _ in range(size)]
+    return corpus
+
+
+def highly_composite(rng, size):
+    # Products of the first primes with non-increasing exponents, largest first.
+    primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37]
+    numbers = []
+    while len(numbers) < size:
+        n = 1
+        exp = rng.randint(3, 6)
+        for p in primes:
+            n *= p ** exp
+            exp = rng.randint(max(exp - 2, 0), exp)
+            if exp == 0 or n.bit_length() > 60:
+                break
+        numbers.append(n)
+    return numbers
+
+
+def prime_dense_ranges(width):
+    def corpus(rng, size):
+        starts = [rng.randrange(10 ** 9, 10 ** 12) for _ in range(size)]
+        return [(s, s + width) for s in starts]
+    return corpus
+
+
+NAV_WINDOW = SieveWindow()
+
+
+def walk_primes(start, steps=1000):
+    # One cold segment followed by warm steps, as when a user pages forward.
+    NAV_WINDOW.segments.clear()
+    p = start
+    for _ in range(steps):
+        p = next_prime(p, NAV_WINDOW)
+    return p
+
+
+# name -> (corpus builder, operation, corpus size, quick corpus size)
+BENCHMARKS = {
+    "primality/random32": (lambda rng, n: random_bits(rng, 32, n), is_prime, 20000, 2000),
+    "primality/random48": (lambda rng, n: random_bits(rng, 48, n), is_prime, 20000, 2000),
+    "primality/random64": (lambda rng, n: random_bits(rng, 64, n), is_prime, 20000, 2000),
+    "primality/random1024": (lambda rng, n: random_bits(rng, 1024, n), is_prime, 500, 50),
+    "primality/carmichael": (carmichael_numbers, is_prime, 200, 50),
+    # 2,917 digits, proved prime by Lucas-Lehmer.
+    "primality/mersenne9689": (lambda rng, n: [2 ** 9689 - 1] * n, is_prime, 10, 2),
+    "primality/mask-8192x48bit": (lambda rng, n: [random_bits(rng, 48, 8192) for _ in range(n)], is_prime_mask, 10, 2),
+    "factorize/semiprime40": (balanced_semiprimes(20), factorize, 300, 30),
+    "factorize/semiprime64": (balanced_semiprimes(32), factorize, 40, 5),
+    # About 42 digits: past rho and the short ECM pass, split by SIQS.
+    "factorize/semiprime140": (balanced_semiprimes(70), factorize, 5, 1),
+    "divisors/highly-composite": (highly_composite, divisors, 2000, 200),
+    "navigation/walk-1000-1e12": (lambda rng, n: [rng.randrange(10 ** 12, 10 ** 13) for _ in range(n)], walk_primes, 50, 10),
+    "count/lmo-pi-1e11": (lambda rng, n: [rng.randrange(10 ** 11, 2 * 10 ** 11) for _ in range(n)], lmo_pi, 5, 1),
+    "sieve/count-1e6-window": (prime_dense_ranges(10 ** 6), lambda r: count_primes(*r), 20, 3),
+    "arithmetic/range-1e5-window": (prime_dense_ranges(10 ** 5), lambda r: sum(map(len, iter_arithmetic(*r))), 10, 2),
+    # Uses every core; compare against the same run with one core to see scaling.
+    "sieve/parallel-2e7-window": (prime_dense_ranges(2 * 10 ** 7), lambda r: ParallelSieve(*r).count(), 4, 1),
+}
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_benchmark(name, quick=False, repeat=3):
+    build, op, size, quick_size = BENCHMARKS[name]
+    rng = random.Random(f"{SEED}:{name}")
+    corpus = build(rng, quick_size if quick else size)
+
+    # Keep the fastest of several passes; slower passes are mostly noise from
+    # the rest of the machine.
+    clock = time.perf_counter
+    elapsed = None
+    for _ in range(repeat):
+        run_latencies = []
+        started = clock()
+        for item in corpus:
+            t0 = clock()
+            op(item)
+            run_latencies.append(clock() - t0)
+        run_elapsed = clock() - started
+        if elapsed is None or run_elapsed < elapsed:
+            elapsed, latencies = run_elapsed, run_latencies
+
+    # Peak memory is measured in a separate pass so tracemalloc overhead does
+    # not leak into the timings.
+    tracemalloc.start()
+    for item in corpus[:max(1, len(corpus) // 10)]:
+        op(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "items": len(corpus),
+        "seconds": elapsed,
+        "per_second": len(corpus) / elapsed if elapsed else 0.0,
+        "p50_us": percentile(latencies, 0.50) * 1e6,
+        "p99_us": percentile(latencies, 0.99) * 1e6,
+        "peak_kib": peak / 1024,
+    }
+
+
+def compare(results, baseline, threshold):
+    # Returns the names whose throughput dropped by more than threshold.
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get("results", {}).get(name)
+        if not old or not old["per_second"]:
+            continue
+        change = result["per_second"] / old["per_second"] - 1
+        result["change"] = change
+        if change < -threshold:
+            regressions.append(name)
+    return regressions
+
+
+def print_table(results, out):
+    header = f"{'benchmark':28} {'items':>7} {'items/s':>12} {'p50 µs':>10} {'p99 µs':>10} {'peak KiB':>9} {'vs base':>8}"
+    out.write(header + "\n" + "-" * len(header) + "\n")
+    for name, r in results.items():
+        change = f"{r['change']:+.1%}" if "change" in r else ""
+        out.write(
+            f"{name:28} {r['items']:>7} {r['per_second']:>12,.1f} {r['p50_us']:>10,.1f} "
+            f"{r['p99_us']:>10,.1f} {r['peak_kib']:>9,.0f} {change:>8}\n"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="prime_bench",
+        description="Reproducible benchmarks for the primality, factorization and sieve engines.",
+    )
+    parser.add_argument("--quick", action="store_true", help="use the small corpora")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="run benchmarks whose name starts with NAME")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    parser.add_argument("--save", metavar="FILE", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a saved baseline")
+    parser.add_argument("--repeat", type=int, default=3, help="passes per benchmark; the fastest counts")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed throughput drop before failing (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    names = list(BENCHMARKS)
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if args.only:
+        names = [n for n in names if any(n.startswith(prefix) for prefix in args.only)]
+
+    results = {}
+    for name in names:
+        results[name] = run_benchmark(name, args.quick, max(1, args.repeat))
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    print_table(results, sys.stdout)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({
+                "seed": SEED,
+                "quick": args.quick,
+                "repeat": args.repeat,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            }, f, indent=2)
+
+    if regressions:
+        print(f"\nRegressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,113 +1,772 @@
 import sys
-import math
 import os
-import json
-from datetime import datetime
+import math
+import time
+
+# Taken before the Qt imports so --profile-startup can report their cost.
+STARTED = time.perf_counter()
+
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QComboBox, QTextEdit,
     QFrame, QGridLayout, QSpacerItem, QSizePolicy, QScrollArea,
-    QGroupBox, QRadioButton, QButtonGroup, QMessageBox
+    QGroupBox, QRadioButton, QButtonGroup, QMessageBox, QCheckBox,
+    QProgressBar, QFileDialog, QListWidget, QListWidgetItem
 )
-from PyQt6.QtCore import Qt, QTranslator, QLocale, QLibraryInfo, pyqtSignal, QThread
-from PyQt6.QtGui import QFont, QPalette, QColor, QLinearGradient, QBrush, QIcon, QPainter
+from PyQt6.QtCore import Qt, QTranslator, QLocale, QLibraryInfo, pyqtSignal, QThread, QTimer
+from PyQt6.QtGui import QFont, QPalette, QColor, QLinearGradient, QBrush, QIcon, QPainter, QTextOption
+
+from prime_core import (
+    is_prime, proper_divisors, ParallelSieve, segment_primes,
+    iter_batch_results, parse_numbers, Cancelled, load_prime_index, install_index,
+    backend_for, next_prime, prev_prime, nth_prime, twin_primes, prime_gap, prime_pi, export_primes,
+    analyze, iter_arithmetic, parse_number, ExpressionError
+)
+from prime_count import LMO_MAX
+from navigation import NTH_PRIME_MAX
+from cache import ResultCache
+from history import HistoryManager, HistoryWriter
+from metrics import metrics
+from progress import format_eta
+from scheduler import JobScheduler, Job, INTERACTIVE, BACKGROUND, TABLE_HEADER, format_job
+
+RANGE_LIMIT = 10**14
+RANGE_DISPLAY_LIMIT = 10000
+BATCH_DISPLAY_LIMIT = 10000
+DIVISOR_PAGE_SIZE = 500
+# Results are rendered at most this often, however fast they arrive.
+RENDER_INTERVAL_MS = 100
+HISTORY_REFRESH_MS = 250
+NAV_QUERIES = ('next', 'prev', 'nth', 'pi', 'twin', 'gap')
+DIAGNOSTICS_REFRESH_MS = 1000
+JOBS_REFRESH_MS = 500
+ANALYTICS_COLUMNS = f"{'n':>16} {'τ(n)':>8} {'σ(n)':>18} {'φ(n)':>18} {'μ(n)':>5}"
+# File dialog filter -> export format
+EXPORT_FILTERS = {
+    "Delta varint (*.bin)": "varint",
+    "Wheel-30 bitmap (*.bin)": "wheel30",
+    "Text (*.txt)": "text",
+}
+# Larger inputs get a primality verdict only; factoring them could run for hours.
+DIVISOR_DIGIT_LIMIT = 80
+# Above this many digits the verdict is shown first and the divisors come
+# from a background factoring job.
+INTERACTIVE_DIVISOR_DIGITS = 20
+# Longer numbers are shown as their leading and trailing digits.
+DISPLAY_DIGIT_LIMIT = 100
+
+# UI strings per language, built once at import.
+TRANSLATIONS = {
+    'en': {
+        'window_title': 'Prime Number Checker',
+        'main_title': 'Prime Number Analyzer',
+        'subtitle': 'Check if a number is prime or find its divisors',
+        'language_label': 'Language:',
+        'theme_label': 'Theme:',
+        'check_button': 'Check Number',
+        'input_placeholder': 'Enter a positive integer...',
+        'ready_status': 'Ready',
+        'is_prime': 'is PRIME!',
+        'not_prime': 'is NOT prime.',
+        'divisors': 'Divisible by:',
+        'error_invalid': 'Please enter a valid positive integer.',
+        'processing': 'Processing...',
+        'clear_history': 'Clear History',
+        'mode_single': 'Single Number',
+        'mode_range': 'Range',
+        'count_only': 'Count only',
+        'range_start_placeholder': 'Range start...',
+        'range_end_placeholder': 'Range end...',
+        'range_title': 'Primes in [{low}, {high}]',
+        'range_count': 'Found {count} primes.',
+        'range_truncated': 'Showing the first {limit}.',
+        'error_range': 'Please enter a valid range (start ≤ end ≤ 10^14).',
+        'mode_batch': 'Batch',
+        'load_file': 'Load File...',
+        'batch_placeholder': 'Paste numbers separated by new lines or commas...',
+        'batch_progress': '{done}/{total} checked • {rate:,.0f} numbers/s',
+        'batch_invalid': 'Skipped {count} invalid entries.',
+        'error_batch': 'Please enter at least one positive integer.',
+        'cache_stats': 'Cache: {hits} hits • {misses} misses',
+        'primes_only': 'Primes only',
+        'cancel_button': 'Cancel',
+        'cancelled': 'Computation cancelled.',
+        'progress_status': 'Processing... {percent:.0f}% • ETA {eta}',
+        'backend': 'Answered by: {backend}',
+        'divisors_skipped': 'Divisors are not listed for numbers over {limit} digits.',
+        'mode_navigate': 'Navigate',
+        'nav_next': 'Next prime',
+        'nav_prev': 'Previous prime',
+        'nav_nth': 'n-th prime',
+        'nav_twin': 'Next twin primes',
+        'nav_gap': 'Next prime gap ≥ k',
+        'nth_placeholder': 'Which prime (n)...',
+        'gap_placeholder': 'Minimum gap (k)...',
+        'nav_result_next': 'Next prime after {n}: {p}',
+        'nav_result_prev': 'Largest prime below {n}: {p}',
+        'nav_result_none': 'There is no prime below {n}.',
+        'nav_result_nth': 'Prime number {n} is {p}.',
+        'nav_result_twin': 'First twin primes from {n}: {p} and {q}.',
+        'nav_result_gap': 'First gap of at least {k} from {n}: {p} → {q} (gap {gap}).',
+        'error_gap': 'Please enter a minimum gap of at least 1.',
+        'divisors_page': 'Showing {shown} of {total} divisors.',
+        'more_divisors': 'Show {count} more',
+        'diagnostics': 'Diagnostics',
+        'export_metrics': 'Export...',
+        'reset_metrics': 'Reset',
+        'metrics_empty': 'No measurements yet.',
+        'metrics_exported': 'Metrics written to {path}',
+        'export_range': 'Export...',
+        'export_done': 'Wrote {count:,} primes to {path} ({size:,} bytes).',
+        'mode_analytics': 'Analytics',
+        'analytics_end_placeholder': 'Range end (optional)...',
+        'analytics_title': 'Divisor functions of {num}',
+        'factorization': 'Factorization:',
+        'tau_label': 'Number of divisors τ(n)',
+        'sigma_label': 'Sum of divisors σ(n)',
+        'phi_label': "Euler's totient φ(n)",
+        'mu_label': 'Möbius μ(n)',
+        'analytics_range_title': 'Divisor functions for [{low}, {high}]',
+        'analytics_summary': '{count} numbers • {squarefree} squarefree • {primes} primes • largest τ(n) = {max_tau} at n = {max_tau_n}',
+        'analytics_perfect': 'Perfect numbers (σ(n) = 2n): {numbers}',
+        'error_analytics_digits': 'Factorization is limited to 80 digits; enter a range end to use the sieve instead.',
+        'nav_pi': 'Primes up to n, π(n)',
+        'nav_result_pi': 'There are {p} primes up to {n}.',
+        'error_pi_limit': 'π(n) can be computed for n below 2⁶³ (about 9.2 × 10¹⁸).',
+        'expression_placeholder': 'Enter a positive integer or an expression such as 2^127-1, 3*2^5000+1, F12, 100!+1...',
+        'jobs': 'Jobs',
+        'cancel_job': 'Cancel job',
+        'job_queued': 'Queued behind running jobs...',
+        'jobs_empty': 'No jobs yet.',
+        'divisors_pending': 'Finding the divisors in the background...',
+        'error_nth_limit': 'The n-th prime can be found for n up to 2 × 10¹⁷.'
+    },
+    'fa': {
+        'window_title': 'بررسی اعداد اول',
+        'main_title': 'تحلیلگر اعداد اول',
+        'subtitle': 'بررسی کنید که آیا عدد اول است یا مقسوم‌علیه‌های آن را بیابید',
+        'language_label': 'زبان:',
+        'theme_label': 'تم:',
+        'check_button': 'بررسی عدد',
+        'input_placeholder': 'یک عدد صحیح مثبت وارد کنید...',
+        'ready_status': 'آماده',
+        'is_prime': 'عدد اول است!',
+        'not_prime': 'عدد اول نیست.',
+        'divisors': 'قابل تقسیم بر:',
+        'error_invalid': 'لطفاً یک عدد صحیح مثبت معتبر وارد کنید.',
+        'processing': 'در حال پردازش...',
+        'clear_history': 'پاک کردن تاریخچه',
+        'mode_single': 'عدد تکی',
+        'mode_range': 'بازه',
+        'count_only': 'فقط شمارش',
+        'range_start_placeholder': 'ابتدای بازه...',
+        'range_end_placeholder': 'انتهای بازه...',
+        'range_title': 'اعداد اول در بازه [{low}, {high}]',
+        'range_count': '{count} عدد اول یافت شد.',
+        'range_truncated': 'نمایش {limit} مورد نخست.',
+        'error_range': 'لطفاً یک بازه معتبر وارد کنید (ابتدا ≤ انتها ≤ 10^14).',
+        'mode_batch': 'دسته\u200cای',
+        'load_file': 'بارگذاری فایل...',
+        'batch_placeholder': 'اعداد را با خط جدید یا کاما جدا کرده و اینجا بچسبانید...',
+        'batch_progress': '{done}/{total} بررسی شد • {rate:,.0f} عدد در ثانیه',
+        'batch_invalid': '{count} مورد نامعتبر نادیده گرفته شد.',
+        'error_batch': 'لطفاً حداقل یک عدد صحیح مثبت وارد کنید.',
+        'cache_stats': 'حافظه نهان: {hits} برخورد • {misses} خطا',
+        'primes_only': 'فقط اعداد اول',
+        'cancel_button': 'لغو',
+        'cancelled': 'محاسبه لغو شد.',
+        'progress_status': 'در حال پردازش... {percent:.0f}% • زمان باقی\u200cمانده {eta}',
+        'backend': 'پاسخ\u200cدهنده: {backend}',
+        'divisors_skipped': 'مقسوم\u200cعلیه\u200cها برای اعداد بیش از {limit} رقم فهرست نمی\u200cشوند.',
+        'mode_navigate': 'پیمایش',
+        'nav_next': 'عدد اول بعدی',
+        'nav_prev': 'عدد اول قبلی',
+        'nav_nth': 'n-امین عدد اول',
+        'nav_twin': 'جفت اول دوقلوی بعدی',
+        'nav_gap': 'فاصله اول بعدی ≥ k',
+        'nth_placeholder': 'کدام عدد اول (n)...',
+        'gap_placeholder': 'حداقل فاصله (k)...',
+        'nav_result_next': 'عدد اول بعد از {n}: {p}',
+        'nav_result_prev': 'بزرگ\u200cترین عدد اول کوچک\u200cتر از {n}: {p}',
+        'nav_result_none': 'هیچ عدد اولی کوچک\u200cتر از {n} وجود ندارد.',
+        'nav_result_nth': 'عدد اول شماره {n} برابر {p} است.',
+        'nav_result_twin': 'اولین جفت اول دوقلو از {n}: {p} و {q}.',
+        'nav_result_gap': 'اولین فاصله دست\u200cکم {k} از {n}: {p} ← {q} (فاصله {gap}).',
+        'error_gap': 'لطفاً حداقل فاصله\u200cای برابر ۱ یا بیشتر وارد کنید.',
+        'divisors_page': 'نمایش {shown} از {total} مقسوم\u200cعلیه.',
+        'more_divisors': 'نمایش {count} مورد دیگر',
+        'diagnostics': 'عیب\u200cیابی',
+        'export_metrics': 'خروجی...',
+        'reset_metrics': 'بازنشانی',
+        'metrics_empty': 'هنوز اندازه\u200cگیری\u200cای ثبت نشده است.',
+        'metrics_exported': 'معیارها در {path} ذخیره شد',
+        'export_range': 'خروجی...',
+        'export_done': '{count:,} عدد اول در {path} نوشته شد ({size:,} بایت).',
+        'mode_analytics': 'تحلیل',
+        'analytics_end_placeholder': 'انتهای بازه (اختیاری)...',
+        'analytics_title': 'توابع مقسوم\u200cعلیه برای {num}',
+        'factorization': 'تجزیه:',
+        'tau_label': 'تعداد مقسوم\u200cعلیه\u200cها τ(n)',
+        'sigma_label': 'مجموع مقسوم\u200cعلیه\u200cها σ(n)',
+        'phi_label': 'تابع فی اویلر φ(n)',
+        'mu_label': 'تابع موبیوس μ(n)',
+        'analytics_range_title': 'توابع مقسوم\u200cعلیه در بازه [{low}, {high}]',
+        'analytics_summary': '{count} عدد • {squarefree} بدون مربع • {primes} عدد اول • بیشترین τ(n) = {max_tau} در n = {max_tau_n}',
+        'analytics_perfect': 'اعداد تام (σ(n) = 2n): {numbers}',
+        'error_analytics_digits': 'تجزیه به ۸۰ رقم محدود است؛ برای استفاده از غربال، انتهای بازه را وارد کنید.',
+        'nav_pi': 'تعداد اعداد اول تا n، π(n)',
+        'nav_result_pi': 'تا {n} تعداد {p} عدد اول وجود دارد.',
+        'error_pi_limit': 'π(n) برای n کوچک\u200cتر از ۲ به توان ۶۳ (حدود ۹٫۲ × ۱۰ به توان ۱۸) محاسبه می\u200cشود.',
+        'expression_placeholder': 'یک عدد صحیح مثبت یا عبارتی مانند 2^127-1، 3*2^5000+1، F12 یا 100!+1 وارد کنید...',
+        'jobs': 'کارها',
+        'cancel_job': 'لغو کار',
+        'job_queued': 'در صف پس از کارهای در حال اجرا...',
+        'jobs_empty': 'هنوز کاری ثبت نشده است.',
+        'divisors_pending': 'یافتن مقسوم\u200cعلیه\u200cها در پس\u200cزمینه...',
+        'error_nth_limit': 'n-امین عدد اول برای n تا ۲ × ۱۰ به توان ۱۷ یافت می\u200cشود.'
+    },
+    'zh': {
+        'window_title': '质数检查器',
+        'main_title': '质数分析器',
+        'subtitle': '检查一个数字是否为质数或找到它的除数',
+        'language_label': '语言：',
+        'theme_label': '主题：',
+        'check_button': '检查数字',
+        'input_placeholder': '输入一个正整数...',
+        'ready_status': '就绪',
+        'is_prime': '是质数！',
+        'not_prime': '不是质数。',
+        'divisors': '可被整除：',
+        'error_invalid': '请输入有效的正整数。',
+        'processing': '处理中...',
+        'clear_history': '清除历史',
+        'mode_single': '单个数字',
+        'mode_range': '范围',
+        'count_only': '仅计数',
+        'range_start_placeholder': '范围起点...',
+        'range_end_placeholder': '范围终点...',
+        'range_title': '[{low}, {high}] 中的质数',
+        'range_count': '共找到 {count} 个质数。',
+        'range_truncated': '仅显示前 {limit} 个。',
+        'error_range': '请输入有效的范围（起点 ≤ 终点 ≤ 10^14）。',
+        'mode_batch': '批量',
+        'load_file': '加载文件...',
+        'batch_placeholder': '粘贴以换行或逗号分隔的数字...',
+        'batch_progress': '已检查 {done}/{total} • 每秒 {rate:,.0f} 个数字',
+        'batch_invalid': '已跳过 {count} 个无效条目。',
+        'error_batch': '请至少输入一个正整数。',
+        'cache_stats': '缓存：命中 {hits} • 未命中 {misses}',
+        'primes_only': '仅质数',
+        'cancel_button': '取消',
+        'cancelled': '计算已取消。',
+        'progress_status': '处理中... {percent:.0f}% • 预计剩余 {eta}',
+        'backend': '应答后端：{backend}',
+        'divisors_skipped': '超过 {limit} 位的数字不列出除数。',
+        'mode_navigate': '导航',
+        'nav_next': '下一个质数',
+        'nav_prev': '上一个质数',
+        'nav_nth': '第 n 个质数',
+        'nav_twin': '下一对孪生质数',
+        'nav_gap': '下一个 ≥ k 的质数间隙',
+        'nth_placeholder': '第几个质数（n）...',
+        'gap_placeholder': '最小间隙（k）...',
+        'nav_result_next': '{n} 之后的下一个质数：{p}',
+        'nav_result_prev': '小于 {n} 的最大质数：{p}',
+        'nav_result_none': '小于 {n} 的质数不存在。',
+        'nav_result_nth': '第 {n} 个质数是 {p}。',
+        'nav_result_twin': '从 {n} 起的第一对孪生质数：{p} 和 {q}。',
+        'nav_result_gap': '从 {n} 起第一个不小于 {k} 的间隙：{p} → {q}（间隙 {gap}）。',
+        'error_gap': '请输入不小于 1 的最小间隙。',
+        'divisors_page': '已显示 {total} 个除数中的 {shown} 个。',
+        'more_divisors': '再显示 {count} 个',
+        'diagnostics': '诊断',
+        'export_metrics': '导出...',
+        'reset_metrics': '重置',
+        'metrics_empty': '尚无测量数据。',
+        'metrics_exported': '指标已写入 {path}',
+        'export_range': '导出...',
+        'export_done': '已将 {count:,} 个质数写入 {path}（{size:,} 字节）。',
+        'mode_analytics': '分析',
+        'analytics_end_placeholder': '范围终点（可选）...',
+        'analytics_title': '{num} 的除数函数',
+        'factorization': '质因数分解：',
+        'tau_label': '除数个数 τ(n)',
+        'sigma_label': '除数和 σ(n)',
+        'phi_label': '欧拉函数 φ(n)',
+        'mu_label': '默比乌斯函数 μ(n)',
+        'analytics_range_title': '[{low}, {high}] 的除数函数',
+        'analytics_summary': '共 {count} 个数 • {squarefree} 个无平方因子数 • {primes} 个质数 • 最大 τ(n) = {max_tau}（n = {max_tau_n}）',
+        'analytics_perfect': '完全数（σ(n) = 2n）：{numbers}',
+        'error_analytics_digits': '质因数分解仅限 80 位以内；输入范围终点即可改用筛法。',
+        'nav_pi': '不超过 n 的质数个数 π(n)',
+        'nav_result_pi': '不超过 {n} 的质数共有 {p} 个。',
+        'error_pi_limit': 'π(n) 仅支持小于 2⁶³（约 9.2 × 10¹⁸）的 n。',
+        'expression_placeholder': '输入一个正整数或表达式，如 2^127-1、3*2^5000+1、F12、100!+1...',
+        'jobs': '任务',
+        'cancel_job': '取消任务',
+        'job_queued': '正在排队等待运行中的任务...',
+        'jobs_empty': '暂无任务。',
+        'divisors_pending': '正在后台查找除数...',
+        'error_nth_limit': '第 n 个质数仅支持 n 不超过 2 × 10¹⁷。'
+    },
+    'ru': {
+        'window_title': 'Проверка простых чисел',
+        'main_title': 'Анализатор простых чисел',
+        'subtitle': 'Проверьте, является ли число простым или найдите его делители',
+        'language_label': 'Язык:',
+        'theme_label': 'Тема:',
+        'check_button': 'Проверить число',
+        'input_placeholder': 'Введите положительное целое число...',
+        'ready_status': 'Готово',
+        'is_prime': 'является ПРОСТЫМ!',
+        'not_prime': 'НЕ является простым.',
+        'divisors': 'Делится на:',
+        'error_invalid': 'Пожалуйста, введите корректное положительное целое число.',
+        'processing': 'Обработка...',
+        'clear_history': 'Очистить историю',
+        'mode_single': 'Одно число',
+        'mode_range': 'Диапазон',
+        'count_only': 'Только подсчёт',
+        'range_start_placeholder': 'Начало диапазона...',
+        'range_end_placeholder': 'Конец диапазона...',
+        'range_title': 'Простые числа в [{low}, {high}]',
+        'range_count': 'Найдено простых чисел: {count}.',
+        'range_truncated': 'Показаны первые {limit}.',
+        'error_range': 'Пожалуйста, введите корректный диапазон (начало ≤ конец ≤ 10^14).',
+        'mode_batch': 'Пакет',
+        'load_file': 'Загрузить файл...',
+        'batch_placeholder': 'Вставьте числа, разделённые переводом строки или запятой...',
+        'batch_progress': 'Проверено {done}/{total} • {rate:,.0f} чисел/с',
+        'batch_invalid': 'Пропущено некорректных записей: {count}.',
+        'error_batch': 'Пожалуйста, введите хотя бы одно положительное целое число.',
+        'cache_stats': 'Кэш: попаданий {hits} • промахов {misses}',
+        'primes_only': 'Только простые',
+        'cancel_button': 'Отмена',
+        'cancelled': 'Вычисление отменено.',
+        'progress_status': 'Обработка... {percent:.0f}% • осталось {eta}',
+        'backend': 'Ответ получен через: {backend}',
+        'divisors_skipped': 'Делители не выводятся для чисел длиннее {limit} цифр.',
+        'mode_navigate': 'Навигация',
+        'nav_next': 'Следующее простое',
+        'nav_prev': 'Предыдущее простое',
+        'nav_nth': 'n-е простое',
+        'nav_twin': 'Следующие простые-близнецы',
+        'nav_gap': 'Следующий разрыв ≥ k',
+        'nth_placeholder': 'Номер простого (n)...',
+        'gap_placeholder': 'Минимальный разрыв (k)...',
+        'nav_result_next': 'Следующее простое после {n}: {p}',
+        'nav_result_prev': 'Наибольшее простое меньше {n}: {p}',
+        'nav_result_none': 'Простых чисел меньше {n} нет.',
+        'nav_result_nth': 'Простое число №{n}: {p}.',
+        'nav_result_twin': 'Первые простые-близнецы начиная с {n}: {p} и {q}.',
+        'nav_result_gap': 'Первый разрыв не меньше {k} начиная с {n}: {p} → {q} (разрыв {gap}).',
+        'error_gap': 'Введите минимальный разрыв не меньше 1.',
+        'divisors_page': 'Показано {shown} из {total} делителей.',
+        'more_divisors': 'Показать ещё {count}',
+        'diagnostics': 'Диагностика',
+        'export_metrics': 'Экспорт...',
+        'reset_metrics': 'Сбросить',
+        'metrics_empty': 'Измерений пока нет.',
+        'metrics_exported': 'Метрики записаны в {path}',
+        'export_range': 'Экспорт...',
+        'export_done': 'Записано простых чисел: {count:,} в {path} ({size:,} байт).',
+        'mode_analytics': 'Анализ',
+        'analytics_end_placeholder': 'Конец диапазона (необязательно)...',
+        'analytics_title': 'Арифметические функции числа {num}',
+        'factorization': 'Разложение:',
+        'tau_label': 'Число делителей τ(n)',
+        'sigma_label': 'Сумма делителей σ(n)',
+        'phi_label': 'Функция Эйлера φ(n)',
+        'mu_label': 'Функция Мёбиуса μ(n)',
+        'analytics_range_title': 'Арифметические функции на [{low}, {high}]',
+        'analytics_summary': 'Чисел: {count} • бесквадратных: {squarefree} • простых: {primes} • наибольшее τ(n) = {max_tau} при n = {max_tau_n}',
+        'analytics_perfect': 'Совершенные числа (σ(n) = 2n): {numbers}',
+        'error_analytics_digits': 'Разложение ограничено 80 цифрами; укажите конец диапазона, чтобы использовать решето.',
+        'nav_pi': 'Число простых до n, π(n)',
+        'nav_result_pi': 'Простых чисел до {n}: {p}.',
+        'error_pi_limit': 'π(n) вычисляется для n меньше 2⁶³ (около 9,2 × 10¹⁸).',
+        'expression_placeholder': 'Введите положительное целое число или выражение, например 2^127-1, 3*2^5000+1, F12, 100!+1...',
+        'jobs': 'Задачи',
+        'cancel_job': 'Отменить задачу',
+        'job_queued': 'В очереди за выполняемыми задачами...',
+        'jobs_empty': 'Задач пока нет.',
+        'divisors_pending': 'Делители ищутся в фоне...',
+        'error_nth_limit': 'n-е простое находится для n не больше 2 × 10¹⁷.'
+    }
+}
+
+
+LANGUAGE_NAMES = {'en': 'English', 'fa': 'فارسی', 'zh': '中文', 'ru': 'Русский'}
+
+
+class StartupProfile:
+    # Wall-clock time per startup phase, printed by --profile-startup.
+
+    def __init__(self, started=STARTED):
+        self.started = self.last = started
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self, out=sys.stderr):
+        for phase, seconds in self.phases:
+            out.write(f"{phase:28} {seconds * 1000:8.1f} ms\n")
+        out.write(f"{'total':28} {(self.last - self.started) * 1000:8.1f} ms\n")
+        out.flush()
+
+    def note(self, phase, seconds, out=sys.stderr):
+        # For work finished off the GUI thread, after the report.
+        out.write(f"{phase:28} {seconds * 1000:8.1f} ms\n")
+        out.flush()
+
+
+class IndexLoader(QThread):
+    # Opens or builds the prime index; building the default 10^8 bitmap
+    # takes about half a second, which the GUI thread must not wait for.
+    ready = pyqtSignal(object, float)
+
+    def run(self):
+        started = time.perf_counter()
+        index = load_prime_index()
+        self.ready.emit(index, time.perf_counter() - started)
+
+
+class CancellableWorker(QThread):
+    progress = pyqtSignal(float, float)
+    cancelled = pyqtSignal()
+    # Background jobs get their share of the scheduler's process pool here
+    # from start_worker(); interactive jobs run on their thread alone.
+    executor = None
+
+    def __init__(self, name, priority=INTERACTIVE, total=None):
+        super().__init__()
+        self.job = Job(name, priority, total, self.progress.emit)
+
+    def cancel(self):
+        self.job.cancel()
+
 
-class PrimeWorker(QThread):
+class PrimeWorker(CancellableWorker):
     finished = pyqtSignal(bool, list)
     error = pyqtSignal(str)
 
+    def __init__(self, number, find_divisors=True):
+        super().__init__(f"check {abbreviate(number)}")
+        self.number = number
+        self.find_divisors = find_divisors
+
+    def run(self):
+        divisors = []
+        try:
+            # Special-form tests on huge inputs report progress too.
+            with metrics.timer("primality"):
+                prime = is_prime(self.number, self.job)
+            if not prime and self.find_divisors:
+                with metrics.timer("factorization"):
+                    divisors = proper_divisors(self.number, self.job)
+        except Cancelled:
+            self.cancelled.emit()
+            return
+        except Exception as exc:
+            self.error.emit(str(exc))
+            return
+        self.finished.emit(prime, divisors)
+
+
+class FactorWorker(CancellableWorker):
+    # Divisors of a long composite whose verdict is already on screen.
+    # Rho and ECM run on this thread; SIQS sends its relation collection
+    # to the scheduler's pool.
+    finished = pyqtSignal(list)
+    error = pyqtSignal(str)
+
     def __init__(self, number):
-        super().__init__()
+        super().__init__(f"factor {abbreviate(number)}", BACKGROUND)
         self.number = number
 
     def run(self):
-        if self.number <= 1:
-            self.finished.emit(False, [])
+        try:
+            with metrics.timer("factorization"):
+                divisors = proper_divisors(self.number, self.job, self.executor)
+        except Cancelled:
+            self.cancelled.emit()
             return
-        if self.number <= 3:
-            self.finished.emit(True, [])
+        except Exception as exc:
+            self.error.emit(str(exc))
             return
+        self.finished.emit(divisors)
 
-        divisors = []
-        sqrt_n = int(math.sqrt(self.number)) + 1
-
-        if self.number % 2 == 0:
-            divisors.append(2)
-            if self.number // 2 != 2:
-                divisors.append(self.number // 2)
-        elif self.number % 3 == 0:
-            divisors.append(3)
-            if self.number // 3 != 3:
-                divisors.append(self.number // 3)
-
-        for i in range(5, sqrt_n, 6):
-            if self.number % i == 0:
-                divisors.append(i)
-                if self.number // i != i:
-                    divisors.append(self.number // i)
-            if self.number % (i + 2) == 0:
-                divisors.append(i + 2)
-                if self.number // (i + 2) != i + 2:
-                    divisors.append(self.number // (i + 2))
-
-        is_prime = len(divisors) == 0
-        divisors.sort()
-        self.finished.emit(is_prime, divisors)
-
-
-class HistoryManager:
-    def __init__(self):
-        self.history_file = "prime_history.json"
-        self.history = self.load_history()
-
-    def load_history(self):
-        if os.path.exists(self.history_file):
-            try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
-
-    def save_history(self):
-        with open(self.history_file, 'w', encoding='utf-8') as f:
-            json.dump(self.history, f, ensure_ascii=False, indent=2)
-
-    def add_entry(self, number, is_prime, divisors, lang):
-        entry = {
-            "timestamp": datetime.now().isoformat(),
-            "number": number,
-            "is_prime": is_prime,
-            "divisors": divisors,
-            "language": lang
-        }
-        self.history.insert(0, entry)
-        self.history = self.history[:100]
-        self.save_history()
 
-    def get_history(self):
-        return self.history
+class RangeWorker(CancellableWorker):
+    chunk = pyqtSignal(list)
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
 
-    def clear_history(self):
-        self.history = []
-        self.save_history()
+    def __init__(self, low, high, count_only=False, list_limit=RANGE_DISPLAY_LIMIT):
+        super().__init__(f"{'count' if count_only else 'range'} {low}..{high}", BACKGROUND, high - low + 1)
+        self.low = low
+        self.high = high
+        self.count_only = count_only
+        self.list_limit = list_limit
+
+    def run(self):
+        # Large ranges are sieved on every core; segments still arrive in order.
+        sieve = ParallelSieve(self.low, self.high, executor=self.executor)
+        head = [2] if sieve.includes_two() else []
+        total = 0
+
+        # Primes are streamed until the display limit is reached; past that the
+        # segments are only counted, so nothing is materialised.
+        started = time.perf_counter()
+        try:
+            for start, flags in sieve.segments(self.job):
+                if self.count_only or total >= self.list_limit:
+                    total += flags.count(1)
+                    continue
+                primes = head + segment_primes(start, flags)
+                head = []
+                if primes:
+                    self.chunk.emit(primes[:self.list_limit - total])
+                total += len(primes)
+        except Cancelled:
+            self.cancelled.emit()
+            return
+        except Exception as exc:
+            self.error.emit(str(exc))
+            return
+        metrics.observe("sieve", time.perf_counter() - started)
+        if head and not self.count_only:
+            self.chunk.emit(head)
+        self.finished.emit(total + len(head))
+
+
+class NavigateWorker(CancellableWorker):
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, query, number, gap=0):
+        super().__init__(f"{query} {number}")
+        self.query = query
+        self.number = number
+        self.gap = gap
+
+    def run(self):
+        # All queries share the engine's sieve window, so stepping through
+        # neighbouring numbers reuses the segments sieved last time.
+        started = time.perf_counter()
+        try:
+            if self.query == 'next':
+                result = next_prime(self.number, progress=self.job)
+            elif self.query == 'prev':
+                result = prev_prime(self.number, progress=self.job)
+            elif self.query == 'nth':
+                result = nth_prime(self.number, progress=self.job)
+            elif self.query == 'pi':
+                result = prime_pi(self.number, progress=self.job)
+            elif self.query == 'twin':
+                result = twin_primes(self.number, progress=self.job)
+            else:
+                result = prime_gap(self.number, self.gap, progress=self.job)
+        except Cancelled:
+            self.cancelled.emit()
+            return
+        except Exception as exc:
+            self.error.emit(str(exc))
+            return
+        metrics.observe("navigation", time.perf_counter() - started)
+        self.finished.emit(result)
+
+
+class ExportWorker(CancellableWorker):
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, low, high, path, fmt):
+        super().__init__(f"export {low}..{high}", BACKGROUND, high - low + 1)
+        self.low = low
+        self.high = high
+        self.path = path
+        self.fmt = fmt
+
+    def run(self):
+        try:
+            with metrics.timer("export"):
+                count = export_primes(self.path, self.low, self.high, self.fmt, progress=self.job, executor=self.executor)
+        except Cancelled:
+            self.cancelled.emit()
+            return
+        except Exception as exc:
+            self.error.emit(str(exc))
+            return
+        self.finished.emit(count)
+
+
+class AnalyticsWorker(CancellableWorker):
+    chunk = pyqtSignal(list)
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, low, high=None, list_limit=RANGE_DISPLAY_LIMIT):
+        if high is None:
+            super().__init__(f"analyze {low}")
+        else:
+            super().__init__(f"analytics {low}..{high}", BACKGROUND, high - low + 1)
+        self.low = low
+        self.high = high
+        self.list_limit = list_limit
+
+    def run(self):
+        # A single number is factorized; a range goes through the segmented
+        # divisor-function sieve, showing the first rows and summarising all.
+        try:
+            if self.high is None:
+                with metrics.timer("factorization"):
+                    result = analyze(self.low, self.job)
+                self.finished.emit(result)
+                return
+            summary = {"count": 0, "squarefree": 0, "primes": 0, "perfect": [], "max_tau": 0, "max_tau_n": None}
+            started = time.perf_counter()
+            for rows in iter_arithmetic(self.low, self.high, progress=self.job):
+                room = self.list_limit - summary["count"]
+                if room > 0:
+                    self.chunk.emit(rows[:room])
+                for n, tau, sigma, phi, mu in rows:
+                    if mu:
+                        summary["squarefree"] += 1
+                    if tau == 2:
+                        summary["primes"] += 1
+                    if sigma == 2 * n:
+                        summary["perfect"].append(n)
+                    if tau > summary["max_tau"]:
+                        summary["max_tau"], summary["max_tau_n"] = tau, n
+                summary["count"] += len(rows)
+            metrics.observe("arithmetic", time.perf_counter() - started)
+        except Cancelled:
+            self.cancelled.emit()
+            return
+        except Exception as exc:
+            self.error.emit(str(exc))
+            return
+        self.finished.emit(summary)
+
+
+class BatchWorker(CancellableWorker):
+    results = pyqtSignal(list)
+    rate = pyqtSignal(int, int, float)
+    finished = pyqtSignal(int)
+    error = pyqtSignal(str)
+
+    def __init__(self, numbers):
+        super().__init__(f"batch of {len(numbers)}", BACKGROUND, len(numbers))
+        self.numbers = numbers
+
+    def run(self):
+        total = len(self.numbers)
+        done = 0
+        started = time.perf_counter()
+        try:
+            chunk_started = started
+            for chunk in iter_batch_results(self.numbers, progress=self.job, executor=self.executor):
+                done += len(chunk)
+                now = time.perf_counter()
+                metrics.observe("batch_chunk", now - chunk_started)
+                chunk_started = now
+                elapsed = now - started
+                self.results.emit(chunk)
+                self.rate.emit(done, total, done / elapsed if elapsed else 0.0)
+        except Cancelled:
+            self.cancelled.emit()
+            return
+        except Exception as exc:
+            self.error.emit(str(exc))
+            return
+        self.finished.emit(done)
 
 
 class PrimeCheckerApp(QMainWindow):
     language_changed = pyqtSignal(str)
 
-    def __init__(self):
+    def __init__(self, profile=None):
         super().__init__()
+        self.report_startup = profile is not None
+        self.profile = profile or StartupProfile()
         self.translators = {}
         self.current_lang = 'en'
+        self.texts = TRANSLATIONS['en']
+        # Full window stylesheet per theme, built on first use.
+        self.stylesheets = {}
         self.dark_mode = False
         self.theme = 'system'
-        self.history_manager = HistoryManager()
+        # History and the prime index are opened by finish_startup() once the
+        # window is on screen. Writes then go through a background queue and
+        # the panel is redrawn from a timer once the writer reports a commit.
+        self.history_manager = None
+        self.history_writer = None
+        self.history_dirty = False
+        self.prime_index = None
+        self.index_loader = IndexLoader(self)
+        self.index_loader.ready.connect(self.install_prime_index)
+        self.pending_divisors = []
+        self.divisor_total = 0
+        self.pending_batch_lines = []
+        self.batch_shown = 0
+        self.batch_numbers = []
+        self.batch_cached = {}
+        self.batch_next = 0
+        self.cache = ResultCache()
+        # self.worker is the job whose output the result area shows; every
+        # job, including background ones no longer on screen, stays in
+        # self.workers until its thread is done.
+        self.scheduler = JobScheduler()
         self.worker = None
+        self.workers = []
+        self.batch_offset = 0
+        # Set when a single-number check starts; show_result records the
+        # end-to-end latency from it.
+        self.check_started = None
+        self.profile.mark("window: state and cache")
         self.init_ui()
-        self.load_translations()
+        self.profile.mark("window: widgets")
         self.apply_language('en')
         self.apply_theme()
+        self.profile.mark("window: language and theme")
+
+        self.history_timer = QTimer(self)
+        self.history_timer.setInterval(HISTORY_REFRESH_MS)
+        self.history_timer.timeout.connect(self.refresh_history_if_dirty)
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.setInterval(RENDER_INTERVAL_MS)
+        self.render_timer.timeout.connect(self.flush_batch_lines)
+        self.diagnostics_timer = QTimer(self)
+        self.diagnostics_timer.setInterval(DIAGNOSTICS_REFRESH_MS)
+        self.diagnostics_timer.timeout.connect(self.update_diagnostics)
+        self.jobs_timer = QTimer(self)
+        self.jobs_timer.setInterval(JOBS_REFRESH_MS)
+        self.jobs_timer.timeout.connect(self.update_jobs_view)
+
+    def finish_startup(self):
+        # Runs from the event loop right after the first show; none of this
+        # is needed to draw the window or accept input.
+        self.profile.mark("first event loop pass")
+        self.history_manager = HistoryManager()
+        self.history_writer = HistoryWriter(on_commit=self.mark_history_dirty)
+        self.update_history_display()
+        self.history_timer.start()
+        self.profile.mark("deferred: history")
+        self.index_loader.start()
+        if self.report_startup:
+            self.profile.report()
+
+    def install_prime_index(self, index, seconds):
+        # Lookups below the bound go through the index from here on.
+        install_index(index)
+        self.prime_index = index
+        if self.report_startup:
+            self.profile.note("background: prime index", seconds)
 
     def init_ui(self):
         self.setWindowTitle("Prime Number Checker")
@@ -140,12 +799,20 @@ class PrimeCheckerApp(QMainWindow):
         history_panel = self.create_history_panel()
         main_layout.addWidget(history_panel)
 
+        # Diagnostics, hidden until enabled from the footer
+        self.diagnostics_panel = self.create_diagnostics_panel()
+        self.diagnostics_panel.setVisible(False)
+        main_layout.addWidget(self.diagnostics_panel)
+
+        # Job queue, hidden until enabled from the footer
+        self.jobs_panel = self.create_jobs_panel()
+        self.jobs_panel.setVisible(False)
+        main_layout.addWidget(self.jobs_panel)
+
         # Footer
         footer = self.create_footer()
         main_layout.addWidget(footer)
 
-        self.setStyleSheet(self.get_base_styles())
-
     def create_header(self):
         frame = QFrame()
         frame.setFrameShape(QFrame.Shape.StyledPanel)
@@ -163,6 +830,7 @@ class PrimeCheckerApp(QMainWindow):
         title = QLabel("Prime Number Analyzer")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         title.setObjectName("title_label")
+        self.title_label = title
         font = QFont("Segoe UI", 26, QFont.Weight.Bold)
         title.setFont(font)
         title.setStyleSheet("color: white;")
@@ -170,6 +838,7 @@ class PrimeCheckerApp(QMainWindow):
         subtitle = QLabel("Check if a number is prime or find its divisors")
         subtitle.setAlignment(Qt.AlignmentFlag.AlignCenter)
         subtitle.setObjectName("subtitle_label")
+        self.subtitle_label = subtitle
         subtitle_font = QFont("Segoe UI", 11)
         subtitle.setFont(subtitle_font)
         subtitle.setStyleSheet("color: #f0f0f0;")
@@ -205,6 +874,7 @@ class PrimeCheckerApp(QMainWindow):
 
         lang_label = QLabel("Language:")
         lang_label.setStyleSheet("color: #2c3e50; font-weight: bold;")
+        self.lang_label = lang_label
         self.lang_combo = QComboBox()
         self.lang_combo.addItems([
             "English", "فارسی", "中文", "Русский"
@@ -215,6 +885,7 @@ class PrimeCheckerApp(QMainWindow):
 
         theme_label = QLabel("Theme:")
         theme_label.setStyleSheet("color: #2c3e50; font-weight: bold;")
+        self.theme_label = theme_label
         self.theme_combo = QComboBox()
         self.theme_combo.addItems([
             "System Default", "Light", "Dark", "Blue", "Red"
@@ -244,6 +915,42 @@ class PrimeCheckerApp(QMainWindow):
         """)
         layout = QVBoxLayout(group)
 
+        mode_layout = QHBoxLayout()
+        self.single_radio = QRadioButton("Single Number")
+        self.range_radio = QRadioButton("Range")
+        self.batch_radio = QRadioButton("Batch")
+        self.nav_radio = QRadioButton("Navigate")
+        self.analytics_radio = QRadioButton("Analytics")
+        self.single_radio.setChecked(True)
+        self.mode_group = QButtonGroup(self)
+        self.mode_group.addButton(self.single_radio)
+        self.mode_group.addButton(self.range_radio)
+        self.mode_group.addButton(self.batch_radio)
+        self.mode_group.addButton(self.nav_radio)
+        self.mode_group.addButton(self.analytics_radio)
+        self.mode_group.buttonToggled.connect(self.change_mode)
+        self.nav_combo = QComboBox()
+        for query in NAV_QUERIES:
+            self.nav_combo.addItem(query, query)
+        self.nav_combo.currentIndexChanged.connect(self.update_mode_widgets)
+        self.nav_combo.setVisible(False)
+        self.count_only_check = QCheckBox("Count only")
+        self.count_only_check.setVisible(False)
+        self.export_range_btn = QPushButton("Export...")
+        self.export_range_btn.setStyleSheet(self.get_button_style("#8e44ad"))
+        self.export_range_btn.clicked.connect(self.export_range)
+        self.export_range_btn.setVisible(False)
+
+        mode_layout.addWidget(self.single_radio)
+        mode_layout.addWidget(self.range_radio)
+        mode_layout.addWidget(self.batch_radio)
+        mode_layout.addWidget(self.nav_radio)
+        mode_layout.addWidget(self.analytics_radio)
+        mode_layout.addSpacerItem(QSpacerItem(40, 20, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum))
+        mode_layout.addWidget(self.count_only_check)
+        mode_layout.addWidget(self.export_range_btn)
+        mode_layout.addWidget(self.nav_combo)
+
         input_layout = QHBoxLayout()
         self.input_field = QLineEdit()
         self.input_field.setPlaceholderText("Enter a positive integer...")
@@ -251,17 +958,59 @@ class PrimeCheckerApp(QMainWindow):
         self.input_field.setFont(QFont("Segoe UI", 13))
         self.input_field.setStyleSheet(self.get_input_style())
 
+        self.range_end_field = QLineEdit()
+        self.range_end_field.setPlaceholderText("Range end...")
+        self.range_end_field.setMinimumHeight(55)
+        self.range_end_field.setFont(QFont("Segoe UI", 13))
+        self.range_end_field.setStyleSheet(self.get_input_style())
+        self.range_end_field.setVisible(False)
+
         check_btn = QPushButton("Check Number")
         check_btn.setMinimumHeight(55)
         check_btn.setMinimumWidth(190)
         check_btn.setFont(QFont("Segoe UI", 12, QFont.Weight.Bold))
         check_btn.clicked.connect(self.check_prime)
         check_btn.setStyleSheet(self.get_button_style())
+        self.check_btn = check_btn
+
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setMinimumHeight(55)
+        self.cancel_btn.setFont(QFont("Segoe UI", 12, QFont.Weight.Bold))
+        self.cancel_btn.clicked.connect(self.cancel_check)
+        self.cancel_btn.setStyleSheet(self.get_button_style("#e67e22"))
+        self.cancel_btn.setVisible(False)
+
+        self.batch_input = QTextEdit()
+        self.batch_input.setPlaceholderText("Paste numbers separated by new lines or commas...")
+        self.batch_input.setMaximumHeight(110)
+        self.batch_input.setFont(QFont("Consolas", 11))
+        self.batch_input.setVisible(False)
+
+        self.load_file_btn = QPushButton("Load File...")
+        self.load_file_btn.setStyleSheet(self.get_button_style("#7f8c8d"))
+        self.load_file_btn.clicked.connect(self.load_batch_file)
+        self.load_file_btn.setVisible(False)
+
+        self.batch_progress = QProgressBar()
+        self.batch_progress.setVisible(False)
+        self.batch_rate_label = QLabel()
+        self.batch_rate_label.setStyleSheet("color: #2c3e50;")
+        self.batch_rate_label.setVisible(False)
 
         input_layout.addWidget(self.input_field)
+        input_layout.addWidget(self.range_end_field)
+        input_layout.addWidget(self.batch_input)
         input_layout.addWidget(check_btn)
+        input_layout.addWidget(self.cancel_btn)
 
+        batch_layout = QHBoxLayout()
+        batch_layout.addWidget(self.load_file_btn)
+        batch_layout.addWidget(self.batch_progress)
+        batch_layout.addWidget(self.batch_rate_label)
+
+        layout.addLayout(mode_layout)
         layout.addLayout(input_layout)
+        layout.addLayout(batch_layout)
         return group
 
     def create_result_section(self):
@@ -280,6 +1029,8 @@ class PrimeCheckerApp(QMainWindow):
 
         self.result_display = QTextEdit()
         self.result_display.setReadOnly(True)
+        # Long numbers have no spaces to break at.
+        self.result_display.setWordWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
         self.result_display.setFont(QFont("Consolas", 12))
         self.result_display.setPlaceholderText("Results will appear here...")
         self.result_display.setStyleSheet("""
@@ -291,7 +1042,13 @@ class PrimeCheckerApp(QMainWindow):
             }
         """)
 
+        self.more_divisors_btn = QPushButton()
+        self.more_divisors_btn.setStyleSheet(self.get_button_style("#7f8c8d"))
+        self.more_divisors_btn.clicked.connect(self.show_more_divisors)
+        self.more_divisors_btn.setVisible(False)
+
         layout.addWidget(self.result_display)
+        layout.addWidget(self.more_divisors_btn)
         return group
 
     def create_history_panel(self):
@@ -326,19 +1083,97 @@ class PrimeCheckerApp(QMainWindow):
                 font-size: 11px;
             }
         """)
-        self.update_history_display()
 
         clear_btn = QPushButton("Clear History")
         clear_btn.setStyleSheet(self.get_button_style("#e74c3c"))
         clear_btn.clicked.connect(self.clear_history)
+        self.clear_btn = clear_btn
+
+        self.primes_only_check = QCheckBox("Primes only")
+        self.primes_only_check.toggled.connect(self.update_history_display)
+
+        side = QVBoxLayout()
+        side.addWidget(clear_btn)
+        side.addWidget(self.primes_only_check)
+        side.addStretch()
 
         hbox = QHBoxLayout()
         hbox.addWidget(self.history_list)
-        hbox.addWidget(clear_btn, alignment=Qt.AlignmentFlag.AlignTop)
+        hbox.addLayout(side)
 
         layout.addLayout(hbox)
         return group
 
+    def create_diagnostics_panel(self):
+        group = QGroupBox("Diagnostics")
+        group.setStyleSheet("""
+            QGroupBox {
+                border: 2px solid #bdc3c7;
+                border-radius: 14px;
+                margin: 8px;
+                padding: 12px;
+                background-color: #f8f9fa;
+            }
+            QGroupBox::title {
+                subcontrol-origin: margin;
+                subcontrol-position: top left;
+                padding: 0 12px;
+                color: #2c3e50;
+            }
+        """)
+        self.diagnostics_group = group
+        layout = QHBoxLayout(group)
+
+        self.diagnostics_view = QTextEdit()
+        self.diagnostics_view.setReadOnly(True)
+        self.diagnostics_view.setMaximumHeight(140)
+        self.diagnostics_view.setFont(QFont("Consolas", 10))
+        self.diagnostics_view.setWordWrapMode(QTextOption.WrapMode.NoWrap)
+
+        self.export_metrics_btn = QPushButton("Export...")
+        self.export_metrics_btn.setStyleSheet(self.get_button_style("#8e44ad"))
+        self.export_metrics_btn.clicked.connect(self.export_metrics)
+
+        self.reset_metrics_btn = QPushButton("Reset")
+        self.reset_metrics_btn.setStyleSheet(self.get_button_style("#7f8c8d"))
+        self.reset_metrics_btn.clicked.connect(self.reset_metrics)
+
+        side = QVBoxLayout()
+        side.addWidget(self.export_metrics_btn)
+        side.addWidget(self.reset_metrics_btn)
+        side.addStretch()
+
+        layout.addWidget(self.diagnostics_view)
+        layout.addLayout(side)
+        return group
+
+    def create_jobs_panel(self):
+        group = QGroupBox("Jobs")
+        group.setStyleSheet(self.diagnostics_group.styleSheet())
+        self.jobs_group = group
+        layout = QHBoxLayout(group)
+
+        table = QVBoxLayout()
+        header = QLabel(TABLE_HEADER)
+        header.setFont(QFont("Consolas", 10))
+        self.jobs_list = QListWidget()
+        self.jobs_list.setMaximumHeight(140)
+        self.jobs_list.setFont(QFont("Consolas", 10))
+        table.addWidget(header)
+        table.addWidget(self.jobs_list)
+
+        self.cancel_job_btn = QPushButton("Cancel job")
+        self.cancel_job_btn.setStyleSheet(self.get_button_style("#e74c3c"))
+        self.cancel_job_btn.clicked.connect(self.cancel_selected_job)
+
+        side = QVBoxLayout()
+        side.addWidget(self.cancel_job_btn)
+        side.addStretch()
+
+        layout.addLayout(table)
+        layout.addLayout(side)
+        return group
+
     def create_footer(self):
         frame = QFrame()
         frame.setMinimumHeight(55)
@@ -354,24 +1189,36 @@ class PrimeCheckerApp(QMainWindow):
         status = QLabel("Ready")
         status.setObjectName("status_label")
         status.setStyleSheet("color: #27ae60; font-weight: bold;")
+        self.status_label = status
 
         version = QLabel("v2.1.0")
         version.setObjectName("version_label")
         version.setStyleSheet("color: #7f8c8d;")
 
+        self.cache_label = QLabel()
+        self.cache_label.setObjectName("cache_label")
+        self.cache_label.setStyleSheet("color: #7f8c8d;")
+
+        self.diagnostics_check = QCheckBox("Diagnostics")
+        self.diagnostics_check.toggled.connect(self.toggle_diagnostics)
+
+        self.jobs_check = QCheckBox("Jobs")
+        self.jobs_check.toggled.connect(self.toggle_jobs)
+
         layout.addWidget(status)
         layout.addSpacerItem(QSpacerItem(40, 20, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum))
+        layout.addWidget(self.cache_label)
+        layout.addWidget(self.jobs_check)
+        layout.addWidget(self.diagnostics_check)
         layout.addWidget(version)
 
         return frame
 
-    def load_translations(self):
-        self.translators = {
-            'en': self.create_translator('en', 'English'),
-            'fa': self.create_translator('fa', 'فارسی'),
-            'zh': self.create_translator('zh', '中文'),
-            'ru': self.create_translator('ru', 'Русский')
-        }
+    def translator_for(self, lang):
+        # Translators are created the first time their language is selected.
+        if lang not in self.translators:
+            self.translators[lang] = self.create_translator(lang, LANGUAGE_NAMES[lang])
+        return self.translators[lang]
 
     def create_translator(self, lang_code, native_name):
         translator = QTranslator()
@@ -379,114 +1226,56 @@ class PrimeCheckerApp(QMainWindow):
 
     def apply_language(self, lang):
         self.current_lang = lang
-        texts = self.get_translations(lang)
+        self.texts = texts = self.get_translations(lang)
+        self.translator_for(lang)
 
         self.setWindowTitle(texts['window_title'])
-        self.findChild(QLabel, "title_label").setText(texts['main_title'])
-        self.findChild(QLabel, "subtitle_label").setText(texts['subtitle'])
-
-        # Update controls labels
-        all_labels = self.findChildren(QLabel)
-        for label in all_labels:
-            if label.text().startswith("Language") or label.text().startswith("زبان") or label.text().startswith("语言") or label.text().startswith("Язык"):
-                label.setText(texts['language_label'])
-            elif label.text().startswith("Theme") or label.text().startswith("تم") or label.text().startswith("主题") or label.text().startswith("Тема"):
-                label.setText(texts['theme_label'])
-
-        # Update buttons
-        for btn in self.findChildren(QPushButton):
-            current_text = btn.text()
-            if any(x in current_text for x in ["Check", "بررسی", "检查", "Проверить"]):
-                btn.setText(texts['check_button'])
-            elif any(x in current_text for x in ["Clear", "پاک", "清除", "Очистить"]):
-                btn.setText(texts['clear_history'])
-
-        self.input_field.setPlaceholderText(texts['input_placeholder'])
-        self.findChild(QLabel, "status_label").setText(texts['ready_status'])
+        self.title_label.setText(texts['main_title'])
+        self.subtitle_label.setText(texts['subtitle'])
+        self.lang_label.setText(texts['language_label'])
+        self.theme_label.setText(texts['theme_label'])
+        self.check_btn.setText(texts['check_button'])
+        self.clear_btn.setText(texts['clear_history'])
+
+        self.single_radio.setText(texts['mode_single'])
+        self.range_radio.setText(texts['mode_range'])
+        self.batch_radio.setText(texts['mode_batch'])
+        self.nav_radio.setText(texts['mode_navigate'])
+        self.analytics_radio.setText(texts['mode_analytics'])
+        for i, query in enumerate(NAV_QUERIES):
+            self.nav_combo.setItemText(i, texts['nav_' + query])
+        self.load_file_btn.setText(texts['load_file'])
+        self.batch_input.setPlaceholderText(texts['batch_placeholder'])
+        self.count_only_check.setText(texts['count_only'])
+        self.export_range_btn.setText(texts['export_range'])
+        self.primes_only_check.setText(texts['primes_only'])
+        self.cancel_btn.setText(texts['cancel_button'])
+        self.diagnostics_check.setText(texts['diagnostics'])
+        self.diagnostics_group.setTitle(texts['diagnostics'])
+        self.export_metrics_btn.setText(texts['export_metrics'])
+        self.reset_metrics_btn.setText(texts['reset_metrics'])
+        self.jobs_check.setText(texts['jobs'])
+        self.jobs_group.setTitle(texts['jobs'])
+        self.cancel_job_btn.setText(texts['cancel_job'])
+        self.update_input_placeholders()
+        self.status_label.setText(texts['ready_status'])
+        self.update_cache_status()
 
         # RTL for Persian
         if lang == 'fa':
             self.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
             self.input_field.setAlignment(Qt.AlignmentFlag.AlignRight)
+            self.range_end_field.setAlignment(Qt.AlignmentFlag.AlignRight)
         else:
             self.setLayoutDirection(Qt.LayoutDirection.LeftToRight)
             self.input_field.setAlignment(Qt.AlignmentFlag.AlignLeft)
+            self.range_end_field.setAlignment(Qt.AlignmentFlag.AlignLeft)
 
         self.language_changed.emit(lang)
-        self.update_history_display()
+        self.history_dirty = True
 
     def get_translations(self, lang):
-        translations = {
-            'en': {
-                'window_title': 'Prime Number Checker',
-                'main_title': 'Prime Number Analyzer',
-                'subtitle': 'Check if a number is prime or find its divisors',
-                'language_label': 'Language:',
-                'theme_label': 'Theme:',
-                'check_button': 'Check Number',
-                'input_placeholder': 'Enter a positive integer...',
-                'ready_status': 'Ready',
-                'is_prime': 'is PRIME!',
-                'not_prime': 'is NOT prime.',
-                'divisors': 'Divisible by:',
-                'error_invalid': 'Please enter a valid positive integer.',
-                'error_large': 'Number is too large to process efficiently.',
-                'processing': 'Processing...',
-                'clear_history': 'Clear History'
-            },
-            'fa': {
-                'window_title': 'بررسی اعداد اول',
-                'main_title': 'تحلیلگر اعداد اول',
-                'subtitle': 'بررسی کنید که آیا عدد اول است یا مقسوم‌علیه‌های آن را بیابید',
-                'language_label': 'زبان:',
-                'theme_label': 'تم:',
-                'check_button': 'بررسی عدد',
-                'input_placeholder': 'یک عدد صحیح مثبت وارد کنید...',
-                'ready_status': 'آماده',
-                'is_prime': 'عدد اول است!',
-                'not_prime': 'عدد اول نیست.',
-                'divisors': 'قابل تقسیم بر:',
-                'error_invalid': 'لطفاً یک عدد صحیح مثبت معتبر وارد کنید.',
-                'error_large': 'عدد خیلی بزرگ است و پردازش آن زمان‌بر است.',
-                'processing': 'در حال پردازش...',
-                'clear_history': 'پاک کردن تاریخچه'
-            },
-            'zh': {
-                'window_title': '质数检查器',
-                'main_title': '质数分析器',
-                'subtitle': '检查一个数字是否为质数或找到它的除数',
-                'language_label': '语言：',
-                'theme_label': '主题：',
-                'check_button': '检查数字',
-                'input_placeholder': '输入一个正整数...',
-                'ready_status': '就绪',
-                'is_prime': '是质数！',
-                'not_prime': '不是质数。',
-                'divisors': '可被整除：',
-                'error_invalid': '请输入有效的正整数。',
-                'error_large': '数字太大，处理效率低下。',
-                'processing': '处理中...',
-                'clear_history': '清除历史'
-            },
-            'ru': {
-                'window_title': 'Проверка простых чисел',
-                'main_title': 'Анализатор простых чисел',
-                'subtitle': 'Проверьте, является ли число простым или найдите его делители',
-                'language_label': 'Язык:',
-                'theme_label': 'Тема:',
-                'check_button': 'Проверить число',
-                'input_placeholder': 'Введите положительное целое число...',
-                'ready_status': 'Готово',
-                'is_prime': 'является ПРОСТЫМ!',
-                'not_prime': 'НЕ является простым.',
-                'divisors': 'Делится на:',
-                'error_invalid': 'Пожалуйста, введите корректное положительное целое число.',
-                'error_large': 'Число слишком велико для эффективной обработки.',
-                'processing': 'Обработка...',
-                'clear_history': 'Очистить историю'
-            }
-        }
-        return translations.get(lang, translations['en'])
+        return TRANSLATIONS.get(lang, TRANSLATIONS['en'])
 
     def change_language(self, index):
         languages = ['en', 'fa', 'zh', 'ru']
@@ -500,8 +1289,10 @@ class PrimeCheckerApp(QMainWindow):
             self.apply_theme()
 
     def apply_theme(self):
-        style = self.get_theme_style(self.theme)
-        self.setStyleSheet(self.get_base_styles() + style)
+        style = self.stylesheets.get(self.theme)
+        if style is None:
+            style = self.stylesheets[self.theme] = self.get_base_styles() + self.get_theme_style(self.theme)
+        self.setStyleSheet(style)
         self.update()
 
     def get_base_styles(self):
@@ -646,51 +1437,514 @@ class PrimeCheckerApp(QMainWindow):
             }}
             """
 
+    def change_mode(self, button, checked):
+        if checked:
+            self.update_mode_widgets()
+
+    def update_mode_widgets(self):
+        range_mode = self.range_radio.isChecked()
+        batch_mode = self.batch_radio.isChecked()
+        nav_mode = self.nav_radio.isChecked()
+        gap_query = nav_mode and self.nav_combo.currentData() == 'gap'
+        analytics_mode = self.analytics_radio.isChecked()
+        self.input_field.setVisible(not batch_mode)
+        self.range_end_field.setVisible(range_mode or gap_query or analytics_mode)
+        self.count_only_check.setVisible(range_mode)
+        self.export_range_btn.setVisible(range_mode)
+        self.nav_combo.setVisible(nav_mode)
+        self.batch_input.setVisible(batch_mode)
+        self.load_file_btn.setVisible(batch_mode)
+        self.batch_progress.setVisible(batch_mode)
+        self.batch_rate_label.setVisible(batch_mode)
+        self.update_input_placeholders()
+
+    def update_input_placeholders(self):
+        texts = self.texts
+        nav_mode = self.nav_radio.isChecked()
+        if self.range_radio.isChecked():
+            self.input_field.setPlaceholderText(texts['range_start_placeholder'])
+        elif nav_mode and self.nav_combo.currentData() == 'nth':
+            self.input_field.setPlaceholderText(texts['nth_placeholder'])
+        elif self.single_radio.isChecked():
+            self.input_field.setPlaceholderText(texts['expression_placeholder'])
+        else:
+            self.input_field.setPlaceholderText(texts['input_placeholder'])
+        if nav_mode:
+            self.range_end_field.setPlaceholderText(texts['gap_placeholder'])
+        elif self.analytics_radio.isChecked():
+            self.range_end_field.setPlaceholderText(texts['analytics_end_placeholder'])
+        else:
+            self.range_end_field.setPlaceholderText(texts['range_end_placeholder'])
+
+    def start_worker(self, worker):
+        # The new job takes over the result area and goes to the scheduler:
+        # interactive jobs start at once, background ones when a slot is free.
+        # Keep a reference to every thread that is still running so replacing
+        # self.worker never destroys a live QThread.
+        self.cancel_worker()
+        self.workers = [w for w in self.workers if w.isRunning() or w.job.state == "queued"]
+        self.workers.append(worker)
+        self.worker = worker
+        if worker.job.priority == BACKGROUND:
+            worker.executor = self.scheduler.executor(worker.job)
+
+        worker.progress.connect(self.for_current(worker, self.update_progress_status))
+        worker.cancelled.connect(self.for_current(worker, self.worker_done))
+        worker.finished.connect(self.for_current(worker, self.worker_done))
+        worker.error.connect(self.for_current(worker, self.worker_done))
+        worker.error.connect(self.for_current(worker, self.result_display.append))
+        worker.cancelled.connect(lambda: self.job_done(worker, "cancelled"))
+        worker.finished.connect(lambda *args: self.job_done(worker, "done"))
+        worker.error.connect(lambda *args: self.job_done(worker, "failed"))
+        self.scheduler.submit(worker.job)
+        self.start_admitted_jobs()
+        self.status_label.setText(self.tr("processing" if worker.job.state == "running" else "job_queued"))
+        self.cancel_btn.setVisible(True)
+
+    def start_admitted_jobs(self):
+        started = self.scheduler.admit()
+        for worker in self.workers:
+            if worker.job in started:
+                worker.start()
+        self.update_jobs_view()
+
+    def job_done(self, worker, state):
+        self.scheduler.finish(worker.job, state)
+        self.start_admitted_jobs()
+
+    def for_current(self, worker, slot):
+        # Drops signals from workers that were cancelled or replaced by a newer request.
+        return lambda *args: slot(*args) if worker is self.worker else None
+
+    def cancel_worker(self):
+        # A new request replaces the job on screen. An interactive one is
+        # cancelled; a background one keeps running in the job queue.
+        if self.worker is not None and self.worker.job.priority == INTERACTIVE:
+            self.scheduler.cancel(self.worker.job)
+        self.worker = None
+        self.worker_done()
+
+    def cancel_check(self):
+        worker = self.worker
+        active = worker is not None and worker.job.state in ("queued", "running")
+        if active:
+            self.scheduler.cancel(worker.job)
+        self.cancel_worker()
+        self.update_jobs_view()
+        if active:
+            self.result_display.append(self.tr("cancelled"))
+
+    def worker_done(self, *args):
+        self.cancel_btn.setVisible(False)
+        self.status_label.setText(self.tr("ready_status"))
+
+    def update_progress_status(self, percent, eta):
+        texts = self.texts
+        self.status_label.setText(texts['progress_status'].format(percent=percent, eta=format_eta(eta)))
+
+    def closeEvent(self, event):
+        for worker in self.workers:
+            worker.cancel()
+        for worker in self.workers:
+            worker.wait()
+        self.scheduler.shutdown()
+        self.index_loader.wait()
+        if self.history_writer is not None:
+            self.history_writer.close()
+        super().closeEvent(event)
+
     def check_prime(self):
-        text = self.input_field.text().strip()
-        if not text.isdigit():
+        self.cancel_worker()
+        self.check_started = None
+        self.render_timer.stop()
+        self.pending_batch_lines = []
+        self.pending_divisors = []
+        self.more_divisors_btn.setVisible(False)
+        if self.range_radio.isChecked():
+            self.check_range()
+            return
+        if self.batch_radio.isChecked():
+            self.check_batch()
+            return
+        if self.nav_radio.isChecked():
+            self.check_navigation()
+            return
+        if self.analytics_radio.isChecked():
+            self.check_analytics()
+            return
+
+        try:
+            num = parse_number(self.input_field.text())
+        except ExpressionError:
             self.show_error("error_invalid")
             return
 
-        num = int(text)
+        self.check_started = time.perf_counter()
         if num <= 0:
             self.show_error("error_invalid")
             return
         if num == 1:
             self.show_result(1, False, [])
             return
-        if num > 10**12:
-            self.show_error("error_large")
+
+        digits = decimal_digits(num)
+        find_divisors = digits <= DIVISOR_DIGIT_LIMIT
+        with metrics.timer("cache_lookup"):
+            cached = self.cache.get(num, need_divisors=find_divisors)
+        self.update_cache_status()
+        if cached is not None:
+            self.show_result(num, *cached, backend="cache")
             return
 
         self.result_display.setText(self.tr("processing"))
-        QApplication.processEvents()
 
-        self.worker = PrimeWorker(num)
-        self.worker.finished.connect(lambda is_prime, divisors: self.show_result(num, is_prime, divisors))
-        self.worker.start()
+        factor_later = find_divisors and digits > INTERACTIVE_DIVISOR_DIGITS
+        worker = PrimeWorker(num, find_divisors and not factor_later)
+        worker.finished.connect(self.for_current(worker, lambda is_prime, divisors: self.finish_check(
+            num, is_prime, divisors if find_divisors else None, factor_later)))
+        self.start_worker(worker)
+
+    def finish_check(self, num, is_prime, divisors, factor_later=False):
+        if factor_later and not is_prime:
+            with metrics.timer("cache_write"):
+                self.cache.put(num, is_prime, None)
+            self.show_result(num, is_prime, None, backend=backend_for(num), factoring=True)
+            self.start_factoring(num)
+            return
+        with metrics.timer("cache_write"):
+            self.cache.put(num, is_prime, divisors)
+        self.show_result(num, is_prime, divisors, backend=backend_for(num))
+
+    def start_factoring(self, num):
+        worker = FactorWorker(num)
+        worker.finished.connect(lambda divisors: self.finish_factoring(worker, num, divisors))
+        self.start_worker(worker)
+
+    def finish_factoring(self, worker, num, divisors):
+        # The divisors are kept even when another request has the screen.
+        with metrics.timer("cache_write"):
+            self.cache.put(num, False, divisors)
+        if worker is self.worker:
+            self.show_result(num, False, divisors, backend=backend_for(num))
+        elif self.history_writer is not None:
+            self.history_writer.add_entry(num, False, divisors, self.current_lang)
+
+    def range_bounds(self):
+        # (low, high) from the range fields, or None after showing the error.
+        low_text = self.input_field.text().strip()
+        high_text = self.range_end_field.text().strip()
+        if not (low_text.isdecimal() and high_text.isdecimal()):
+            self.show_error("error_range")
+            return None
+        low, high = int(low_text), int(high_text)
+        if low > high or high > RANGE_LIMIT:
+            self.show_error("error_range")
+            return None
+        return low, high
+
+    def check_range(self):
+        bounds = self.range_bounds()
+        if bounds is None:
+            return
+        low, high = bounds
+
+        texts = self.texts
+        self.result_display.clear()
+        self.result_display.setFont(QFont("Consolas", 12))
+        self.result_display.setHtml(f"""
+        <h3 style='color:#2c3e50; text-align:center; font-family: Segoe UI;'>
+            {texts['range_title'].format(low=low, high=high)}
+        </h3>
+        """)
+
+        count_only = self.count_only_check.isChecked()
+        worker = RangeWorker(low, high, count_only)
+        worker.chunk.connect(self.for_current(worker, self.append_range_chunk))
+        worker.finished.connect(self.for_current(worker, lambda count: self.show_range_result(count, count_only)))
+        self.start_worker(worker)
+
+    def export_range(self):
+        self.cancel_worker()
+        bounds = self.range_bounds()
+        if bounds is None:
+            return
+        low, high = bounds
+        texts = self.texts
+        path, selected = QFileDialog.getSaveFileName(
+            self, texts['export_range'], f"primes_{low}_{high}.bin", ";;".join(EXPORT_FILTERS))
+        if not path:
+            return
+        fmt = EXPORT_FILTERS.get(selected, "varint")
+
+        self.result_display.clear()
+        self.result_display.setText(texts['range_title'].format(low=low, high=high))
+        worker = ExportWorker(low, high, path, fmt)
+        worker.finished.connect(self.for_current(worker, lambda count: self.result_display.append(
+            texts['export_done'].format(count=count, path=path, size=os.path.getsize(path)))))
+        self.start_worker(worker)
+
+    def append_range_chunk(self, primes):
+        self.result_display.append(", ".join(map(str, primes)))
+
+    def show_range_result(self, count, count_only):
+        texts = self.texts
+        summary = texts['range_count'].format(count=count)
+        if count > RANGE_DISPLAY_LIMIT and not count_only:
+            summary += " " + texts['range_truncated'].format(limit=RANGE_DISPLAY_LIMIT)
+        self.result_display.append(f"""
+        <p style='text-align:center; font-size:14px; color:#2c3e50;'>
+            <strong>{summary}</strong>
+        </p>
+        """)
+
+    def check_navigation(self):
+        query = self.nav_combo.currentData()
+        text = self.input_field.text().strip()
+        if not text.isdecimal() or (query == 'nth' and int(text) < 1):
+            self.show_error("error_invalid")
+            return
+        if query == 'pi' and int(text) > LMO_MAX:
+            self.show_error("error_pi_limit")
+            return
+        if query == 'nth' and int(text) > NTH_PRIME_MAX:
+            self.show_error("error_nth_limit")
+            return
+        gap = 0
+        if query == 'gap':
+            gap_text = self.range_end_field.text().strip()
+            if not gap_text.isdecimal() or int(gap_text) < 1:
+                self.show_error("error_gap")
+                return
+            gap = int(gap_text)
+
+        number = int(text)
+        self.result_display.setText(self.tr("processing"))
+        worker = NavigateWorker(query, number, gap)
+        worker.finished.connect(self.for_current(worker, lambda result: self.show_navigation_result(query, number, gap, result)))
+        self.start_worker(worker)
+
+    def show_navigation_result(self, query, number, gap, result):
+        texts = self.texts
+        if result is None:
+            message = texts['nav_result_none'].format(n=number)
+        elif query in ('twin', 'gap'):
+            p, q = result
+            message = texts['nav_result_' + query].format(n=number, k=gap, p=p, q=q, gap=q - p)
+        else:
+            message = texts['nav_result_' + query].format(n=number, p=result)
+        self.result_display.clear()
+        self.result_display.setFont(QFont("Consolas", 12))
+        self.result_display.setHtml(f"""
+        <h2 style='color:#2c3e50; text-align:center; font-family: Segoe UI;'>
+            {message}
+        </h2>
+        """)
+
+    def check_analytics(self):
+        # Without a range end only the start number is analysed.
+        if not self.range_end_field.text().strip():
+            text = self.input_field.text().strip()
+            if not text.isdecimal() or int(text) < 1:
+                self.show_error("error_invalid")
+                return
+            if len(text.lstrip("0")) > DIVISOR_DIGIT_LIMIT:
+                self.show_error("error_analytics_digits")
+                return
+            num = int(text)
+            self.result_display.setText(self.tr("processing"))
+            worker = AnalyticsWorker(num)
+            worker.finished.connect(self.for_current(worker, self.show_analytics_result))
+            self.start_worker(worker)
+            return
+
+        bounds = self.range_bounds()
+        if bounds is None:
+            return
+        low, high = bounds
+        texts = self.texts
+        self.result_display.clear()
+        self.result_display.setFont(QFont("Consolas", 11))
+        self.result_display.setPlainText(texts['analytics_range_title'].format(low=max(low, 1), high=high))
+        self.result_display.append(ANALYTICS_COLUMNS)
+        worker = AnalyticsWorker(low, high)
+        worker.chunk.connect(self.for_current(worker, self.append_analytics_rows))
+        worker.finished.connect(self.for_current(worker, self.show_analytics_summary))
+        self.start_worker(worker)
+
+    def append_analytics_rows(self, rows):
+        self.result_display.append("\n".join(
+            f"{n:>16} {tau:>8} {sigma:>18} {phi:>18} {mu:>5}" for n, tau, sigma, phi, mu in rows))
+
+    def show_analytics_summary(self, summary):
+        texts = self.texts
+        if summary["count"] > RANGE_DISPLAY_LIMIT:
+            self.result_display.append(texts['range_truncated'].format(limit=RANGE_DISPLAY_LIMIT))
+        if summary["count"]:
+            self.result_display.append(texts['analytics_summary'].format(**summary))
+        if summary["perfect"]:
+            self.result_display.append(texts['analytics_perfect'].format(numbers=", ".join(map(str, summary["perfect"]))))
+
+    def show_analytics_result(self, result):
+        texts = self.texts
+        factors = result["factors"]
+        factorization = " × ".join(
+            f"{p}<sup>{e}</sup>" if e > 1 else str(p) for p, e in sorted(factors.items())) or "1"
+        rows = "".join(
+            f"<tr><td style='padding:4px 16px;'>{texts[key + '_label']}</td>"
+            f"<td style='padding:4px 16px;'><b>{result[key]}</b></td></tr>"
+            for key in ("tau", "sigma", "phi", "mu"))
+        self.result_display.clear()
+        self.result_display.setFont(QFont("Consolas", 12))
+        self.result_display.setHtml(f"""
+        <h2 style='color:#2c3e50; text-align:center; font-family: Segoe UI;'>
+            {texts['analytics_title'].format(num=result['number'])}
+        </h2>
+        <p style='text-align:center; font-size:14px; color:#2c3e50;'>
+            <strong>{texts['factorization']}</strong> {factorization}
+        </p>
+        <table align='center' style='font-size:14px; color:#2c3e50;'>{rows}</table>
+        """)
+
+    def load_batch_file(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, self.tr("load_file"), "", "Text files (*.txt *.csv);;All files (*)"
+        )
+        if not path:
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            self.batch_input.setPlainText(f.read())
+
+    def check_batch(self):
+        numbers, invalid = parse_numbers(self.batch_input.toPlainText())
+        if not numbers:
+            self.show_error("error_batch")
+            return
 
-    def show_result(self, num, is_prime, divisors):
+        texts = self.texts
+        self.result_display.clear()
+        self.result_display.setFont(QFont("Consolas", 12))
+        if invalid:
+            self.result_display.append(texts['batch_invalid'].format(count=invalid))
+        with metrics.timer("cache_lookup"):
+            cached = self.cache.get_many(numbers)
+        self.update_cache_status()
+        pending = [n for n in numbers if n not in cached]
+        self.batch_offset = len(numbers) - len(pending)
+        self.batch_shown = 0
+        self.pending_batch_lines = []
+        self.batch_progress.setRange(0, len(numbers))
+        self.batch_progress.setValue(self.batch_offset)
+        self.batch_rate_label.setText("")
+        # Only the misses go to the worker; the cached verdicts are shown in
+        # their input positions as the results around them come back.
+        self.batch_numbers = numbers
+        self.batch_cached = cached
+        self.batch_next = 0
+        self.show_batch_lines(self.take_cached_batch())
+        if not pending:
+            return
+
+        worker = BatchWorker(pending)
+        # Results are cached even after the batch has left the screen.
+        worker.results.connect(self.cache_batch_results)
+        worker.results.connect(self.for_current(worker, self.show_batch_results))
+        worker.rate.connect(self.for_current(worker, self.update_batch_progress))
+        self.start_worker(worker)
+
+    def cache_batch_results(self, results):
+        with metrics.timer("cache_write"):
+            self.cache.put_many([(n, prime, None) for n, prime in results])
+
+    def take_cached_batch(self):
+        # The run of cached verdicts from the current input position on.
+        numbers, cached = self.batch_numbers, self.batch_cached
+        run = []
+        while self.batch_next < len(numbers) and numbers[self.batch_next] in cached:
+            n = numbers[self.batch_next]
+            run.append((n, cached[n]))
+            self.batch_next += 1
+        return run
+
+    def show_batch_results(self, results):
+        merged = []
+        for result in results:
+            merged.append(result)
+            self.batch_next += 1
+            merged += self.take_cached_batch()
+        self.show_batch_lines(merged)
+
+    def show_batch_lines(self, results):
+        # Lines are buffered and appended by render_timer, so a fast batch
+        # costs one redraw per interval instead of one per chunk.
+        room = BATCH_DISPLAY_LIMIT - self.batch_shown
+        if room <= 0:
+            return
+        self.pending_batch_lines += [f"{n} → {'PRIME' if prime else 'COMPOSITE'}" for n, prime in results[:room]]
+        self.batch_shown += min(len(results), room)
+        if self.batch_shown >= BATCH_DISPLAY_LIMIT:
+            texts = self.texts
+            self.pending_batch_lines.append(texts['range_truncated'].format(limit=BATCH_DISPLAY_LIMIT))
+        if not self.render_timer.isActive():
+            self.render_timer.start()
+
+    def flush_batch_lines(self):
+        if self.pending_batch_lines:
+            self.result_display.append("\n".join(self.pending_batch_lines))
+            self.pending_batch_lines = []
+
+    def update_batch_progress(self, done, total, rate):
+        texts = self.texts
+        done += self.batch_offset
+        total += self.batch_offset
+        self.batch_progress.setValue(done)
+        self.batch_rate_label.setText(texts['batch_progress'].format(done=done, total=total, rate=rate))
+
+    def update_cache_status(self):
+        texts = self.texts
+        self.cache_label.setText(texts['cache_stats'].format(hits=self.cache.hits, misses=self.cache.misses))
+
+    def show_result(self, num, is_prime, divisors, backend=None, factoring=False):
+        with metrics.timer("render"):
+            self.render_result(num, is_prime, divisors, backend, factoring)
+        if self.check_started is not None:
+            metrics.observe("check_total", time.perf_counter() - self.check_started)
+            self.check_started = None
+
+    def render_result(self, num, is_prime, divisors, backend, factoring=False):
         lang = self.current_lang
-        texts = self.get_translations(lang)
+        texts = self.texts
 
         self.result_display.clear()
         self.result_display.setFont(QFont("Consolas", 12))
+        self.pending_divisors = []
+        shown = abbreviate(num)
 
         if is_prime:
             html = f"""
             <h2 style='color:#27ae60; text-align:center; font-family: Segoe UI;'>
-                {num} {texts['is_prime']}
+                {shown} {texts['is_prime']}
             </h2>
             <p style='text-align:center; font-size:14px; color:#2c3e50;'>
                 No divisors other than 1 and itself.
             </p>
             """
+        elif divisors is None:
+            note = texts['divisors_pending'] if factoring else texts['divisors_skipped'].format(limit=DIVISOR_DIGIT_LIMIT)
+            html = f"""
+            <h2 style='color:#e74c3c; text-align:center; font-family: Segoe UI;'>
+                {shown} {texts['not_prime']}
+            </h2>
+            <p style='text-align:center; font-size:14px; color:#2c3e50;'>
+                {note}
+            </p>
+            """
         else:
-            div_list = ", ".join(map(str, divisors)) if divisors else "None"
+            # Long lists are shown a page at a time; the rest is rendered on request.
+            div_list = ", ".join(map(str, divisors[:DIVISOR_PAGE_SIZE])) if divisors else "None"
+            self.pending_divisors = divisors[DIVISOR_PAGE_SIZE:]
             html = f"""
             <h2 style='color:#e74c3c; text-align:center; font-family: Segoe UI;'>
-                {num} {texts['not_prime']}
+                {shown} {texts['not_prime']}
             </h2>
             <p style='text-align:center; font-size:14px; color:#2c3e50;'>
                 <strong>{texts['divisors']}</strong> {div_list}
@@ -703,15 +1957,39 @@ class PrimeCheckerApp(QMainWindow):
             Powered by advanced primality testing • Instant results
         </p>
         """
+        if backend is not None:
+            html += f"""
+        <p style='color:#7f8c8d; font-size:11px; text-align:center;'>
+            {texts['backend'].format(backend=backend)}
+        </p>
+        """
 
         self.result_display.setHtml(html)
-
-        # Save to history
-        self.history_manager.add_entry(num, is_prime, divisors, lang)
-        self.update_history_display()
+        self.divisor_total = len(divisors or [])
+        self.update_more_divisors()
+
+        # Save to history, once the divisors are known
+        if self.history_writer is not None and not factoring:
+            self.history_writer.add_entry(num, is_prime, divisors, lang)
+
+    def update_more_divisors(self):
+        texts = self.texts
+        total = self.divisor_total
+        remaining = len(self.pending_divisors)
+        self.more_divisors_btn.setVisible(remaining > 0)
+        if remaining:
+            self.more_divisors_btn.setText(texts['more_divisors'].format(count=min(remaining, DIVISOR_PAGE_SIZE)))
+            self.result_display.append(texts['divisors_page'].format(shown=total - remaining, total=total))
+
+    def show_more_divisors(self):
+        page = self.pending_divisors[:DIVISOR_PAGE_SIZE]
+        self.pending_divisors = self.pending_divisors[DIVISOR_PAGE_SIZE:]
+        self.result_display.append(", ".join(map(str, page)))
+        self.update_more_divisors()
 
     def show_error(self, error_key):
-        texts = self.get_translations(self.current_lang)
+        self.check_started = None
+        texts = self.texts
         self.result_display.setHtml(f"""
         <h3 style='color:#e74c3c; text-align:center; font-family: Segoe UI;'>
             Warning: {texts[error_key]}
@@ -719,39 +1997,146 @@ class PrimeCheckerApp(QMainWindow):
         """)
 
     def tr(self, text):
-        texts = self.get_translations(self.current_lang)
-        return texts.get(text, text)
+        return self.texts.get(text, text)
 
     def update_history_display(self):
-        history = self.history_manager.get_history()
+        if self.history_manager is None:
+            return
+        history = list(self.history_manager.query(primes_only=self.primes_only_check.isChecked(), limit=10))
         if not history:
             self.history_list.setText("No history yet.")
             return
 
         lines = []
-        for entry in history[:10]:
+        for entry in history:
             num = entry["number"]
             is_prime = "PRIME" if entry["is_prime"] else "COMPOSITE"
             time = entry["timestamp"][11:19]
-            lines.append(f"[{time}] {num} → {is_prime}")
+            lines.append(f"[{time}] {abbreviate(num)} → {is_prime}")
 
         self.history_list.setText("\n".join(lines))
 
+    def mark_history_dirty(self):
+        # Called on the writer thread; only sets a flag for history_timer.
+        self.history_dirty = True
+
+    def refresh_history_if_dirty(self):
+        if self.history_dirty:
+            self.history_dirty = False
+            self.update_history_display()
+
+    def toggle_diagnostics(self, enabled):
+        self.diagnostics_panel.setVisible(enabled)
+        if enabled:
+            self.update_diagnostics()
+            self.diagnostics_timer.start()
+        else:
+            self.diagnostics_timer.stop()
+
+    def update_diagnostics(self):
+        # Milliseconds per stage; percentiles cover the most recent samples.
+        texts = self.texts
+        if metrics.snapshot():
+            self.diagnostics_view.setPlainText(metrics.format_table())
+        else:
+            self.diagnostics_view.setPlainText(texts['metrics_empty'])
+
+    def toggle_jobs(self, enabled):
+        self.jobs_panel.setVisible(enabled)
+        if enabled:
+            self.update_jobs_view()
+            self.jobs_timer.start()
+        else:
+            self.jobs_timer.stop()
+
+    def update_jobs_view(self):
+        # Also called as jobs start and finish, possibly before the panel exists.
+        jobs_list = getattr(self, "jobs_list", None)
+        if jobs_list is None or not self.jobs_panel.isVisible():
+            return
+        item = jobs_list.currentItem()
+        selected = item.data(Qt.ItemDataRole.UserRole) if item is not None else None
+        jobs_list.clear()
+        for job in self.scheduler.snapshot():
+            item = QListWidgetItem(format_job(job))
+            item.setData(Qt.ItemDataRole.UserRole, job.id)
+            jobs_list.addItem(item)
+            if job.id == selected:
+                jobs_list.setCurrentItem(item)
+        if not jobs_list.count():
+            jobs_list.addItem(self.tr("jobs_empty"))
+
+    def cancel_selected_job(self):
+        item = self.jobs_list.currentItem()
+        if item is None:
+            return
+        job_id = item.data(Qt.ItemDataRole.UserRole)
+        for job in self.scheduler.active():
+            if job.id == job_id:
+                self.scheduler.cancel(job)
+        if self.worker is not None and self.worker.job.id == job_id:
+            self.cancel_check()
+        self.update_jobs_view()
+
+    def export_metrics(self):
+        texts = self.texts
+        path, selected = QFileDialog.getSaveFileName(
+            self, texts['export_metrics'], "prime_metrics.json",
+            "JSON (*.json);;Prometheus (*.prom *.txt)")
+        if not path:
+            return
+        try:
+            metrics.export(path, "json" if selected.startswith("JSON") else "prometheus")
+        except OSError as exc:
+            QMessageBox.warning(self, texts['diagnostics'], str(exc))
+            return
+        self.status_label.setText(texts['metrics_exported'].format(path=path))
+
+    def reset_metrics(self):
+        metrics.reset()
+        self.update_diagnostics()
+
     def clear_history(self):
-        self.history_manager.clear_history()
-        self.update_history_display()
+        if self.history_writer is not None:
+            self.history_writer.clear_history()
         QMessageBox.information(self, "History", "History cleared!")
 
 
+def decimal_digits(num):
+    # len(str(num)) for num > 0 without the quadratic conversion: the
+    # estimate from the bit length is exact or one too many.
+    digits = int(num.bit_length() * math.log10(2)) + 1
+    return digits - (num < 10 ** (digits - 1))
+
+
+def abbreviate(num):
+    if num < 10 ** DISPLAY_DIGIT_LIMIT:
+        return str(num)
+    digits = decimal_digits(num)
+    return f"{num // 10 ** (digits - 20)}…{num % 10 ** 20:020d} ({digits:,} digits)"
+
+
 def main():
+    # --profile-startup prints per-phase timings to stderr once startup is done.
+    profile = None
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        profile = StartupProfile()
+        profile.mark("imports")
+
     app = QApplication(sys.argv)
     app.setApplicationName("PrimeChecker Pro")
     app.setApplicationVersion("2.1.0")
     app.setOrganizationName("MathTools")
     app.setStyle("Fusion")
 
-    window = PrimeCheckerApp()
+    if profile is not None:
+        profile.mark("QApplication")
+
+    window = PrimeCheckerApp(profile)
     window.show()
+    window.profile.mark("show")
+    QTimer.singleShot(0, window.finish_startup)
     sys.exit(app.exec())
 
 
@@ -0,0 +1,238 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from metrics import metrics
+
+from prime_core import (
+    is_prime, factorize, proper_divisors, ParallelSieve, iter_batch_results,
+    use_prime_index, export_primes, analyze, iter_arithmetic, backend_for, next_prime, prev_prime, nth_prime, twin_primes, prime_gap,
+    prime_pi, parse_number, ExpressionError
+)
+from prime_count import cross_check
+
+
+def read_numbers(values, stream):
+    # Numbers come from the command line, or one per line on stdin; stdin lines
+    # may also be JSON objects with a "number" field. Either may be written as
+    # an expression such as 2^127-1 or 100!+1.
+    if values:
+        lines = values
+    else:
+        lines = (line.strip() for line in stream)
+    for line in lines:
+        if not line:
+            continue
+        token = line
+        if line.startswith("{"):
+            try:
+                token = str(json.loads(line).get("number", ""))
+            except ValueError:
+                token = ""
+        try:
+            number = parse_number(token)
+        except ExpressionError:
+            number = -1
+        if number >= 0:
+            yield number, None
+        else:
+            yield None, line
+
+
+def write(record, out):
+    out.write(json.dumps(record, separators=(",", ":")))
+    out.write("\n")
+
+
+def cmd_check(args, out):
+    for n, bad in read_numbers(args.numbers, sys.stdin):
+        if n is None:
+            write({"input": bad, "error": "invalid"}, out)
+            continue
+        with metrics.timer("primality"):
+            prime = is_prime(n)
+        record = {"number": n, "is_prime": prime, "backend": backend_for(n)}
+        if args.divisors:
+            with metrics.timer("factorization"):
+                record["divisors"] = proper_divisors(n)
+        write(record, out)
+
+
+def cmd_factor(args, out):
+    for n, bad in read_numbers(args.numbers, sys.stdin):
+        if n is None:
+            write({"input": bad, "error": "invalid"}, out)
+            continue
+        with metrics.timer("factorization"):
+            factors = factorize(n)
+        write({"number": n, "factors": [[p, e] for p, e in factors.items()]}, out)
+
+
+def cmd_analyze(args, out):
+    for n, bad in read_numbers(args.numbers, sys.stdin):
+        if n is None or n < 1:
+            write({"input": bad or str(n), "error": "invalid"}, out)
+            continue
+        with metrics.timer("factorization"):
+            result = analyze(n)
+        result["factors"] = [[p, e] for p, e in sorted(result["factors"].items())]
+        write(result, out)
+
+
+def cmd_analyze_range(args, out):
+    if args.low > args.high:
+        raise SystemExit("analyze-range: LOW must not exceed HIGH")
+    with metrics.timer("arithmetic"):
+        for rows in iter_arithmetic(args.low, args.high):
+            for n, tau, sigma, phi, mu in rows:
+                write({"number": n, "tau": tau, "sigma": sigma, "phi": phi, "mu": mu}, out)
+
+
+def cmd_range(args, out):
+    if args.low > args.high:
+        raise SystemExit("range: LOW must not exceed HIGH")
+    if args.output:
+        with metrics.timer("sieve"):
+            count = export_primes(args.output, args.low, args.high, args.format, args.workers)
+        write({"low": args.low, "high": args.high, "count": count, "path": args.output,
+               "format": args.format, "bytes": os.path.getsize(args.output)}, out)
+        return
+    sieve = ParallelSieve(args.low, args.high, args.workers)
+    with metrics.timer("sieve"):
+        if args.count:
+            write({"low": args.low, "high": args.high, "count": sieve.count()}, out)
+            return
+        for chunk in sieve.prime_chunks():
+            out.write("".join(f"{p}\n" for p in chunk))
+
+
+def cmd_navigate(args, out):
+    for n, bad in read_numbers(args.numbers, sys.stdin):
+        if n is None:
+            write({"input": bad, "error": "invalid"}, out)
+            continue
+        with metrics.timer("navigation"):
+            record = navigate(args, n)
+        write(record, out)
+
+
+def navigate(args, n):
+    if args.command == "next":
+        return {"number": n, "next_prime": next_prime(n)}
+    if args.command == "prev":
+        return {"number": n, "prev_prime": prev_prime(n)}
+    if args.command == "nth":
+        if n < 1:
+            return {"input": str(n), "error": "invalid"}
+        try:
+            return {"n": n, "prime": nth_prime(n)}
+        except (ValueError, RuntimeError) as e:
+            return {"n": n, "error": str(e)}
+    if args.command == "pi":
+        try:
+            if args.verify:
+                return {"number": n, "pi": cross_check(n), "verified": True}
+            return {"number": n, "pi": prime_pi(n)}
+        except (ValueError, ArithmeticError) as e:
+            return {"number": n, "error": str(e)}
+    if args.command == "twin":
+        return {"number": n, "twin": list(twin_primes(n))}
+    p, q = prime_gap(n, args.min)
+    return {"number": n, "gap": q - p, "primes": [p, q]}
+
+
+def cmd_batch(args, out):
+    numbers = (n for n, _ in read_numbers(None, sys.stdin) if n is not None)
+    started = time.perf_counter()
+    for chunk in iter_batch_results(numbers, workers=args.workers):
+        now = time.perf_counter()
+        metrics.observe("batch_chunk", now - started)
+        started = now
+        for n, prime in chunk:
+            write({"number": n, "is_prime": prime}, out)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="prime_cli",
+        description="Headless prime checks, factorizations and range queries (JSON Lines output).",
+    )
+    parser.add_argument("--index", metavar="FILE",
+                        help="answer numbers below the bound from this prime bitmap (built if missing)")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="write per-stage latency histograms here on exit (.json, otherwise Prometheus text)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    check = sub.add_parser("check", help="primality verdict for each number")
+    check.add_argument("numbers", nargs="*", help="numbers to check (default: read stdin)")
+    check.add_argument("--divisors", action="store_true", help="also list proper divisors")
+    check.set_defaults(func=cmd_check)
+
+    factor = sub.add_parser("factor", help="prime factorization with multiplicities")
+    factor.add_argument("numbers", nargs="*", help="numbers to factor (default: read stdin)")
+    factor.set_defaults(func=cmd_factor)
+
+    analyze_parser = sub.add_parser("analyze", help="factorization with tau, sigma, phi and mu for each number")
+    analyze_parser.add_argument("numbers", nargs="*", help="numbers to analyze (default: read stdin)")
+    analyze_parser.set_defaults(func=cmd_analyze)
+
+    analyze_range = sub.add_parser("analyze-range", help="tau, sigma, phi and mu for every n in [LOW, HIGH], by sieve")
+    analyze_range.add_argument("low", type=int)
+    analyze_range.add_argument("high", type=int)
+    analyze_range.set_defaults(func=cmd_analyze_range)
+
+    rng = sub.add_parser("range", help="list or count the primes in [LOW, HIGH]")
+    rng.add_argument("low", type=int)
+    rng.add_argument("high", type=int)
+    rng.add_argument("--count", action="store_true", help="print only the count")
+    rng.add_argument("--workers", type=int, default=None,
+                     help="sieve processes for large ranges (default: all cores)")
+    rng.add_argument("--output", metavar="FILE", help="stream the primes to FILE instead of stdout")
+    rng.add_argument("--format", choices=("varint", "wheel30", "text"), default="varint",
+                     help="file format for --output (default: %(default)s)")
+    rng.set_defaults(func=cmd_range)
+
+    for name, help_text in (
+        ("next", "smallest prime greater than each number"),
+        ("prev", "largest prime smaller than each number"),
+        ("nth", "the n-th prime, counting 2 as the first"),
+        ("pi", "number of primes up to each number (Lagarias-Miller-Odlyzko above 10^7)"),
+        ("twin", "first twin prime pair at or after each number"),
+        ("gap", "first gap of at least --min between consecutive primes"),
+    ):
+        nav = sub.add_parser(name, help=help_text)
+        nav.add_argument("numbers", nargs="*", help="inputs (default: read stdin)")
+        if name == "gap":
+            nav.add_argument("--min", type=int, required=True, metavar="K", help="smallest gap to report")
+        if name == "pi":
+            nav.add_argument("--verify", action="store_true",
+                             help="also count by sieve and report an error on any difference (up to 10^11)")
+        nav.set_defaults(func=cmd_navigate)
+
+    batch = sub.add_parser("batch", help="check numbers from stdin on a process pool")
+    batch.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    batch.set_defaults(func=cmd_batch)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.index:
+        use_prime_index(args.index)
+    try:
+        args.func(args, sys.stdout)
+    except BrokenPipeError:
+        # Output was piped into something like `head`; exit quietly.
+        sys.stderr.close()
+    except KeyboardInterrupt:
+        sys.exit(130)
+    finally:
+        if args.metrics:
+            metrics.export(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
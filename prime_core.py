@@ -0,0 +1,88 @@
+# Qt-free entry point to the computation engines. The GUI, the command-line
+# tool and scripts all import from here, so none of them pay for PyQt6
+# unless they need it.
+
+import sys
+
+from primality import is_prime, install_index, backend_for
+from factorization import factorize, divisors, divisors_from_factors
+from sieve import SegmentedSieve, segment_primes, iter_primes, count_primes
+from prime_count import prime_pi, lmo_pi
+from parallel_sieve import ParallelSieve
+from arithmetic import analyze, iter_arithmetic
+from siqs import siqs
+from navigation import SieveWindow, next_prime, prev_prime, nth_prime, twin_primes, prime_gap
+from batch import parse_numbers, iter_batch_results
+from expression import parse_number, ExpressionError
+from vectorized import is_prime_mask, filter_primes
+from prime_index import INDEX_PATH, DEFAULT_BOUND, PrimeIndex, open_index
+from prime_export import export_primes, PrimeExport
+from progress import Cancelled, ProgressTracker
+
+# Inputs may have thousands of digits; lift CPython's int/str conversion cap.
+if hasattr(sys, "set_int_max_str_digits"):
+    sys.set_int_max_str_digits(0)
+
+__all__ = [
+    "is_prime",
+    "backend_for",
+    "factorize",
+    "divisors",
+    "divisors_from_factors",
+    "siqs",
+    "proper_divisors",
+    "SegmentedSieve",
+    "segment_primes",
+    "iter_primes",
+    "count_primes",
+    "prime_pi",
+    "lmo_pi",
+    "ParallelSieve",
+    "analyze",
+    "iter_arithmetic",
+    "SieveWindow",
+    "next_prime",
+    "prev_prime",
+    "nth_prime",
+    "twin_primes",
+    "prime_gap",
+    "parse_numbers",
+    "iter_batch_results",
+    "parse_number",
+    "ExpressionError",
+    "is_prime_mask",
+    "filter_primes",
+    "PrimeIndex",
+    "open_index",
+    "load_prime_index",
+    "install_index",
+    "use_prime_index",
+    "export_primes",
+    "PrimeExport",
+    "Cancelled",
+    "ProgressTracker",
+]
+
+
+def proper_divisors(n, progress=None, executor=None):
+    # Divisors other than 1 and n, as listed in the result view.
+    if n < 2 or is_prime(n):
+        return []
+    return divisors(n, progress, executor)[1:-1]
+
+
+def load_prime_index(path=INDEX_PATH, bound=DEFAULT_BOUND, rebuild=True):
+    # Opens the bitmap index, building it if it is missing or stale. Returns
+    # None when no index is usable (for example a read-only directory).
+    try:
+        return open_index(path, bound, rebuild=rebuild)
+    except OSError:
+        return None
+
+
+def use_prime_index(path=INDEX_PATH, bound=DEFAULT_BOUND, rebuild=True):
+    # Loads the index and routes lookups below its bound through it; without
+    # one, verdicts are computed as before.
+    index = load_prime_index(path, bound, rebuild)
+    install_index(index)
+    return index
@@ -0,0 +1,234 @@
+import bisect
+import math
+
+from factorization import integer_root
+from primality import primes_up_to
+from sieve import SegmentedSieve, prime_pi as sieve_prime_pi
+
+# NumPy is imported on first use; without it pi(x) is counted by the sieve.
+np = None
+_numpy_missing = False
+
+# Below this the sieve is as fast as setting up the combinatorial method.
+LMO_MIN = 10 ** 7
+# Leaf values are computed in int64.
+LMO_MAX = (1 << 63) - 1
+# y = LMO_ALPHA * x^(1/3) splits the work between the leaves below y and the
+# sieve of [1, x / y]; a larger y means fewer sieve segments but more leaves.
+LMO_ALPHA = 4.0
+# Numbers per sieve segment, and per counter block within a segment.
+LMO_SEGMENT_SIZE = 1 << 20
+LMO_BLOCK_SIZE = 256
+# phi(t, c) for c up to this many primes comes from a table over their
+# product (30030) instead of the sieve.
+LMO_TABLE_PRIMES = 6
+# cross_check() refuses to sieve beyond this.
+VERIFY_LIMIT = 10 ** 11
+
+
+def _load_numpy():
+    global np, _numpy_missing
+    if np is None and not _numpy_missing:
+        try:
+            import numpy
+        except ImportError:
+            _numpy_missing = True
+        else:
+            np = numpy
+    return np
+
+
+def prime_pi(x, progress=None):
+    # Number of primes <= x: Lagarias-Miller-Odlyzko from LMO_MIN on when
+    # NumPy is available, the segmented sieve otherwise.
+    if x < LMO_MIN or _load_numpy() is None:
+        return sieve_prime_pi(x, progress)
+    return lmo_pi(x, progress)
+
+
+def cross_check(x, progress=None):
+    # pi(x) by both methods; raises ArithmeticError if they disagree.
+    if x > VERIFY_LIMIT:
+        raise ValueError(f"x must not exceed {VERIFY_LIMIT} to be checked by sieve")
+    count = lmo_pi(x)
+    expected = sieve_prime_pi(x, progress)
+    if count != expected:
+        raise ArithmeticError(f"pi({x}): LMO gives {count}, the sieve {expected}")
+    return count
+
+
+def _exact_sum(values):
+    # Sum of an int64 array as a Python int, in chunks that cannot overflow.
+    if not len(values):
+        return 0
+    step = max(1, (1 << 62) // max(int(np.abs(values).max()), 1))
+    if step >= len(values):
+        return int(values.sum())
+    return sum(np.add.reduceat(values, np.arange(0, len(values), step)).tolist())
+
+
+def _mu_lpf(limit, primes):
+    # Moebius function and least prime factor of 0..limit; lpf(1) is above
+    # every prime.
+    mu = np.ones(limit + 1, dtype=np.int8)
+    lpf = np.full(limit + 1, limit + 1, dtype=np.int64)
+    for p in reversed(primes):
+        lpf[p::p] = p
+    for p in primes:
+        mu[p::p] *= -1
+        mu[p * p::p * p] = 0
+    mu[0] = 0
+    return mu, lpf
+
+
+def _phi_tables(primes, count):
+    # For c = 0..count: (P, phi(P), counts) with P the product of the first c
+    # primes, so that phi(t, c) = t // P * phi(P) + counts[t % P].
+    tables = []
+    for c in range(count + 1):
+        product = math.prod(primes[:c])
+        coprime = np.ones(product, dtype=np.int64)
+        for p in primes[:c]:
+            coprime[::p] = 0
+        tables.append((product, int(coprime.sum()), np.cumsum(coprime) - coprime[0]))
+    return tables
+
+
+def _leaves(mu, lpf, primes, plist, p, low, high):
+    # Squarefree m in [low, high] whose prime factors all exceed p. Once
+    # p * p > high these can only be primes.
+    if low > high:
+        return None
+    if p * p > high:
+        m = primes[bisect.bisect_left(plist, max(low, p + 1)):bisect.bisect_right(plist, high)]
+        return m if len(m) else None
+    m = np.arange(low, high + 1, dtype=np.int64)
+    m = m[(mu[low:high + 1] != 0) & (lpf[low:high + 1] > p)]
+    return m if len(m) else None
+
+
+def _prefix_counts(flags, blocks, offsets):
+    # flags[0..o].sum() for every o in offsets, from the per-block totals
+    # plus the part of each offset's own block.
+    size = LMO_BLOCK_SIZE
+    before = np.concatenate(([0], np.cumsum(blocks)))
+    rows = flags.reshape(-1, size)
+    upto = np.arange(size)
+    result = np.empty(len(offsets), dtype=np.int64)
+    for i in range(0, len(offsets), 4096):
+        chunk = offsets[i:i + 4096]
+        block = chunk // size
+        within = (rows[block] * (upto <= (chunk % size)[:, None])).sum(axis=1)
+        result[i:i + 4096] = before[block] + within
+    return result
+
+
+def lmo_pi(x, progress=None):
+    # pi(x) = phi(x, a) + a - 1 - P2(x, a) with a = pi(y), y >= x^(1/3)
+    # (Lagarias, Miller and Odlyzko, 1985). phi(x, a) is expanded into
+    # ordinary leaves mu(m) * (x // m) for m <= y and special leaves
+    # -mu(m) * phi(x / (p_b m), b - 1) with m <= y < p_b m, whose arguments
+    # all lie below z = x // y. Those, and the pi(x / p) in P2, are read off
+    # one segmented sieve of [1, z] while it removes one prime at a time.
+    # Time is about x^(2/3) and memory about x^(1/3) plus one segment.
+    if _load_numpy() is None:
+        raise RuntimeError("lmo_pi needs NumPy")
+    if x > LMO_MAX:
+        raise ValueError("x must be below 2**63")
+    if x < 1000:
+        return sieve_prime_pi(x, progress)
+    cube_root = integer_root(x, 3)
+    y = min(max(int(LMO_ALPHA * cube_root), cube_root + 1), math.isqrt(x))
+    z = x // y
+    plist = primes_up_to(y)
+    primes = np.array(plist, dtype=np.int64)
+    a = len(plist)
+    mu, lpf = _mu_lpf(y, plist)
+    c = min(LMO_TABLE_PRIMES, a)
+    tables = _phi_tables(plist, c)
+
+    phi = _exact_sum(mu[1:].astype(np.int64) * (x // np.arange(1, y + 1, dtype=np.int64)))
+    for b in range(1, c + 2):
+        p = plist[b - 1]
+        m = _leaves(mu, lpf, primes, plist, p, y // p + 1, y)
+        if m is not None:
+            t = x // (p * m)
+            product, totient, counts = tables[b - 1]
+            phi -= _exact_sum(mu[m] * (t // product * totient + counts[t % product]))
+
+    segment = LMO_SEGMENT_SIZE
+    sqrt_x = math.isqrt(x)
+    base = primes_up_to(math.isqrt(sqrt_x))[1:]
+    # phi_low[j] = phi(low - 1, j), kept for the j sieved in this segment.
+    phi_low = np.zeros(a + 1, dtype=np.int64)
+    pi_low = 0
+    sieved = 0
+    p2_sum = p2_count = 0
+    low = 1
+    while low <= z:
+        high = min(low + segment - 1, z)
+        size = high - low + 1
+        # Beyond p_k, where p_k^2 > high, sieving would only remove primes.
+        k = bisect.bisect_right(plist, math.isqrt(high))
+        if low > 1:
+            phi_low[sieved:k] = 1 + np.maximum(0, pi_low - np.arange(sieved, k))
+        sieved = k
+        # Special leaves with t >= low need p_b^2 < x / low.
+        last = min(a, bisect.bisect_right(plist, math.isqrt(x // low)))
+        flags = np.zeros(segment, dtype=np.uint8)
+        flags[:size] = 1
+        blocks = flags.reshape(-1, LMO_BLOCK_SIZE).sum(axis=1, dtype=np.int64)
+        remaining = size
+        for b in range(1, k + 1):
+            p = plist[b - 1]
+            start = (-low) % p
+            if b > last:
+                # No leaf here or in later segments needs these counts.
+                flags[start:size:p] = 0
+                continue
+            if b >= c + 2:
+                m = _leaves(mu, lpf, primes, plist, p, max(y // p, x // (p * (high + 1))) + 1, min(y, x // (p * low)))
+                if m is not None:
+                    counts = phi_low[b - 1] + _prefix_counts(flags, blocks, x // (p * m) - low)
+                    phi -= _exact_sum(mu[m] * counts)
+            phi_low[b - 1] += remaining
+            view = flags[start:size:p]
+            hit = np.flatnonzero(view)
+            if len(hit):
+                view[hit] = 0
+                blocks -= np.bincount((start + hit * p) // LMO_BLOCK_SIZE, minlength=len(blocks))
+                remaining -= len(hit)
+
+        # What is left is 1 and the primes above p_k; pi(t) follows.
+        is_prime = flags[:size].astype(np.int64)
+        if low == 1:
+            is_prime[0] = 0
+        small = primes[bisect.bisect_left(plist, low):k]
+        is_prime[small - low] = 1
+        pi_prefix = pi_low + np.cumsum(is_prime)
+
+        # Remaining special leaves: phi(t, b - 1) = 1 + max(0, pi(t) - b + 1).
+        for b in range(max(k + 1, c + 2), last + 1):
+            p = plist[b - 1]
+            m = _leaves(mu, lpf, primes, plist, p, max(y // p, x // (p * (high + 1))) + 1, min(y, x // (p * low)))
+            if m is not None:
+                pi_t = pi_prefix[x // (p * m) - low]
+                phi -= _exact_sum(mu[m] * (1 + np.maximum(0, pi_t - (b - 1))))
+
+        # P2 terms pi(x / p) for the primes y < p <= sqrt(x) with x / p here.
+        p_low = max(y + 1, x // (high + 1) + 1)
+        p_high = min(sqrt_x, x // low)
+        if p_low <= p_high:
+            for chunk in SegmentedSieve(p_low, p_high, base_primes=base).prime_chunks():
+                p2_sum += _exact_sum(pi_prefix[x // np.array(chunk, dtype=np.int64) - low])
+                p2_count += len(chunk)
+
+        pi_low = int(pi_prefix[-1])
+        if progress is not None:
+            progress.update(high / z)
+        low = high + 1
+
+    # P2 = sum over a < i <= a + count of pi(x / p_i) - (i - 1).
+    top = a + p2_count
+    p2 = p2_sum - (top * (top - 1) - a * (a - 1)) // 2
+    return phi + a - 1 - p2
@@ -0,0 +1,251 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from parallel_sieve import ParallelSieve
+from prime_index import LAYOUT_WHEEL30, WHEEL_RESIDUES, pack_flags
+from sieve import segment_primes
+
+# magic, format version, format, low, high, prime count, payload length,
+# CRC-32 of the payload. Text exports have no header.
+HEADER = struct.Struct("<8sHB5xQQQQI4x")
+MAGIC = b"PRIMEEXP"
+VERSION = 1
+
+# varint: each odd prime is stored as half its distance from the previous
+# one (from the odd number just below the range for the first), as an
+# unsigned LEB128 varint. Half-gaps stay below 128 far beyond 10^14, so
+# that is about one byte per prime.
+# wheel30: byte k holds one bit per residue in WHEEL_RESIDUES for
+# 30 * (low // 30 + k) + r, as in the wheel-30 prime index.
+# In both, 2 (and for wheel30 also 3 and 5) are implied by low and high.
+FORMAT_TEXT = "text"
+FORMAT_VARINT = "varint"
+FORMAT_WHEEL30 = "wheel30"
+FORMATS = (FORMAT_VARINT, FORMAT_WHEEL30, FORMAT_TEXT)
+_FORMAT_CODES = {FORMAT_VARINT: 1, FORMAT_WHEEL30: 2}
+
+# byte value -> the wheel residues whose bits are set in it
+_RESIDUES = [tuple(r for j, r in enumerate(WHEEL_RESIDUES) if b >> j & 1) for b in range(256)]
+
+
+class InvalidExport(Exception):
+    pass
+
+
+def encode_varint(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _text_chunks(low, high, segments):
+    if low <= 2 <= high:
+        yield b"2\n", 1
+    for start, flags in segments:
+        primes = segment_primes(start, flags)
+        if primes:
+            yield ("\n".join(map(str, primes)) + "\n").encode(), len(primes)
+
+
+def _varint_chunks(low, high, segments):
+    if low <= 2 <= high:
+        yield b"", 1
+    previous = (max(low, 3) | 1) - 2
+    for start, flags in segments:
+        primes = segment_primes(start, flags)
+        if not primes:
+            continue
+        gaps = [(p - q) >> 1 for p, q in zip(primes, [previous] + primes)]
+        previous = primes[-1]
+        if max(gaps) < 0x80:
+            yield bytes(gaps), len(primes)
+        else:
+            yield b"".join(map(encode_varint, gaps)), len(primes)
+
+
+def _wheel_chunks(low, high, segments):
+    if low <= 2 <= high:
+        yield b"", 1
+    # pending holds one flag per odd number from low // 30 * 30 + 1 on; the
+    # numbers before the first sieved one are never prime here.
+    base = low // 30 * 30
+    pending = bytearray(((max(low, 3) | 1) - base - 1) // 2)
+    for _, flags in segments:
+        pending += flags
+        usable = len(pending) // 15 * 15
+        yield pack_flags(pending[:usable], LAYOUT_WHEEL30), flags.count(1)
+        del pending[:usable]
+    if pending:
+        pending += bytes(15 - len(pending))
+        yield pack_flags(pending, LAYOUT_WHEEL30), 0
+
+
+_CHUNKS = {FORMAT_TEXT: _text_chunks, FORMAT_VARINT: _varint_chunks, FORMAT_WHEEL30: _wheel_chunks}
+
+
+def export_primes(path, low, high, fmt=FORMAT_VARINT, workers=None, progress=None, executor=None):
+    # Streams the primes in [low, high] to path segment by segment, so memory
+    # use does not grow with the range, and returns how many were written.
+    # The file is written next to path and moved into place when complete.
+    if fmt not in _CHUNKS:
+        raise ValueError(f"unknown export format {fmt!r}")
+    low = max(low, 0)
+    segments = ParallelSieve(low, high, workers, executor=executor).segments(progress)
+    count = 0
+    length = 0
+    checksum = 0
+    temp = path + ".tmp"
+    try:
+        with open(temp, 'wb') as f:
+            if fmt != FORMAT_TEXT:
+                f.write(HEADER.pack(MAGIC, VERSION, _FORMAT_CODES[fmt], low, high, 0, 0, 0))
+            for chunk, primes in _CHUNKS[fmt](low, high, segments):
+                f.write(chunk)
+                count += primes
+                length += len(chunk)
+                checksum = zlib.crc32(chunk, checksum)
+            if fmt != FORMAT_TEXT:
+                f.seek(0)
+                f.write(HEADER.pack(MAGIC, VERSION, _FORMAT_CODES[fmt], low, high, count, length, checksum))
+        os.replace(temp, path)
+    except BaseException:
+        segments.close()
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+    return count
+
+
+class PrimeExport:
+    # Reads a file written by export_primes(). Binary payloads are
+    # memory-mapped and decoded in place while iterating; nothing is loaded
+    # up front apart from the checksum pass.
+
+    def __init__(self, path):
+        self.path = path
+        self.map = None
+        self.payload = None
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.format = FORMAT_TEXT
+        self.low = self.high = self.count = None
+        if self.map is None or self.map[:len(MAGIC)] != MAGIC:
+            return
+        try:
+            if len(self.map) < HEADER.size:
+                raise InvalidExport(f"{path} is truncated")
+            magic, version, code, low, high, count, length, checksum = HEADER.unpack_from(self.map)
+            formats = {c: name for name, c in _FORMAT_CODES.items()}
+            if version != VERSION or code not in formats:
+                raise InvalidExport(f"{path} is not a version {VERSION} prime export")
+            if len(self.map) != HEADER.size + length:
+                raise InvalidExport(f"{path} is truncated")
+            self.payload = memoryview(self.map)[HEADER.size:]
+            if zlib.crc32(self.payload) != checksum:
+                raise InvalidExport(f"{path} failed its checksum")
+        except InvalidExport:
+            self.close()
+            raise
+        self.format = formats[code]
+        self.low = low
+        self.high = high
+        self.count = count
+
+    def __iter__(self):
+        if self.map is None:
+            return iter(())
+        if self.format == FORMAT_VARINT:
+            return self._iter_varint()
+        if self.format == FORMAT_WHEEL30:
+            return self._iter_wheel()
+        return (int(line) for line in iter(self.map.readline, b"") if line.strip())
+
+    def _iter_varint(self):
+        if self.low <= 2 <= self.high:
+            yield 2
+        p = (max(self.low, 3) | 1) - 2
+        value = shift = 0
+        for b in self.payload:
+            if b & 0x80:
+                value |= (b & 0x7F) << shift
+                shift += 7
+            else:
+                p += (value | b << shift) << 1
+                value = shift = 0
+                yield p
+
+    def _iter_wheel(self):
+        for p in (2, 3, 5):
+            if self.low <= p <= self.high:
+                yield p
+        n = self.low // 30 * 30
+        residues = _RESIDUES
+        for b in self.payload:
+            if b:
+                for r in residues[b]:
+                    yield n + r
+            n += 30
+
+    def close(self):
+        if self.payload is not None:
+            self.payload.release()
+            self.payload = None
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="prime_export",
+        description="Write the primes of a range in a compact binary format, or read such a file back.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    write = sub.add_parser("write", help="sieve [LOW, HIGH] and stream the primes to PATH")
+    write.add_argument("low", type=int)
+    write.add_argument("high", type=int)
+    write.add_argument("path")
+    write.add_argument("--format", choices=FORMATS, default=FORMAT_VARINT, help="default: %(default)s")
+    write.add_argument("--workers", type=int, default=None, help="sieve processes (default: all cores)")
+    info = sub.add_parser("info", help="validate PATH and print its header")
+    info.add_argument("path")
+    cat = sub.add_parser("cat", help="print the primes in PATH, one per line")
+    cat.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "write":
+        if args.low > args.high:
+            print("LOW must not exceed HIGH", file=sys.stderr)
+            return 1
+        export_primes(args.path, args.low, args.high, args.format, args.workers)
+    try:
+        export = PrimeExport(args.path)
+    except (OSError, InvalidExport) as e:
+        print(e, file=sys.stderr)
+        return 1
+    try:
+        if args.command == "cat":
+            for p in export:
+                sys.stdout.write(f"{p}\n")
+        elif export.format == FORMAT_TEXT:
+            print(f"{args.path}: text, {os.path.getsize(args.path):,} bytes")
+        else:
+            print(f"{args.path}: {export.format}, [{export.low:,}, {export.high:,}], "
+                  f"{export.count:,} primes, {len(export.payload):,} bytes, checksum OK")
+    except BrokenPipeError:
+        sys.stderr.close()
+    finally:
+        export.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import zlib
+from itertools import compress
+
+from sieve import SegmentedSieve
+
+INDEX_PATH = "prime_index.bin"
+DEFAULT_BOUND = 10 ** 8
+
+# magic, format version, layout, bound, payload length, CRC-32 of the payload
+HEADER = struct.Struct("<8sHB5xQQI4x")
+MAGIC = b"PRIMEIDX"
+VERSION = 1
+
+# Odd-only: bit i of the payload is set when 2i + 1 is prime.
+# Wheel-30: byte k holds one bit per residue in WHEEL_RESIDUES for 30k + r,
+# which leaves 2, 3 and 5 out of the bitmap. It is about half the size.
+LAYOUT_ODD = 0
+LAYOUT_WHEEL30 = 1
+WHEEL_RESIDUES = (1, 7, 11, 13, 17, 19, 23, 29)
+_WHEEL_BIT = {r: i for i, r in enumerate(WHEEL_RESIDUES)}
+
+# byte value -> its eight bits as 0/1 bytes, least significant first
+_EXPAND = [bytes((b >> j) & 1 for j in range(8)) for b in range(256)]
+
+
+class InvalidIndex(Exception):
+    pass
+
+
+class PrimeIndex:
+    # Read-only view of an index file. The payload is memory-mapped, so a
+    # lookup below the bound is a single bit test and opening costs only the
+    # checksum pass.
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise InvalidIndex(f"{path} is empty")
+        try:
+            if len(self.map) < HEADER.size:
+                raise InvalidIndex(f"{path} is truncated")
+            magic, version, layout, bound, length, checksum = HEADER.unpack_from(self.map)
+            if magic != MAGIC or version != VERSION or layout not in (LAYOUT_ODD, LAYOUT_WHEEL30):
+                raise InvalidIndex(f"{path} is not a version {VERSION} prime index")
+            if len(self.map) != HEADER.size + length or length != payload_length(bound, layout):
+                raise InvalidIndex(f"{path} is truncated")
+            self.payload = memoryview(self.map)[HEADER.size:]
+            if zlib.crc32(self.payload) != checksum:
+                raise InvalidIndex(f"{path} failed its checksum")
+        except InvalidIndex:
+            self.close()
+            raise
+        self.bound = bound
+        self.layout = layout
+
+    def __contains__(self, n):
+        if n < 2 or n > self.bound:
+            return False
+        if self.layout == LAYOUT_ODD:
+            if n % 2 == 0:
+                return n == 2
+            i = n >> 1
+            return bool(self.payload[i >> 3] >> (i & 7) & 1)
+        bit = _WHEEL_BIT.get(n % 30)
+        if bit is None:
+            return n in (2, 3, 5)
+        return bool(self.payload[n // 30] >> bit & 1)
+
+    def primes(self, limit):
+        # All primes up to min(limit, bound), in order.
+        limit = min(limit, self.bound)
+        if limit < 2:
+            return []
+        if self.layout == LAYOUT_ODD:
+            blocks = (limit >> 1) // 8 + 1
+            flags = b"".join(map(_EXPAND.__getitem__, self.payload[:blocks]))
+            primes = [2]
+            primes += compress(range(1, 16 * blocks, 2), flags)
+        else:
+            blocks = limit // 30 + 1
+            flags = b"".join(map(_EXPAND.__getitem__, self.payload[:blocks]))
+            numbers = (30 * k + r for k in range(blocks) for r in WHEEL_RESIDUES)
+            primes = [p for p in (2, 3, 5) if p <= limit]
+            primes += compress(numbers, flags)
+        while primes[-1] > limit:
+            primes.pop()
+        return primes
+
+    def close(self):
+        if getattr(self, "payload", None) is not None:
+            self.payload.release()
+            self.payload = None
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+
+def payload_length(bound, layout):
+    if layout == LAYOUT_ODD:
+        return (bound >> 1) // 8 + 1
+    return bound // 30 + 1
+
+
+def pack_flags(flags, layout):
+    # flags holds one 0/1 byte per odd number; returns the packed bitmap bytes.
+    if layout == LAYOUT_ODD:
+        lanes = [flags[j::8] for j in range(8)]
+    else:
+        lanes = [flags[(r - 1) // 2::15] for r in WHEEL_RESIDUES]
+    # Lane j supplies bit j of every output byte. The bits never overlap, so
+    # summing the shifted lanes as big integers packs them all at once.
+    packed = 0
+    for j, lane in enumerate(lanes):
+        packed += int.from_bytes(lane, 'little') << j
+    return packed.to_bytes(len(lanes[0]), 'little')
+
+
+def build_index(path=INDEX_PATH, bound=DEFAULT_BOUND, wheel=False, progress=None):
+    # Sieves [0, bound] and writes the index next to path atomically, so a
+    # crash mid-build never leaves a file that passes validation.
+    layout = LAYOUT_WHEEL30 if wheel else LAYOUT_ODD
+    group = 15 if wheel else 8
+    checksum = 0
+    length = 0
+    temp = path + ".tmp"
+    with open(temp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, layout, bound, 0, 0))
+        # pending holds one flag per odd number starting at 1, which is not prime
+        pending = bytearray(1)
+        for _, flags in SegmentedSieve(0, bound).segments(progress):
+            pending += flags
+            usable = len(pending) // group * group
+            chunk = pack_flags(pending[:usable], layout)
+            del pending[:usable]
+            f.write(chunk)
+            checksum = zlib.crc32(chunk, checksum)
+            length += len(chunk)
+        expected = payload_length(bound, layout)
+        if length < expected:
+            pending += bytes(group * (expected - length) - len(pending))
+            chunk = pack_flags(pending, layout)
+            f.write(chunk)
+            checksum = zlib.crc32(chunk, checksum)
+            length += len(chunk)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, layout, bound, length, checksum))
+    os.replace(temp, path)
+
+
+def open_index(path=INDEX_PATH, bound=DEFAULT_BOUND, wheel=False, rebuild=True):
+    # Returns a validated index covering at least bound. A missing, stale,
+    # truncated or corrupt file is rebuilt when rebuild is set; otherwise
+    # None is returned and callers fall back to computing verdicts.
+    try:
+        index = PrimeIndex(path)
+        if index.bound >= bound:
+            return index
+        index.close()
+    except (OSError, InvalidIndex):
+        pass
+    if not rebuild:
+        return None
+    build_index(path, bound, wheel)
+    return PrimeIndex(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="prime_index",
+        description="Build or inspect the memory-mapped prime bitmap used for instant lookups.",
+    )
+    parser.add_argument("--path", default=INDEX_PATH, help="index file (default: %(default)s)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="sieve up to BOUND and write the index")
+    build.add_argument("--bound", type=int, default=DEFAULT_BOUND, help="largest number covered (default: %(default)s)")
+    build.add_argument("--wheel", action="store_true", help="use the smaller wheel-30 layout")
+    sub.add_parser("info", help="validate the index and print its header")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        build_index(args.path, args.bound, args.wheel)
+    try:
+        index = PrimeIndex(args.path)
+    except (OSError, InvalidIndex) as e:
+        print(e, file=sys.stderr)
+        return 1
+    layout = "wheel-30" if index.layout == LAYOUT_WHEEL30 else "odd-only"
+    print(f"{args.path}: {layout}, bound {index.bound:,}, {len(index.payload):,} bytes, checksum OK")
+    index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
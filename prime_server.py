@@ -0,0 +1,341 @@
+import argparse
+import asyncio
+import json
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from batch import check_chunk
+from metrics import MetricsRegistry
+from prime_core import is_prime, backend_for, factorize, count_primes, iter_primes, use_prime_index
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Checks of numbers up to this many bits wait up to BATCH_WINDOW seconds for
+# company and go to the engine together; larger ones are sent on their own.
+BATCH_BITS = 64
+BATCH_WINDOW = 0.002
+BATCH_SIZE = 1024
+# Requests allowed to wait on the engines at once; beyond this they get 503.
+MAX_PENDING = 1000
+MAX_NUMBERS = 10000
+MAX_BODY = 1 << 20
+# Longer inputs are refused with 400 before they are converted or queued;
+# converting decimal text is quadratic and runs on the event loop.
+CHECK_DIGIT_LIMIT = 10000
+FACTOR_DIGIT_LIMIT = 80
+RANGE_LIMIT = 10 ** 14
+RANGE_DIGIT_LIMIT = len(str(RANGE_LIMIT))
+RANGE_LIST_LIMIT = 10 ** 7
+KEEPALIVE_TIMEOUT = 30
+# Endpoints that reach the engines; only these count towards max_pending
+# and get latency histograms.
+COMPUTE_ENDPOINTS = ("check", "factor", "range")
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def list_primes(low, high):
+    return list(iter_primes(low, high))
+
+
+def factor_pairs(n):
+    return [[p, e] for p, e in sorted(factorize(n).items())]
+
+
+def parse_number(value, limit=None):
+    token = str(value).strip()
+    if not token.isdecimal():
+        raise HTTPError(400, f"not a non-negative integer: {token[:40]!r}")
+    if limit is not None and len(token.lstrip("0")) > limit:
+        raise HTTPError(400, f"numbers are limited to {limit} digits here")
+    return int(token)
+
+
+class PrimeService:
+    # Answers check, factor and range requests on a process pool.
+    #
+    # Identical computations that are still running are shared between
+    # requests, and small checks are grouped into one engine call per
+    # BATCH_WINDOW. Once max_pending requests are waiting, new ones are
+    # refused with 503 instead of queueing without bound.
+
+    def __init__(self, workers=None, batch_window=BATCH_WINDOW, batch_size=BATCH_SIZE, max_pending=MAX_PENDING):
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.batch_window = batch_window
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.inflight = {}
+        self.active = 0
+        self.batch = []
+        self.batch_timer = None
+        self.metrics = MetricsRegistry()
+        self.counters = {"requests": 0, "coalesced": 0, "batches": 0, "batched": 0, "rejected": 0}
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, key, start):
+        # Returns the future for key, starting the computation if needed.
+        future = self.inflight.get(key)
+        if future is not None:
+            self.counters["coalesced"] += 1
+            return future
+        future = start()
+        self.inflight[key] = future
+        future.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return future
+
+    def run(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+
+    def check(self, n):
+        if n.bit_length() > BATCH_BITS:
+            return self.submit(("check", n), lambda: self.run(is_prime, n))
+        return self.submit(("check", n), lambda: self.enqueue(n))
+
+    def enqueue(self, n):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.batch.append((n, future))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+        elif self.batch_timer is None:
+            self.batch_timer = loop.call_later(self.batch_window, self.flush)
+        return future
+
+    def flush(self):
+        if self.batch_timer is not None:
+            self.batch_timer.cancel()
+            self.batch_timer = None
+        batch, self.batch = self.batch, []
+        if batch:
+            self.counters["batches"] += 1
+            self.counters["batched"] += len(batch)
+            asyncio.ensure_future(self.run_batch(batch))
+
+    async def run_batch(self, batch):
+        try:
+            with self.metrics.timer("engine_batch"):
+                results = await self.run(check_chunk, [n for n, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), (_, prime) in zip(batch, results):
+            if not future.done():
+                future.set_result(prime)
+
+    async def handle_check(self, numbers):
+        if len(numbers) > MAX_NUMBERS:
+            raise HTTPError(413, f"at most {MAX_NUMBERS} numbers per request")
+        futures = [self.check(n) for n in numbers]
+        verdicts = await asyncio.gather(*map(asyncio.shield, futures))
+        return [{"number": n, "is_prime": prime, "backend": backend_for(n)} for n, prime in zip(numbers, verdicts)]
+
+    async def handle_factor(self, n):
+        factors = await asyncio.shield(self.submit(("factor", n), lambda: self.run(factor_pairs, n)))
+        return {"number": n, "factors": factors}
+
+    async def handle_range(self, low, high, count_only):
+        if low > high or high > RANGE_LIMIT:
+            raise HTTPError(400, f"need low <= high <= {RANGE_LIMIT}")
+        if count_only:
+            count = await asyncio.shield(self.submit(("count", low, high), lambda: self.run(count_primes, low, high)))
+            return {"low": low, "high": high, "count": count}
+        if high - low > RANGE_LIST_LIMIT:
+            raise HTTPError(413, f"listing is limited to ranges of {RANGE_LIST_LIMIT}; use count=1")
+        primes = await asyncio.shield(self.submit(("range", low, high), lambda: self.run(list_primes, low, high)))
+        return {"low": low, "high": high, "count": len(primes), "primes": primes}
+
+    def stats(self):
+        endpoints = {}
+        for name, snapshot in self.metrics.snapshot().items():
+            snapshot.pop("buckets")
+            endpoints[name] = snapshot
+        counters = dict(self.counters)
+        counters["active"] = self.active
+        counters["in_flight"] = len(self.inflight)
+        counters["mean_batch"] = counters["batched"] / counters["batches"] if counters["batches"] else 0.0
+        return {"endpoints": endpoints, "counters": counters}
+
+    async def dispatch(self, method, target, body):
+        # Returns (status, JSON-able payload or text, content type).
+        url = urlsplit(target)
+        endpoint = url.path.strip("/")
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if method not in ("GET", "POST"):
+            raise HTTPError(405, "use GET or POST")
+        if method == "POST" and body:
+            try:
+                # Integers stay text until parse_number has checked their length.
+                data = json.loads(body, parse_int=str)
+            except ValueError:
+                raise HTTPError(400, "body is not valid JSON")
+            if not isinstance(data, dict):
+                raise HTTPError(400, "body must be a JSON object")
+            params.update(data)
+
+        if endpoint == "check":
+            if "numbers" in params:
+                values = params["numbers"]
+                if isinstance(values, str):
+                    values = values.split(",")
+                if not isinstance(values, list):
+                    raise HTTPError(400, "numbers must be a list")
+                results = await self.handle_check([parse_number(v, CHECK_DIGIT_LIMIT) for v in values])
+                return 200, {"results": results}, "application/json"
+            results = await self.handle_check([parse_number(params.get("n", params.get("number", "")), CHECK_DIGIT_LIMIT)])
+            return 200, results[0], "application/json"
+        if endpoint == "factor":
+            n = parse_number(params.get("n", params.get("number", "")), FACTOR_DIGIT_LIMIT)
+            return 200, await self.handle_factor(n), "application/json"
+        if endpoint == "range":
+            count_only = str(params.get("count", "")).lower() in ("1", "true", "yes")
+            low = parse_number(params.get("low", ""), RANGE_DIGIT_LIMIT)
+            high = parse_number(params.get("high", ""), RANGE_DIGIT_LIMIT)
+            return 200, await self.handle_range(low, high, count_only), "application/json"
+        if endpoint == "stats":
+            return 200, self.stats(), "application/json"
+        if endpoint == "metrics":
+            return 200, self.metrics.to_prometheus(), "text/plain; version=0.0.4"
+        raise HTTPError(404, f"no endpoint /{endpoint}")
+
+    async def handle_connection(self, reader, writer):
+        # HTTP/1.1 with keep-alive; requests on one connection are answered
+        # in order.
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not line.strip():
+                    break
+                started = time.perf_counter()
+                keep_alive = True
+                endpoint = None
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                    headers = {}
+                    while True:
+                        header = await reader.readline()
+                        if header in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = header.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY:
+                        keep_alive = False
+                        raise HTTPError(413, "request body too large")
+                    body = await reader.readexactly(length) if length else b""
+                    endpoint = urlsplit(target).path.strip("/")
+                    self.counters["requests"] += 1
+                    if endpoint not in COMPUTE_ENDPOINTS:
+                        status, payload, content_type = await self.dispatch(method, target, body)
+                    elif self.active >= self.max_pending:
+                        self.counters["rejected"] += 1
+                        raise HTTPError(503, "too many requests in flight")
+                    else:
+                        self.active += 1
+                        try:
+                            status, payload, content_type = await self.dispatch(method, target, body)
+                        finally:
+                            self.active -= 1
+                except HTTPError as exc:
+                    status, payload, content_type = exc.status, {"error": str(exc)}, "application/json"
+                except ValueError:
+                    status, payload, content_type = 400, {"error": "malformed request"}, "application/json"
+                    keep_alive = False
+                except Exception as exc:
+                    status, payload, content_type = 500, {"error": str(exc)}, "application/json"
+
+                if not isinstance(payload, str):
+                    payload = json.dumps(payload, separators=(",", ":"))
+                data = payload.encode()
+                head = [
+                    f"HTTP/1.1 {status} {REASONS.get(status, 'Internal Server Error')}",
+                    f"Content-Type: {content_type}",
+                    f"Content-Length: {len(data)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ]
+                if status == 503:
+                    head.append("Retry-After: 1")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+                await writer.drain()
+                if endpoint in COMPUTE_ENDPOINTS:
+                    self.metrics.observe(endpoint, time.perf_counter() - started)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT, unix=None):
+    # Start the engine processes before the socket exists so forked workers
+    # do not inherit it and keep the port open after the server exits.
+    await service.run(is_prime, 2)
+    if unix:
+        server = await asyncio.start_unix_server(service.handle_connection, unix)
+        where = unix
+    else:
+        server = await asyncio.start_server(service.handle_connection, host, port)
+        where = "http://%s:%d" % server.sockets[0].getsockname()[:2]
+    print(f"Serving on {where} (check, factor, range, stats, metrics)", file=sys.stderr)
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, server.close)
+    except (NotImplementedError, AttributeError):
+        pass
+    async with server:
+        try:
+            await server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="prime_server",
+        description="Serve check, factor and range queries as JSON over local HTTP.",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to bind (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port (default: %(default)s)")
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="engine processes (default: all cores)")
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW * 1000,
+                        help="how long small checks wait to be batched (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="largest batch (default: %(default)s)")
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING,
+                        help="computations in flight before answering 503 (default: %(default)s)")
+    parser.add_argument("--index", metavar="FILE", help="answer small numbers from this prime bitmap")
+    args = parser.parse_args(argv)
+
+    if args.index:
+        use_prime_index(args.index)
+    service = PrimeService(args.workers, args.batch_window_ms / 1000, args.batch_size, args.max_pending)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
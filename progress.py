@@ -0,0 +1,50 @@
+import time
+
+
+class Cancelled(Exception):
+    pass
+
+
+class ProgressTracker:
+    # Shared by the engines for cooperative cancellation and throttled progress
+    # reports. Engines call update() with the fraction of their search space
+    # covered; update() raises Cancelled once cancel() has been requested.
+
+    def __init__(self, callback=None, interval=0.1):
+        self.callback = callback
+        self.interval = interval
+        self.cancelled = False
+        self.started = time.perf_counter()
+        self.last_report = 0.0
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check(self):
+        if self.cancelled:
+            raise Cancelled()
+
+    def update(self, fraction):
+        if self.cancelled:
+            raise Cancelled()
+        if self.callback is None:
+            return
+        now = time.perf_counter()
+        if now - self.last_report < self.interval:
+            return
+        self.last_report = now
+        fraction = min(max(fraction, 0.0), 1.0)
+        elapsed = now - self.started
+        eta = elapsed * (1 - fraction) / fraction if fraction > 0 else -1.0
+        self.callback(fraction * 100, eta)
+
+
+def format_eta(seconds):
+    if seconds < 0:
+        return "—"
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
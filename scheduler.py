@@ -0,0 +1,237 @@
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from progress import ProgressTracker, format_eta
+
+# Priority classes, served in this order. Interactive jobs (single checks,
+# navigation) start at once; background jobs (ranges, batches, exports,
+# factoring) share a bounded number of running slots and queue behind them.
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# Background jobs running at the same time; later ones wait as "queued".
+MAX_BACKGROUND_JOBS = 2
+# Chunks in flight per pool process, counted over all jobs; small enough
+# that a newly started job gets a slot within about one chunk's time.
+CHUNKS_PER_WORKER = 2
+# Pool processes run at this niceness, so the GUI process and its
+# interactive checks win the CPU whenever they need it.
+POOL_NICENESS = 10
+# Finished jobs kept for the job queue view.
+FINISHED_JOBS_KEPT = 20
+CANCEL_POLL_INTERVAL = 0.1
+TABLE_HEADER = f"{'#':>4} {'job':32} {'class':11} {'state':9} {'%':>6} {'items/s':>11} {'eta':>8}"
+
+
+def _lower_priority():
+    if hasattr(os, "nice"):
+        try:
+            os.nice(POOL_NICENESS)
+        except OSError:
+            pass
+
+
+class Job(ProgressTracker):
+    # The progress tracker handed to a job's engine, plus what the job queue
+    # view shows: state, throughput over total items (numbers sieved or
+    # checked; None when there is no natural unit) and ETA.
+    _ids = itertools.count(1)
+
+    def __init__(self, name, priority=BACKGROUND, total=None, callback=None):
+        super().__init__(callback)
+        self.id = next(Job._ids)
+        self.name = name
+        self.priority = priority
+        self.total = total
+        self.state = "queued"
+        self.fraction = 0.0
+        self.finished = None
+
+    def start(self):
+        self.state = "running"
+        self.started = time.perf_counter()
+
+    def update(self, fraction):
+        self.fraction = fraction
+        super().update(fraction)
+
+    def elapsed(self):
+        if self.state == "queued":
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def rate(self):
+        # Items per second, or None without a total.
+        elapsed = self.elapsed()
+        if self.total is None or elapsed <= 0:
+            return None
+        return self.fraction * self.total / elapsed
+
+    def eta(self):
+        if self.state != "running" or self.fraction <= 0:
+            return -1.0
+        return self.elapsed() * (1 - self.fraction) / self.fraction
+
+
+class JobExecutor:
+    # What a job's engine sees of the shared pool: submit() waits for one of
+    # the scheduler's chunk slots, and shutdown() only drops this job's
+    # futures, so engines can treat it like their own ProcessPoolExecutor.
+
+    def __init__(self, scheduler, job):
+        self.scheduler = scheduler
+        self.job = job
+        self.workers = scheduler.workers
+        self.futures = set()
+
+    def submit(self, fn, *args):
+        self.scheduler.acquire(self.job)
+        try:
+            future = self.scheduler.pool().submit(fn, *args)
+        except BaseException:
+            self.scheduler.release(self.job)
+            raise
+        self.futures.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        self.futures.discard(future)
+        self.scheduler.release(self.job)
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        if cancel_futures:
+            for future in list(self.futures):
+                future.cancel()
+
+
+class JobScheduler:
+    # Tracks every job of the application and decides which may run. All
+    # background chunks go through one process pool of `workers` processes
+    # (one core is left to the GUI); its slots are handed out one chunk at a
+    # time to the waiting job of highest priority with the fewest chunks in
+    # flight, so concurrent jobs interleave instead of running back to back.
+
+    def __init__(self, workers=None, max_background=MAX_BACKGROUND_JOBS):
+        self.workers = workers or max(1, (os.cpu_count() or 1) - 1)
+        self.max_background = max_background
+        self.slots = self.workers * CHUNKS_PER_WORKER
+        self.jobs = []
+        self.inflight = {}
+        self.waiting = []
+        self.condition = threading.Condition()
+        self._pool = None
+
+    def pool(self):
+        # Spawned, not forked: the pool starts from whichever job thread
+        # submits first, and a fork while another thread holds a lock (the
+        # shared-memory resource tracker's, for one) can deadlock the child.
+        with self.condition:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_lower_priority,
+                )
+            return self._pool
+
+    def executor(self, job):
+        return JobExecutor(self, job)
+
+    def submit(self, job):
+        with self.condition:
+            self.jobs.append(job)
+        return job
+
+    def admit(self):
+        # Starts and returns the queued jobs that may run now: every
+        # interactive one, and background ones while slots are free.
+        started = []
+        with self.condition:
+            running = sum(1 for job in self.jobs if job.state == "running" and job.priority != INTERACTIVE)
+            for job in sorted(self.jobs, key=lambda job: job.priority):
+                if job.state != "queued":
+                    continue
+                if job.priority != INTERACTIVE:
+                    if running >= self.max_background:
+                        continue
+                    running += 1
+                job.start()
+                started.append(job)
+        return started
+
+    def finish(self, job, state="done"):
+        with self.condition:
+            if job.state in ("queued", "running"):
+                job.state = state
+                job.finished = time.perf_counter()
+                if state == "done":
+                    job.fraction = 1.0
+            finished = [j for j in self.jobs if j.finished is not None]
+            for old in finished[:-FINISHED_JOBS_KEPT]:
+                self.jobs.remove(old)
+
+    def cancel(self, job):
+        # A queued job is dropped here; a running one stops at its next
+        # progress update and is finished by whoever runs it.
+        job.cancel()
+        if job.state == "queued":
+            self.finish(job, "cancelled")
+
+    def active(self):
+        with self.condition:
+            return [job for job in self.jobs if job.state in ("queued", "running")]
+
+    def acquire(self, job):
+        with self.condition:
+            self.waiting.append(job)
+            try:
+                while not self._turn(job):
+                    self.condition.wait(CANCEL_POLL_INTERVAL)
+                    job.check()
+            finally:
+                self.waiting.remove(job)
+                self.condition.notify_all()
+            self.inflight[job.id] = self.inflight.get(job.id, 0) + 1
+
+    def _turn(self, job):
+        if sum(self.inflight.values()) >= self.slots:
+            return False
+        best = min(self.waiting, key=lambda j: (j.priority, self.inflight.get(j.id, 0), self.waiting.index(j)))
+        return best is job
+
+    def release(self, job):
+        with self.condition:
+            self.inflight[job.id] -= 1
+            if not self.inflight[job.id]:
+                del self.inflight[job.id]
+            self.condition.notify_all()
+
+    def shutdown(self):
+        for job in self.active():
+            self.cancel(job)
+        with self.condition:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def snapshot(self):
+        # Every tracked job, newest first.
+        with self.condition:
+            return list(reversed(self.jobs))
+
+    def format_table(self):
+        # Plain-text view of the queue, under TABLE_HEADER.
+        return "\n".join([TABLE_HEADER] + [format_job(job) for job in self.snapshot()])
+
+
+def format_job(job):
+    rate = job.rate()
+    return (
+        f"{job.id:>4} {job.name[:32]:32} {PRIORITY_NAMES[job.priority]:11} {job.state:9} "
+        f"{job.fraction * 100:>5.1f}% {'—' if rate is None else f'{rate:,.0f}':>11} {format_eta(job.eta()):>8}"
+    )
@@ -0,0 +1,83 @@
+import math
+from itertools import compress
+
+from primality import primes_up_to
+
+# One byte per odd number; 256 KiB segments stay inside a typical L2 cache.
+SEGMENT_SIZE = 1 << 18
+
+
+class SegmentedSieve:
+    def __init__(self, low, high, segment_size=SEGMENT_SIZE, base_primes=None):
+        # Sieves the closed interval [low, high] one segment at a time.
+        # base_primes may be any ascending list of odd primes that reaches
+        # sqrt(high); callers sieving many windows pass one shared list.
+        self.low = max(low, 0)
+        self.high = high
+        self.segment_size = segment_size
+        if base_primes is None:
+            base_primes = primes_up_to(math.isqrt(max(high, 0)))[1:]
+        self.base_primes = base_primes
+
+    def segments(self, progress=None):
+        # Yields (start, flags) where flags[i] is 1 when start + 2 * i is prime.
+        if self.high < 3 or self.low > self.high:
+            return
+        start = origin = max(self.low, 3) | 1
+        span = 2 * self.segment_size
+        zeros = memoryview(bytes(self.segment_size))
+        offsets = {}
+        while start <= self.high:
+            end = min(start + span - 2, self.high)
+            size = (end - start) // 2 + 1
+            flags = bytearray(b'\x01') * size
+            for p in self.base_primes:
+                if p * p > end:
+                    break
+                idx = offsets.get(p)
+                if idx is None:
+                    first = max(p * p, (start + p - 1) // p * p)
+                    if first % 2 == 0:
+                        first += p
+                    idx = (first - start) // 2
+                if idx < size:
+                    count = (size - 1 - idx) // p + 1
+                    flags[idx::p] = zeros[:count]
+                    idx += count * p
+                offsets[p] = idx - size
+            if progress is not None:
+                progress.update((end - origin + 1) / (self.high - origin + 1))
+            yield start, flags
+            start += span
+
+    def includes_two(self):
+        return self.low <= 2 <= self.high
+
+    def prime_chunks(self, progress=None):
+        if self.includes_two():
+            yield [2]
+        for start, flags in self.segments(progress):
+            yield segment_primes(start, flags)
+
+    def count(self, progress=None):
+        total = 1 if self.includes_two() else 0
+        for _, flags in self.segments(progress):
+            total += flags.count(1)
+        return total
+
+
+def segment_primes(start, flags):
+    return list(compress(range(start, start + 2 * len(flags), 2), flags))
+
+
+def iter_primes(low, high):
+    for chunk in SegmentedSieve(low, high).prime_chunks():
+        yield from chunk
+
+
+def count_primes(low, high, progress=None):
+    return SegmentedSieve(low, high).count(progress)
+
+
+def prime_pi(x, progress=None):
+    return count_primes(0, x, progress)
@@ -0,0 +1,418 @@
+import bisect
+import math
+import multiprocessing
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from parallel_sieve import CANCEL_POLL_INTERVAL
+from primality import primes_up_to
+
+# NumPy is imported on first use and only speeds up the sieve array; without
+# it the same sieve runs on a Python list.
+np = None
+_numpy_missing = False
+
+# (largest n digits, factor base size, sieve half-width M). Compared with
+# the usual C tables the factor bases are smaller and the intervals wider:
+# here every polynomial switch costs a Python loop over the factor base,
+# while the sieve itself runs in NumPy.
+SIQS_PARAMETERS = (
+    (30, 150, 65536),
+    (34, 200, 65536),
+    (38, 300, 131072),
+    (42, 450, 196608),
+    (46, 700, 262144),
+    (50, 1200, 393216),
+    (54, 1700, 393216),
+    (58, 2000, 524288),
+    (62, 2800, 524288),
+    (66, 3800, 655360),
+    (70, 5000, 786432),
+    (None, 6500, 786432),
+)
+EXTRA_RELATIONS = 30
+# A sieve hit may leave one prime cofactor up to this multiple of the largest
+# factor base prime; two such partial relations with the same prime combine
+# into a full one.
+LARGE_PRIME_MULTIPLIER = 64
+# Factor base primes below this are not sieved; the threshold is lowered by
+# their expected contribution instead.
+SIEVE_MIN_PRIME = 30
+# Candidates must reach log2 |h(x)| minus this many bits of the largest
+# factor base prime.
+THRESHOLD_SLACK = 2.0
+# Each pool task handles this many A values (2**(s-1) polynomials each).
+A_PER_TASK = 4
+# Smaller n are done before a process pool would have started up.
+PARALLEL_MIN_DIGITS = 45
+
+
+def _load_numpy():
+    global np, _numpy_missing
+    if np is None and not _numpy_missing:
+        try:
+            import numpy
+        except ImportError:
+            _numpy_missing = True
+        else:
+            np = numpy
+    return np
+
+
+def available():
+    # Without NumPy the sieve runs on Python lists, too slow to beat ECM.
+    return _load_numpy() is not None
+
+
+def parameters(n):
+    digits = len(str(n))
+    for max_digits, fb_size, m in SIQS_PARAMETERS:
+        if max_digits is None or digits <= max_digits:
+            return fb_size, m
+
+
+def sqrt_mod(a, p):
+    # Tonelli-Shanks: x with x * x = a (mod p), for a quadratic residue a.
+    a %= p
+    if p == 2 or a == 0:
+        return a
+    if p % 4 == 3:
+        return pow(a, (p + 1) // 4, p)
+    q, s = p - 1, 0
+    while q % 2 == 0:
+        q //= 2
+        s += 1
+    z = 2
+    while pow(z, (p - 1) // 2, p) != p - 1:
+        z += 1
+    m, c, t, r = s, pow(z, q, p), pow(a, q, p), pow(a, (q + 1) // 2, p)
+    while t != 1:
+        i, t2 = 0, t
+        while t2 != 1:
+            t2 = t2 * t2 % p
+            i += 1
+        b = pow(c, 1 << (m - i - 1), p)
+        m, c, t, r = i, b * b % p, t * b * b % p, r * b % p
+    return r
+
+
+class FactorFound(Exception):
+    # A factor base prime or a large prime turned out to divide n.
+    def __init__(self, factor):
+        super().__init__(factor)
+        self.factor = factor
+
+
+def factor_base(n, size):
+    # Primes p with n a quadratic residue mod p, as (p, sqrt(n) mod p, log2 p).
+    base = []
+    limit = max(100, size * 30)
+    while len(base) < size:
+        base = []
+        for p in primes_up_to(limit):
+            if n % p == 0:
+                raise FactorFound(p)
+            if p == 2 or pow(n, (p - 1) // 2, p) == 1:
+                base.append((p, sqrt_mod(n, p), round(math.log2(p))))
+                if len(base) == size:
+                    break
+        limit *= 2
+    return base
+
+
+class RelationSieve:
+    # Collects relations u^2 = A * h(x) (mod n) with h(x) smooth over the
+    # factor base. Relations are (u, {index: exponent}, extra) where index 0
+    # stands for -1, index i + 1 for base[i], and extra is a square root of
+    # any non-base square (a combined large prime) in the product.
+
+    def __init__(self, n, fb_size=None, m=None):
+        default_size, default_m = parameters(n)
+        self.n = n
+        self.m = m or default_m
+        self.base = factor_base(n, fb_size or default_size)
+        self.primes = [p for p, _, _ in self.base]
+        self.pmax = self.primes[-1]
+        self.large_bound = self.pmax * LARGE_PRIME_MULTIPLIER
+        skipped = sum(2 * lp / (p - 1) for p, _, lp in self.base if p < SIEVE_MIN_PRIME)
+        self.threshold = int(math.log2(self.m * math.isqrt(n)) - THRESHOLD_SLACK * math.log2(self.pmax) - skipped)
+        # A is a product of s base primes chosen from the upper part of the
+        # base so that A is close to sqrt(2n) / M.
+        self.target = math.isqrt(2 * n) // self.m
+        low = next((i for i, p in enumerate(self.primes) if p > 400), len(self.primes) // 2)
+        self.q_range = (min(low, len(self.primes) // 2), len(self.primes))
+        self.used_a = set()
+
+    def choose_a(self, rng):
+        lo, hi = self.q_range
+        log_target = math.log(self.target)
+        best = None
+        for _ in range(30):
+            a, picked = 1, set()
+            while True:
+                i = rng.randrange(lo, hi)
+                if i in picked:
+                    continue
+                if a * self.primes[i] * self.primes[(lo + hi) // 2] > self.target and picked:
+                    break
+                picked.add(i)
+                a *= self.primes[i]
+            # Finish with the prime that brings A closest to the target.
+            rest = self.target // a
+            i = min(max(bisect.bisect_left(self.primes, rest, lo, hi), lo), hi - 1)
+            nearby = [j for j in range(i - 2, i + 3) if lo <= j < hi and j not in picked]
+            if not nearby:
+                continue
+            i = min(nearby, key=lambda j: abs(self.primes[j] - rest))
+            picked.add(i)
+            a *= self.primes[i]
+            score = abs(math.log(a) - log_target)
+            if a not in self.used_a and (best is None or score < best[0]):
+                best = (score, a, sorted(picked))
+        if best is None:
+            return None
+        self.used_a.add(best[1])
+        return best[1], best[2]
+
+    def collect(self, rng, a_count=A_PER_TASK):
+        # Returns (full relations, partial relations keyed by large prime).
+        fulls, partials = [], {}
+        for _ in range(a_count):
+            chosen = self.choose_a(rng)
+            if chosen is None:
+                break
+            self.sieve_family(*chosen, fulls, partials)
+        return fulls, partials
+
+    def sieve_family(self, a, q_indices, fulls, partials):
+        m = self.m
+        q_set = set(q_indices)
+        b_terms = []
+        for i in q_indices:
+            q, root, _ = self.base[i]
+            rest = a // q
+            gamma = root * pow(rest, -1, q) % q
+            if gamma > q // 2:
+                gamma = q - gamma
+            b_terms.append(rest * gamma)
+        b = sum(b_terms)
+
+        # Sieve start offsets for every base prime not dividing A, and the
+        # per-B_j steps used to move them between polynomials.
+        entries, r1, r2 = [], [], []
+        for i, (p, root, lp) in enumerate(self.base):
+            if i in q_set:
+                continue
+            a_inv = pow(a % p, -1, p)
+            entries.append((i, p, lp, [2 * bj * a_inv % p for bj in b_terms]))
+            r1.append((a_inv * (root - b) + m) % p)
+            r2.append((a_inv * (-root - b) + m) % p)
+
+        s = len(q_indices)
+        for k in range(1 << (s - 1)):
+            if k:
+                # Gray code: the next b differs from this one by 2 * B_v.
+                v = (k & -k).bit_length()
+                sign = -1 if (k >> v) & 1 == 0 else 1
+                b += 2 * sign * b_terms[v - 1]
+                for j, e in enumerate(entries):
+                    p, step = e[1], e[3][v - 1] * sign
+                    r1[j] = (r1[j] - step) % p
+                    r2[j] = (r2[j] - step) % p
+            self.sieve_polynomial(a, b, q_indices, entries, r1, r2, fulls, partials)
+
+    def sieve_polynomial(self, a, b, q_indices, entries, r1, r2, fulls, partials):
+        n, m = self.n, self.m
+        size = 2 * m
+        numpy = _load_numpy()
+        if numpy is not None:
+            sieve = numpy.zeros(size, dtype=numpy.uint8)
+            for (_, p, lp, *_), s1, s2 in zip(entries, r1, r2):
+                if p < SIEVE_MIN_PRIME:
+                    continue
+                sieve[s1::p] += lp
+                if s2 != s1:
+                    sieve[s2::p] += lp
+            candidates = numpy.flatnonzero(sieve > self.threshold)
+            # Which base primes divide h at each candidate, read off the
+            # sieve offsets for all candidates at once.
+            primes = numpy.array([e[1] for e in entries])
+            offsets = candidates[:, None]
+            hits = ((offsets - numpy.array(r1)) % primes == 0) | ((offsets - numpy.array(r2)) % primes == 0)
+            divisors = [numpy.flatnonzero(row).tolist() for row in hits]
+            candidates = candidates.tolist()
+        else:
+            sieve = [0] * size
+            for (_, p, lp, *_), s1, s2 in zip(entries, r1, r2):
+                if p < SIEVE_MIN_PRIME:
+                    continue
+                for j in range(s1, size, p):
+                    sieve[j] += lp
+                if s2 != s1:
+                    for j in range(s2, size, p):
+                        sieve[j] += lp
+            candidates = [j for j, v in enumerate(sieve) if v > self.threshold]
+            divisors = [[k for k, (e, s1, s2) in enumerate(zip(entries, r1, r2))
+                         if (j - s1) % e[1] == 0 or (j - s2) % e[1] == 0] for j in candidates]
+
+        c = (b * b - n) // a
+        for j, dividing in zip(candidates, divisors):
+            x = j - m
+            h = (a * x + 2 * b) * x + c
+            factors = {}
+            if h < 0:
+                factors[0] = 1
+                h = -h
+            for i in q_indices:
+                factors[i + 1] = 1
+                p = self.primes[i]
+                while h % p == 0:
+                    h //= p
+                    factors[i + 1] += 1
+            for k in dividing:
+                i, p = entries[k][:2]
+                e = 0
+                while h % p == 0:
+                    h //= p
+                    e += 1
+                if e:
+                    factors[i + 1] = e
+            u = a * x + b
+            if h == 1:
+                fulls.append((u, factors, 1))
+            elif h < self.large_bound:
+                partials.setdefault(h, (u, factors))
+
+
+def _collect_task(n, fb_size, m, seed, a_count):
+    sieve = RelationSieve(n, fb_size, m)
+    return sieve.collect(random.Random(seed), a_count)
+
+
+def combine_partials(n, partials, matched, fulls):
+    # Merges newly found partial relations into matched, turning every pair
+    # with the same large prime L into a full relation with extra root L.
+    for large, (u, factors) in partials.items():
+        first = matched.get(large)
+        if first is None:
+            matched[large] = (u, factors)
+            continue
+        g = math.gcd(large, n)
+        if 1 < g < n:
+            raise FactorFound(g)
+        u1, f1 = first
+        combined = dict(f1)
+        for i, e in factors.items():
+            combined[i] = combined.get(i, 0) + e
+        fulls.append((u1 * u % n, combined, large))
+
+
+def _prune_singletons(relations):
+    # Structured elimination, first pass: a relation holding the only odd
+    # exponent of some prime can never be part of a square.
+    while True:
+        counts = {}
+        for _, factors, _ in relations:
+            for i, e in factors.items():
+                if e & 1:
+                    counts[i] = counts.get(i, 0) + 1
+        kept = [r for r in relations if all(counts[i] > 1 for i, e in r[1].items() if e & 1)]
+        if len(kept) == len(relations):
+            return kept
+        relations = kept
+
+
+def dependencies(relations):
+    # Yields sets of relation indices whose exponent vectors sum to zero
+    # over GF(2). Rows are reduced against earlier pivots one at a time, so
+    # the first dependency is found as soon as the rank stops growing.
+    pivots = {}
+    for k, (_, factors, _) in enumerate(relations):
+        row = 0
+        for i, e in factors.items():
+            if e & 1:
+                row |= 1 << i
+        history = 1 << k
+        while row:
+            low = row & -row
+            pivot = pivots.get(low)
+            if pivot is None:
+                pivots[low] = (row, history)
+                break
+            row ^= pivot[0]
+            history ^= pivot[1]
+        else:
+            yield [i for i in range(k + 1) if history >> i & 1]
+
+
+def square_root_step(n, primes, relations):
+    for subset in dependencies(relations):
+        x = 1
+        y = 1
+        exponents = {}
+        for k in subset:
+            u, factors, extra = relations[k]
+            x = x * u % n
+            y = y * extra % n
+            for i, e in factors.items():
+                exponents[i] = exponents.get(i, 0) + e
+        for i, e in exponents.items():
+            if i:
+                y = y * pow(primes[i - 1], e // 2, n) % n
+        g = math.gcd(x - y, n)
+        if 1 < g < n:
+            return g
+    return None
+
+
+def siqs(n, workers=None, tick=None, seed=None, executor=None):
+    # A non-trivial factor of the odd composite n, which must not be a
+    # perfect power. Relations are collected on a process pool of workers
+    # (default: all cores) for n of PARALLEL_MIN_DIGITS and up; given an
+    # executor (a scheduler's JobExecutor), on that shared pool instead.
+    # tick(fraction) follows the collection and may raise to cancel it.
+    n = int(n)
+    fb_size, m = parameters(n)
+    try:
+        sieve = RelationSieve(n, fb_size, m)
+    except FactorFound as found:
+        return found.factor
+    workers = executor.workers if executor is not None else workers or os.cpu_count() or 1
+    parallel = len(str(n)) >= PARALLEL_MIN_DIGITS and (executor is not None or workers > 1)
+    needed = len(sieve.base) + 1 + EXTRA_RELATIONS
+    rng = random.Random(n if seed is None else seed)
+    fulls, matched, seen = [], {}, set()
+    pool = None
+    if parallel:
+        # Spawned, not forked: siqs() is called from worker threads, and a
+        # fork while another thread holds a lock can deadlock the child.
+        pool = executor or ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    pending = set()
+    try:
+        while True:
+            if pool is None:
+                batches = [sieve.collect(rng, 1)]
+            else:
+                while len(pending) < workers * 2:
+                    pending.add(pool.submit(_collect_task, n, fb_size, m, rng.getrandbits(64), A_PER_TASK))
+                done, pending = wait(pending, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                batches = [future.result() for future in done]
+            for new_fulls, new_partials in batches:
+                for relation in new_fulls:
+                    if relation[0] % n not in seen:
+                        seen.add(relation[0] % n)
+                        fulls.append(relation)
+                combine_partials(n, new_partials, matched, fulls)
+            if tick is not None:
+                tick(min(len(fulls) / needed, 1.0))
+            if len(fulls) >= needed:
+                d = square_root_step(n, sieve.primes, _prune_singletons(fulls))
+                if d:
+                    return d
+                needed += EXTRA_RELATIONS
+    except FactorFound as found:
+        return found.factor
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
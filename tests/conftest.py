@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the top of the repository, next to this directory.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import factorization
+import primality
+
+
+@pytest.fixture(params=["gmpy2", "python"])
+def backend(request, monkeypatch):
+    # Runs a test once on gmpy2 (when installed) and once on pure Python.
+    if request.param == "gmpy2":
+        if primality.gmpy2 is None:
+            pytest.skip("gmpy2 is not installed")
+    else:
+        monkeypatch.setattr(primality, "gmpy2", None)
+        monkeypatch.setattr(factorization, "gmpy2", None)
+    return request.param
@@ -0,0 +1,88 @@
+import pytest
+
+from batch import check_chunk, iter_batch_results, parse_numbers
+from primality import is_prime
+from progress import Cancelled, ProgressTracker
+from scheduler import Job, JobScheduler
+
+
+class Recorder(ProgressTracker):
+    def __init__(self):
+        super().__init__()
+        self.fractions = []
+
+    def update(self, fraction):
+        self.fractions.append(fraction)
+        super().update(fraction)
+
+
+def test_parse_numbers():
+    assert parse_numbers("97, 91;561\n\n 7919\t0 -5 abc 1e3 ²3 ٣") == ([97, 91, 561, 7919, 3], 5)
+    assert parse_numbers("") == ([], 0)
+
+
+def test_check_chunk():
+    numbers = list(range(3000)) + [2 ** 89 - 1]
+    assert check_chunk(numbers) == [(n, is_prime(n)) for n in numbers]
+
+
+def test_results_keep_input_order():
+    # The first chunks hold the slowest numbers, so later chunks finish first.
+    numbers = [2 ** 607 - 1, 2 ** 521 - 1] * 8 + list(range(1, 5000))
+    chunks = list(iter_batch_results(numbers, workers=2, chunk_size=7))
+    assert [len(chunk) for chunk in chunks[:-1]] == [7] * (len(chunks) - 1)
+    assert [pair for chunk in chunks for pair in chunk] == [(n, is_prime(n)) for n in numbers]
+
+
+def test_input_is_consumed_lazily():
+    consumed = []
+
+    def numbers():
+        for n in range(1, 100000):
+            consumed.append(n)
+            yield n
+
+    results = iter_batch_results(numbers(), workers=2, chunk_size=100)
+    first = next(results)
+    assert first == [(n, is_prime(n)) for n in range(1, 101)]
+    # Eight chunks in flight, plus the one being read.
+    assert len(consumed) <= 9 * 100
+    results.close()
+    assert len(consumed) < 100000
+
+
+def test_progress_with_and_without_total():
+    progress = Recorder()
+    list(iter_batch_results(list(range(1, 1001)), workers=1, chunk_size=100, progress=progress))
+    assert progress.fractions == [k / 10 for k in range(1, 11)]
+
+    progress = Recorder()
+    list(iter_batch_results(iter(range(1, 1001)), workers=1, chunk_size=100, progress=progress))
+    assert progress.fractions == []
+    progress = Recorder()
+    list(iter_batch_results(iter(range(1, 1001)), workers=1, chunk_size=100, progress=progress, total=2000))
+    assert progress.fractions == [k / 20 for k in range(1, 11)]
+
+
+@pytest.mark.parametrize("sized", (True, False))
+def test_cancel_stops_the_batch(sized):
+    progress = Recorder()
+    numbers = range(1, 100001)
+    results = iter_batch_results(list(numbers) if sized else iter(numbers), workers=1, chunk_size=100, progress=progress)
+    next(results)
+    progress.cancel()
+    with pytest.raises(Cancelled):
+        next(results)
+
+
+def test_scheduler_executor():
+    scheduler = JobScheduler(workers=1)
+    job = scheduler.submit(Job("batch", total=3000))
+    scheduler.admit()
+    try:
+        numbers = list(range(1, 3001))
+        chunks = iter_batch_results(numbers, chunk_size=500, progress=job, executor=scheduler.executor(job))
+        assert [pair for chunk in chunks for pair in chunk] == [(n, is_prime(n)) for n in numbers]
+        assert job.fraction == 1.0
+    finally:
+        scheduler.shutdown()
@@ -0,0 +1,98 @@
+import itertools
+
+import pytest
+
+import cache
+from cache import SQL_BATCH, ResultCache
+
+
+@pytest.fixture
+def path(tmp_path, monkeypatch):
+    # A clock that always moves forward, so access order decides evictions.
+    ticks = itertools.count(1)
+    monkeypatch.setattr(cache.time, "time", lambda: float(next(ticks)))
+    return str(tmp_path / "cache.db")
+
+
+def test_round_trip_and_counters(path):
+    results = ResultCache(path)
+    assert results.get(91) is None
+    results.put(91, False, [7, 13])
+    results.put(97, True)
+    results.put(2 ** 127 - 1, True, None)
+    assert results.get(91) == (False, [7, 13])
+    assert results.get(97) == (True, [])
+    assert results.get(2 ** 127 - 1, need_divisors=True) == (True, [])
+    assert (results.hits, results.misses) == (3, 1)
+    results.clear()
+    assert results.get(91) is None
+    results.close()
+
+
+def test_entries_survive_a_restart(path):
+    results = ResultCache(path)
+    results.put(2 ** 89 + 1, False, [3, 179, 62020897])
+    results.put(1001, False)
+    results.close()
+
+    results = ResultCache(path)
+    assert results.memory == {}
+    assert results.get(2 ** 89 + 1) == (False, [3, 179, 62020897])
+    assert results.get(1001) == (False, None)
+    results.close()
+
+
+def test_verdicts_do_not_replace_divisors(path):
+    results = ResultCache(path)
+    results.put(1001, False)
+    assert results.get(1001) == (False, None)
+    assert results.get(1001, need_divisors=True) is None
+    results.put(1001, False, [7, 11, 13, 77, 91, 143])
+    results.put_many([(1001, False, None)])
+    assert results.get(1001, need_divisors=True) == (False, [7, 11, 13, 77, 91, 143])
+    results.close()
+
+    # Nor on disk, where the verdict-only write is ignored.
+    results = ResultCache(path)
+    results.put(1001, False)
+    results.memory.clear()
+    assert results.get(1001, need_divisors=True) == (False, [7, 11, 13, 77, 91, 143])
+    results.close()
+
+
+def test_memory_tier_is_bounded(path):
+    results = ResultCache(path, memory_entries=3)
+    for n in range(10, 20):
+        results.put(n, False, [2])
+    results.get(16)
+    results.put(20, False, [2])
+    assert list(results.memory) == [19, 16, 20]
+    # Evicted entries are still on disk.
+    assert results.get(10) == (False, [2])
+    assert list(results.memory) == [16, 20, 10]
+    results.close()
+
+
+def test_disk_tier_drops_least_recently_used(path):
+    results = ResultCache(path, memory_entries=1, disk_entries=5)
+    for n in range(10):
+        results.put(n, n in (2, 3, 5, 7))
+        if n == 5:
+            results.get(1)
+    (count,) = results.db.execute("SELECT COUNT(*) FROM results").fetchone()
+    assert count == 5
+    found = results.get_many(range(10))
+    assert sorted(found) == [1, 6, 7, 8, 9]
+    results.close()
+
+
+def test_get_many(path):
+    results = ResultCache(path, memory_entries=10)
+    numbers = list(range(3 * SQL_BATCH))
+    results.put_many([(n, n % 2 == 1, None) for n in numbers])
+    assert len(results.memory) == 10
+    found = results.get_many(numbers + [10 ** 30, 5, 5])
+    assert found == {n: n % 2 == 1 for n in numbers}
+    assert (results.hits, results.misses) == (len(numbers) + 2, 1)
+    assert all(type(n) is int for n in found)
+    results.close()
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from expression import MAX_DEPTH, MAX_FACTORIAL, MAX_RESULT_BITS, ExpressionError, parse_number
+
+
+@pytest.mark.parametrize("text, expected", (
+    ("12345678901234567890", 12345678901234567890),
+    ("  97 ", 97),
+    ("2^127-1", 2 ** 127 - 1),
+    ("2**127 - 1", 2 ** 127 - 1),
+    ("3*2^5+1", 97),
+    ("3 × 2^5 · 1", 96),
+    ("2^3^2", 512),
+    ("-2^2", -4),
+    ("(-2)^3", -8),
+    ("2^-(-3)", 8),
+    ("10-3-2", 5),
+    ("(1+2)*(3+4)", 21),
+    ("10!+1", 3628801),
+    ("3!!", 720),
+    ("M127", 2 ** 127 - 1),
+    ("M_7", 127),
+    ("M(3+4)", 127),
+    ("M2^3", 27),
+    ("F5", 2 ** 32 + 1),
+    ("F(2)", 17),
+    # Persian digits are decimal digits too.
+    ("۱۲۳+1", 124),
+))
+def test_values(text, expected):
+    assert parse_number(text) == expected
+
+
+@pytest.mark.parametrize("text", (
+    "", "2+", "(2+3", "2+3)", "2 3", "2^-1", "(-3)!", "x", "M", "1e9", "0x10", "2²",
+))
+def test_malformed_input(text):
+    with pytest.raises(ExpressionError):
+        parse_number(text)
+
+
+def test_result_bits_are_limited_before_computing():
+    assert parse_number(f"2^{MAX_RESULT_BITS - 1}").bit_length() == MAX_RESULT_BITS
+    for text in (
+        f"2^{MAX_RESULT_BITS}", f"3^{MAX_RESULT_BITS}", "10^(10^9)", f"F{MAX_RESULT_BITS.bit_length()}",
+        f"(2^4096)^4096", f"2^{MAX_RESULT_BITS // 2} * 2^{MAX_RESULT_BITS // 2}", f"{MAX_FACTORIAL + 1}!",
+    ):
+        start = time.perf_counter()
+        with pytest.raises(ExpressionError):
+            parse_number(text)
+        assert time.perf_counter() - start < 1, text
+
+
+@pytest.mark.parametrize("text", (
+    "-" * 5000 + "1", "(" * 5000 + "1" + ")" * 5000, "2^" * 5000 + "1", "M(" * 5000 + "1" + ")" * 5000,
+), ids=("signs", "parentheses", "exponents", "prefixes"))
+def test_nesting_is_limited(text):
+    with pytest.raises(ExpressionError, match="nested"):
+        parse_number(text)
+
+
+def test_nesting_below_the_limit():
+    depth = MAX_DEPTH - 1
+    assert parse_number("(" * depth + "7" + ")" * depth) == 7
+    assert parse_number("-" * depth + "7") == (-7 if depth % 2 else 7)
@@ -0,0 +1,76 @@
+import math
+import random
+
+import pytest
+
+import siqs
+from factorization import divisors, factorize, perfect_power
+from primality import is_prime
+
+
+def random_prime(rng, digits):
+    while True:
+        n = rng.randrange(10 ** (digits - 1), 10 ** digits) | 1
+        if is_prime(n):
+            return n
+
+
+def product(factors):
+    return math.prod(p ** e for p, e in factors.items())
+
+
+def test_small_numbers_round_trip(backend):
+    for n in range(2, 5000):
+        factors = factorize(n)
+        assert product(factors) == n
+        assert all(is_prime(p) for p in factors)
+
+
+def test_random_composites_round_trip(backend):
+    rng = random.Random(5)
+    for digits in (6, 9, 12):
+        for _ in range(5):
+            expected = {}
+            for _ in range(3):
+                p = random_prime(rng, digits)
+                expected[p] = expected.get(p, 0) + 1
+            assert factorize(product(expected)) == dict(sorted(expected.items()))
+
+
+def test_prime_powers_and_perfect_powers(backend):
+    p = 1000000007
+    assert factorize(p ** 5) == {p: 5}
+    assert perfect_power(p ** 6) == (p, 6)
+    assert factorize(2 ** 20 * 3 ** 7 * p ** 2) == {2: 20, 3: 7, p: 2}
+
+
+def test_divisors_are_complete():
+    n = 2 ** 4 * 3 ** 2 * 5 * 7
+    assert divisors(n) == [d for d in range(1, n + 1) if n % d == 0]
+
+
+def test_siqs_splits_balanced_semiprimes():
+    if not siqs.available():
+        pytest.skip("SIQS needs NumPy")
+    rng = random.Random(13)
+    for digits in (15, 17):
+        p, q = random_prime(rng, digits), random_prime(rng, digits + 1)
+        d = siqs.siqs(p * q, workers=1)
+        assert d in (p, q)
+
+
+def test_siqs_range_round_trips(monkeypatch):
+    # 35 digits, out of Pollard-Rho's reach, so factorize goes on to ECM and SIQS.
+    if not siqs.available():
+        pytest.skip("SIQS needs NumPy")
+    calls = []
+    run = siqs.siqs
+
+    def spy(n, **kwargs):
+        calls.append(n)
+        return run(n, **kwargs)
+
+    monkeypatch.setattr(siqs, "siqs", spy)
+    p, q = 1000000000000000003, 10000000000000061
+    assert factorize(p * q) == {q: 1, p: 1}
+    assert calls == [p * q]
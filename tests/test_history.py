@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+import pytest
+
+from history import LEGACY_HISTORY_FILE, PRUNE_EVERY, HistoryManager, HistoryWriter
+
+
+@pytest.fixture
+def path(tmp_path, monkeypatch):
+    # The legacy JSON file is looked up in the working directory.
+    monkeypatch.chdir(tmp_path)
+    return str(tmp_path / "history.db")
+
+
+def test_entries_come_back_newest_first(path):
+    history = HistoryManager(path)
+    history.add_entry(91, False, [7, 13], "en")
+    history.add_entry(2 ** 127 - 1, True, [], "fa")
+    entries = history.get_history()
+    assert [(e["number"], e["is_prime"], e["divisors"], e["language"]) for e in entries] == [
+        (2 ** 127 - 1, True, [], "fa"), (91, False, [7, 13], "en"),
+    ]
+    assert datetime.fromisoformat(entries[0]["timestamp"])
+    history.close()
+
+    history = HistoryManager(path)
+    assert [e["number"] for e in history.get_history(limit=1)] == [2 ** 127 - 1]
+    history.clear_history()
+    assert history.get_history() == []
+    history.close()
+
+
+def test_filters(path):
+    history = HistoryManager(path)
+    numbers = [9, 10, 97, 99, 100, 1000, 2 ** 64 + 13, 2 ** 100]
+    history.add_entries([
+        (f"2026-01-{day:02d}T12:00:00", n, n in (97, 2 ** 64 + 13), [], "en")
+        for day, n in enumerate(numbers, 1)
+    ])
+
+    def numbers_for(**filters):
+        return sorted(e["number"] for e in history.query(**filters))
+
+    # Numeric order, although the numbers are stored as text.
+    assert numbers_for(min_number=10, max_number=100) == [10, 97, 99, 100]
+    assert numbers_for(min_number=99) == [99, 100, 1000, 2 ** 64 + 13, 2 ** 100]
+    assert numbers_for(max_number=2 ** 64) == [9, 10, 97, 99, 100, 1000]
+    assert numbers_for(primes_only=True) == [97, 2 ** 64 + 13]
+    assert numbers_for(since="2026-01-03", until=datetime(2026, 1, 5, 12)) == [97, 99, 100]
+    assert [e["number"] for e in history.query(min_number=100, limit=2)] == [2 ** 100, 2 ** 64 + 13]
+    history.close()
+
+
+def test_old_entries_are_pruned(path):
+    history = HistoryManager(path, limit=10)
+    history.add_entries([("2026-01-01T00:00:00", n, False, [], None) for n in range(PRUNE_EVERY)])
+    assert [e["number"] for e in history.get_history()] == list(range(PRUNE_EVERY - 1, PRUNE_EVERY - 11, -1))
+    history.close()
+
+
+def test_legacy_json_is_imported_once(path):
+    legacy = [
+        {"timestamp": "2026-01-02T00:00:00", "number": 97, "is_prime": True, "language": "zh"},
+        {"timestamp": "2026-01-01T00:00:00", "number": 91, "is_prime": False, "divisors": [7, 13]},
+    ]
+    with open(LEGACY_HISTORY_FILE, "w", encoding="utf-8") as f:
+        json.dump(legacy, f)
+    history = HistoryManager(path)
+    assert [(e["number"], e["divisors"], e["language"]) for e in history.get_history()] == [
+        (97, [], "zh"), (91, [7, 13], None),
+    ]
+    history.close()
+    assert not os.path.exists(LEGACY_HISTORY_FILE)
+    assert os.path.exists(LEGACY_HISTORY_FILE + ".migrated")
+    history = HistoryManager(path)
+    assert len(history.get_history()) == 2
+    history.close()
+
+
+def test_writer_persists_in_order(path):
+    threads = []
+    writer = HistoryWriter(path, on_commit=lambda: threads.append(threading.current_thread().name))
+    for n in range(2500):
+        writer.add_entry(n, False, [], "en")
+    writer.flush()
+    assert threads and set(threads) == {"history-writer"}
+    history = HistoryManager(path)
+    assert [e["number"] for e in history.get_history(limit=None)] == list(range(2499, -1, -1))
+    history.close()
+    writer.close()
+    assert not writer.thread.is_alive()
+
+
+def test_writer_clears_only_earlier_entries(path):
+    writer = HistoryWriter(path)
+    writer.add_entry(91, False, [7, 13], "en")
+    writer.clear_history()
+    writer.add_entry(97, True, [], "en")
+    writer.close()
+    history = HistoryManager(path)
+    assert [e["number"] for e in history.get_history()] == [97]
+    history.close()
+
+
+def test_writer_survives_database_errors(path):
+    writer = HistoryWriter(path)
+    writer.add_entry(97, True, [], "en")
+    writer.flush()
+    # A value SQLite cannot store fails its batch; later batches still land.
+    writer.add_entry(91, False, [7, 13], object())
+    writer.flush()
+    writer.add_entry(89, True, [], "en")
+    writer.close()
+    history = HistoryManager(path)
+    assert [e["number"] for e in history.get_history()] == [89, 97]
+    history.close()
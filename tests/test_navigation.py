@@ -0,0 +1,81 @@
+import pytest
+
+from navigation import (
+    NTH_PRIME_MAX, SieveWindow, next_prime, nth_prime, prev_prime, prime_gap, riemann_r, twin_primes,
+)
+from primality import is_prime, simple_sieve
+
+PRIMES = simple_sieve(200000)
+
+
+def test_neighbours_match_the_sieve():
+    for p, q in zip(PRIMES, PRIMES[1:5000]):
+        assert next_prime(p) == q
+        assert prev_prime(q) == p
+        assert next_prime((p + q) // 2) == q
+        assert prev_prime((p + q) // 2 + 1) == p
+    assert prev_prime(2) is None
+    assert prev_prime(3) == 2
+    assert next_prime(0) == 2
+
+
+@pytest.mark.parametrize("n, expected_prev, expected_next", (
+    # The first prime above the sieve limit; its predecessor lies below it.
+    (10 ** 14 + 31, 10 ** 14 - 27, 10 ** 14 + 67),
+    (10 ** 15 + 37, 10 ** 15 - 11, 10 ** 15 + 91),
+))
+def test_neighbours_above_the_sieve_limit(n, expected_prev, expected_next):
+    assert is_prime(n)
+    assert prev_prime(n) == expected_prev
+    assert next_prime(n) == expected_next
+    assert prev_prime(next_prime(n)) == n
+
+
+def test_previous_prime_of_a_prime_above_2_80():
+    p = next_prime(2 ** 80)
+    q = prev_prime(p)
+    assert q < p and is_prime(q)
+    assert not any(is_prime(n) for n in range(q + 1, p))
+
+
+def test_window_walks_across_its_limit():
+    # A window with a low limit sieves exactly below it and presieves above.
+    window = SieveWindow(limit=10 ** 6)
+    low, high = 10 ** 6 - 5000, 10 ** 6 + 5000
+    expected = [n for n in range(low, high + 1) if is_prime(n)]
+    walked = []
+    for p in window.primes_from(low):
+        if p > high:
+            break
+        walked.append(p)
+    assert walked == expected
+    below = []
+    for p in window.primes_below(high + 1):
+        if p < low:
+            break
+        below.append(p)
+    assert below == expected[::-1]
+
+
+def test_nth_prime():
+    for k in (1, 2, 168, 169, 1000, len(PRIMES)):
+        assert nth_prime(k) == PRIMES[k - 1]
+    assert nth_prime(10 ** 6) == 15485863
+    assert nth_prime(10 ** 7, window=SieveWindow(limit=10 ** 6)) == 179424673
+    with pytest.raises(ValueError):
+        nth_prime(0)
+    with pytest.raises(ValueError):
+        nth_prime(NTH_PRIME_MAX + 1)
+
+
+def test_riemann_r_is_close_to_pi():
+    assert abs(riemann_r(10 ** 6) - 78498) < 30
+    assert abs(riemann_r(10 ** 9) - 50847534) < 100
+
+
+def test_twins_and_gaps():
+    assert twin_primes(1000) == (1019, 1021)
+    assert twin_primes(10 ** 6) == (1000037, 1000039)
+    # The first gaps of at least 72 and 100 (maximal gaps, OEIS A002386).
+    assert prime_gap(0, 72) == (31397, 31469)
+    assert prime_gap(0, 100) == (370261, 370373)
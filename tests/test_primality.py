@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from primality import SMALL_PRIMES, bpsw, install_index, is_prime, simple_sieve
+from prime_index import build_index, PrimeIndex
+
+# Composites that pass Miller-Rabin for every base in the listed prefix of
+# the primes, and Carmichael numbers, which fool Fermat tests.
+STRONG_PSEUDOPRIMES = (
+    2047,                        # base 2
+    1373653,                     # bases 2, 3
+    25326001,                    # bases 2, 3, 5
+    3215031751,                  # bases 2, 3, 5, 7
+    2152302898747,               # bases 2 .. 11
+    3474749660383,               # bases 2 .. 13
+    341550071728321,             # bases 2 .. 17
+    3825123056546413051,         # bases 2 .. 23
+    318665857834031151167461,    # bases 2 .. 37
+    3317044064679887385961981,   # bases 2 .. 37
+)
+CARMICHAEL = (561, 1105, 1729, 41041, 825265, 321197185, 5394826801, 232250619601)
+
+
+def trial_division(n):
+    if n < 2:
+        return False
+    d = 2
+    while d * d <= n:
+        if n % d == 0:
+            return False
+        d += 1
+    return True
+
+
+def test_small_numbers_match_the_sieve(backend):
+    primes = set(simple_sieve(20000))
+    assert [n for n in range(20001) if is_prime(n)] == sorted(primes)
+
+
+def test_random_numbers_match_trial_division(backend):
+    rng = random.Random(7)
+    for bits in (20, 24, 28, 32, 36):
+        for _ in range(200):
+            n = rng.getrandbits(bits) | 1
+            assert is_prime(n) == trial_division(n), n
+
+
+def test_strong_pseudoprimes_are_composite(backend):
+    for n in STRONG_PSEUDOPRIMES + CARMICHAEL:
+        assert not is_prime(n), n
+
+
+def test_products_of_large_primes_are_composite(backend):
+    p, q = 1000000000000000003, 10000000000000061
+    assert is_prime(p) and is_prime(q)
+    assert not is_prime(p * q)
+    assert not is_prime(p * p)
+    assert is_prime(2 ** 89 - 1)
+    assert not is_prime(2 ** 89 + 1)
+
+
+def test_bpsw_agrees_with_gmpy2():
+    gmpy2 = pytest.importorskip("gmpy2")
+    rng = random.Random(11)
+    for _ in range(300):
+        n = rng.getrandbits(90) | 1
+        assert bpsw(n) == bool(gmpy2.is_strong_bpsw_prp(n)), n
+
+
+def test_index_answers_like_the_tests(tmp_path):
+    path = str(tmp_path / "index.bin")
+    build_index(path, 100000)
+    index = PrimeIndex(path)
+    install_index(index)
+    try:
+        rng = random.Random(3)
+        for n in [rng.randrange(SMALL_PRIMES[-1], 100001) for _ in range(2000)] + [99991, 100000, 100001]:
+            assert is_prime(n) == trial_division(n), n
+    finally:
+        install_index(None)
+        index.close()
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from prime_count import cross_check, lmo_pi, prime_pi
+from sieve import count_primes
+
+pytest.importorskip("numpy")
+
+# pi(10^k), OEIS A006880.
+KNOWN_PI = {
+    1: 4,
+    2: 25,
+    3: 168,
+    4: 1229,
+    5: 9592,
+    6: 78498,
+    7: 664579,
+    8: 5761455,
+    9: 50847534,
+    10: 455052511,
+    11: 4118054813,
+    12: 37607912018,
+}
+
+
+@pytest.mark.parametrize("k", sorted(KNOWN_PI))
+def test_known_values(k):
+    assert prime_pi(10 ** k) == KNOWN_PI[k]
+    if k >= 3:
+        assert lmo_pi(10 ** k) == KNOWN_PI[k]
+
+
+def test_lmo_matches_the_sieve():
+    rng = random.Random(17)
+    for x in [rng.randrange(1000, 3 * 10 ** 6) for _ in range(40)] + [1000, 1024, 65536, 2 ** 21 - 1]:
+        assert lmo_pi(x) == count_primes(0, x), x
+
+
+def test_cross_check():
+    assert cross_check(123456789) == count_primes(0, 123456789)
+
+
+def test_limits():
+    with pytest.raises(ValueError):
+        lmo_pi(2 ** 63)
@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+
+from primality import is_prime
+from progress import Cancelled
+from scheduler import BACKGROUND, FINISHED_JOBS_KEPT, INTERACTIVE, TABLE_HEADER, Job, JobScheduler
+
+
+def submit(scheduler, name, priority=BACKGROUND, total=None):
+    return scheduler.submit(Job(name, priority, total))
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_admission():
+    scheduler = JobScheduler(workers=1, max_background=2)
+    export, batch, scan = (submit(scheduler, name) for name in ("export", "batch", "scan"))
+    check = submit(scheduler, "check", INTERACTIVE)
+    assert scheduler.admit() == [check, export, batch]
+    assert scan.state == "queued"
+    # Interactive jobs never wait for a background slot.
+    nav = submit(scheduler, "nav", INTERACTIVE)
+    assert scheduler.admit() == [nav]
+
+    scheduler.finish(export)
+    assert (export.state, export.fraction) == ("done", 1.0)
+    assert scheduler.admit() == [scan]
+    scheduler.finish(batch, "failed")
+    scheduler.finish(batch)
+    assert batch.state == "failed"
+    assert scheduler.active() == [scan, check, nav]
+
+
+def test_cancel():
+    scheduler = JobScheduler(workers=1, max_background=1)
+    running, queued = submit(scheduler, "running"), submit(scheduler, "queued")
+    scheduler.admit()
+    scheduler.cancel(queued)
+    scheduler.cancel(running)
+    assert queued.state == "cancelled"
+    # A running job stops at its next progress update; its runner finishes it.
+    assert running.state == "running"
+    with pytest.raises(Cancelled):
+        running.update(0.5)
+    scheduler.finish(running, "cancelled")
+    assert scheduler.admit() == []
+    assert scheduler.active() == []
+
+
+def test_finished_jobs_are_forgotten():
+    scheduler = JobScheduler(workers=1, max_background=100)
+    jobs = [submit(scheduler, f"job {i}") for i in range(FINISHED_JOBS_KEPT + 5)]
+    scheduler.admit()
+    for job in jobs:
+        scheduler.finish(job)
+    assert scheduler.snapshot() == jobs[:-FINISHED_JOBS_KEPT - 1:-1]
+
+
+def test_chunk_slots_go_to_priority_then_fewest_in_flight():
+    # One worker has two slots, both held by "busy", which asks for a third;
+    # "idle" and then an interactive check queue behind it.
+    scheduler = JobScheduler(workers=1)
+    busy, idle, check = submit(scheduler, "busy"), submit(scheduler, "idle"), submit(scheduler, "check", INTERACTIVE)
+    scheduler.acquire(busy)
+    scheduler.acquire(busy)
+    order = []
+
+    def take(job):
+        scheduler.acquire(job)
+        order.append(job.name)
+
+    threads = []
+    for job in (busy, idle, check):
+        threads.append(threading.Thread(target=take, args=(job,)))
+        threads[-1].start()
+        wait_for(lambda: len(scheduler.waiting) == len(threads))
+    scheduler.release(busy)
+    wait_for(lambda: order == ["check"])
+    # "busy" still has a chunk in flight, so "idle" goes first.
+    scheduler.release(check)
+    wait_for(lambda: order == ["check", "idle"])
+    scheduler.release(idle)
+    for thread in threads:
+        thread.join(5)
+    assert order == ["check", "idle", "busy"]
+    assert scheduler.inflight == {busy.id: 2}
+
+
+def test_waiting_for_a_slot_can_be_cancelled():
+    scheduler = JobScheduler(workers=1)
+    busy, waiting = submit(scheduler, "busy"), submit(scheduler, "waiting")
+    scheduler.acquire(busy)
+    scheduler.acquire(busy)
+    raised = []
+
+    def take():
+        try:
+            scheduler.acquire(waiting)
+        except Cancelled:
+            raised.append(True)
+
+    thread = threading.Thread(target=take)
+    thread.start()
+    wait_for(lambda: scheduler.waiting == [waiting])
+    waiting.cancel()
+    thread.join(5)
+    assert raised == [True]
+    assert scheduler.waiting == []
+    assert scheduler.inflight == {busy.id: 2}
+
+
+def test_executor_runs_chunks_on_the_shared_pool():
+    scheduler = JobScheduler(workers=1)
+    job = submit(scheduler, "primes", total=100)
+    scheduler.admit()
+    executor = scheduler.executor(job)
+    try:
+        futures = [executor.submit(is_prime, n) for n in (97, 91, 2 ** 61 - 1, 2 ** 61 + 1)]
+        assert [future.result(60) for future in futures] == [True, False, True, False]
+        wait_for(lambda: not scheduler.inflight)
+        job.update(0.5)
+        assert job.rate() > 0
+        assert job.eta() >= 0
+        table = scheduler.format_table().splitlines()
+        assert table[0] == TABLE_HEADER
+        assert "primes" in table[1] and "background" in table[1] and "50.0%" in table[1]
+    finally:
+        scheduler.shutdown()
+    assert job.state == "running" and job.cancelled
@@ -0,0 +1,159 @@
+import asyncio
+import json
+
+import pytest
+
+from prime_core import is_prime
+from prime_server import CHECK_DIGIT_LIMIT, FACTOR_DIGIT_LIMIT, MAX_NUMBERS, RANGE_LIMIT, PrimeService
+
+
+def request(target, body=None, method=None, headers=()):
+    method = method or ("GET" if body is None else "POST")
+    data = b"" if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode())
+    head = [f"{method} {target} HTTP/1.1", "Host: test", f"Content-Length: {len(data)}", *headers]
+    return ("\r\n".join(head) + "\r\n\r\n").encode() + data
+
+
+async def read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode()
+        if line in ("\r\n", ""):
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers["content-length"]))
+    if headers["content-type"] == "application/json":
+        body = json.loads(body)
+    return status, headers, body
+
+
+def serve(*connections, **options):
+    # Starts a server on a free port and sends each connection's requests in
+    # order, the connections at the same time; returns their responses and
+    # the service counters.
+    async def run():
+        service = PrimeService(workers=1, **options)
+        # As in serve(): the engine process must not inherit the sockets.
+        await service.run(is_prime, 2)
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        async def talk(requests):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            for data in requests:
+                writer.write(data)
+            responses = [await read_response(reader) for _ in requests]
+            # Wait for the server to see the end of the connection.
+            writer.write_eof()
+            await reader.read()
+            writer.close()
+            return responses
+
+        try:
+            results = await asyncio.gather(*map(talk, connections))
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.close()
+        return results, service.counters
+
+    return asyncio.run(run())
+
+
+def ask(*requests, **options):
+    (responses,), _ = serve(requests, **options)
+    return responses
+
+
+def test_endpoints():
+    responses = ask(
+        request("/check?n=1000000007"),
+        request("/check?numbers=97,91,561"),
+        request("/check", {"numbers": [2 ** 89 - 1, "1000000007", 0]}),
+        request("/factor", {"number": 600851475143}),
+        request("/range?low=1&high=30"),
+        request("/range?low=0&high=1000&count=1"),
+        request("/stats"),
+        request("/metrics"),
+    )
+    assert all(status == 200 for status, _, _ in responses)
+    bodies = [body for _, _, body in responses]
+    assert bodies[0]["number"] == 1000000007 and bodies[0]["is_prime"] is True
+    assert [r["is_prime"] for r in bodies[1]["results"]] == [True, False, False]
+    assert [(r["number"], r["is_prime"]) for r in bodies[2]["results"]] == [
+        (2 ** 89 - 1, True), (1000000007, True), (0, False),
+    ]
+    assert bodies[3]["factors"] == [[71, 1], [839, 1], [1471, 1], [6857, 1]]
+    assert bodies[4]["primes"] == [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+    assert bodies[5] == {"low": 0, "high": 1000, "count": 168}
+    assert bodies[6]["counters"]["requests"] == 7
+    assert {"check", "factor", "range", "engine_batch"} == set(bodies[6]["endpoints"])
+    assert b"check" in bodies[7]
+
+
+@pytest.mark.parametrize("target, body, status", (
+    ("/check?n=abc", None, 400),
+    ("/check?n=-7", None, 400),
+    ("/check?n=²", None, 400),
+    ("/check", {"numbers": {"n": 97}}, 400),
+    ("/check", b"{not json", 400),
+    ("/check", [97], 400),
+    ("/check", {"numbers": list(range(MAX_NUMBERS + 1))}, 413),
+    ("/factor?n=1" + "0" * FACTOR_DIGIT_LIMIT, None, 400),
+    ("/range?low=10&high=5", None, 400),
+    (f"/range?low=0&high={RANGE_LIMIT + 1}&count=1", None, 400),
+    ("/range?low=0&high=20000000", None, 413),
+    ("/nowhere", None, 404),
+))
+def test_errors(target, body, status):
+    [(got, _, payload)] = ask(request(target, body))
+    assert got == status
+    assert "error" in payload
+
+
+def test_digit_limits():
+    longest = "2" + "0" * (CHECK_DIGIT_LIMIT - 1)
+    too_long = longest + "0"
+    responses = ask(
+        request(f"/check?n={longest}"),
+        request(f"/check?n={too_long}"),
+        request(f"/check?numbers=97,{too_long}"),
+        # JSON integers are refused as well, before they are converted.
+        request("/check", f'{{"number": {too_long}}}'.encode()),
+        request("/check", f'{{"numbers": [{too_long}]}}'.encode()),
+        # Leading zeros do not count.
+        request(f"/check?n={'0' * CHECK_DIGIT_LIMIT}97"),
+        request(f"/range?low=0&high=1{'0' * 20}&count=1"),
+    )
+    assert [status for status, _, _ in responses] == [200, 400, 400, 400, 400, 200, 400]
+    assert responses[0][2]["is_prime"] is False
+    assert "digits" in responses[1][2]["error"]
+
+
+def test_keep_alive_and_close():
+    responses = ask(
+        request("/check?n=7"),
+        request("/check?n=8", method="PUT"),
+        request("/check?n=9", headers=["Connection: close"]),
+    )
+    assert [status for status, _, _ in responses] == [200, 405, 200]
+    assert [headers["connection"] for _, headers, _ in responses] == ["keep-alive", "keep-alive", "close"]
+
+
+def test_overload_is_refused():
+    responses = ask(request("/check?n=97"), request("/stats"), max_pending=0)
+    status, headers, _ = responses[0]
+    assert status == 503 and headers["retry-after"] == "1"
+    assert responses[1][0] == 200
+    assert responses[1][2]["counters"]["rejected"] == 1
+
+
+def test_small_checks_are_batched_and_shared():
+    numbers = [97, 91, 561, 7919, 97, 97]
+    results, counters = serve(*[[request(f"/check?n={n}")] for n in numbers], batch_window=0.5)
+    assert [responses[0][2]["is_prime"] for responses in results] == [True, False, False, True, True, True]
+    assert counters["batches"] == 1
+    assert counters["batched"] == 4
+    assert counters["coalesced"] == 2
@@ -0,0 +1,54 @@
+import pytest
+
+from primality import bpsw, is_prime, special_form, llr_test, lucas_lehmer, proth_test
+
+# Exponents p > 64 with 2^p - 1 prime, and m > 64 with 3 * 2^m + 1 and
+# 3 * 2^m - 1 prime (OEIS A000043, A002253, A002235).
+MERSENNE_EXPONENTS = (89, 107, 127, 521, 607, 1279)
+PROTH_3_EXPONENTS = (66, 189, 201, 209, 276, 353, 408, 438, 534)
+RIESEL_3_EXPONENTS = (64, 76, 94, 103, 143, 206, 216, 306, 324, 391, 458, 470)
+
+
+def test_forms_are_recognised():
+    assert special_form(2 ** 127 - 1) == ("lucas-lehmer", 1, 127)
+    assert special_form(2 ** 128 + 1) == ("pepin", 1, 128)
+    assert special_form(3 * 2 ** 189 + 1) == ("proth", 3, 189)
+    assert special_form(3 * 2 ** 76 - 1) == ("llr", 3, 76)
+    assert special_form(2 ** 61 - 1) is None
+    assert special_form(10 ** 30 + 1) is None
+
+
+def test_mersenne_numbers(backend):
+    for p in range(65, 700):
+        n = 2 ** p - 1
+        assert lucas_lehmer(n, 1, p) == (p in MERSENNE_EXPONENTS), p
+    assert is_prime(2 ** 1279 - 1)
+
+
+def test_fermat_numbers_above_64_bits_are_composite(backend):
+    for i in (7, 8, 9, 10):
+        n = 2 ** 2 ** i + 1
+        assert proth_test(n, 1, 2 ** i) is False
+        assert not is_prime(n)
+
+
+def test_proth_numbers(backend):
+    for m in range(64, 540):
+        n = 3 * 2 ** m + 1
+        assert proth_test(n, 3, m) == (m in PROTH_3_EXPONENTS), m
+
+
+def test_riesel_numbers(backend):
+    for m in range(64, 480):
+        n = 3 * 2 ** m - 1
+        assert llr_test(n, 3, m) == (m in RIESEL_3_EXPONENTS), m
+
+
+@pytest.mark.parametrize("sign", (1, -1))
+def test_special_forms_agree_with_bpsw(sign, backend):
+    for k in range(1, 200, 2):
+        for m in (65, 71, 80, 97, 128):
+            n = k * 2 ** m + sign
+            if n.bit_length() <= 64 or n < 2:
+                continue
+            assert is_prime(n) == bpsw(n), (k, m, sign)
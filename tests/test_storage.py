@@ -0,0 +1,107 @@
+import pytest
+
+from parallel_sieve import ParallelSieve
+from primality import simple_sieve
+from prime_export import FORMATS, InvalidExport, PrimeExport, export_primes
+from prime_export import HEADER as EXPORT_HEADER
+from prime_index import HEADER, InvalidIndex, PrimeIndex, build_index, open_index
+from sieve import SegmentedSieve, iter_primes
+
+BOUND = 200000
+
+
+def corrupt(path, offset):
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        byte = f.read(1)
+        f.seek(offset)
+        f.write(bytes([byte[0] ^ 1]))
+
+
+def truncate(path, size):
+    with open(path, "r+b") as f:
+        f.truncate(size)
+
+
+@pytest.mark.parametrize("wheel", (False, True))
+def test_index_round_trip(tmp_path, wheel):
+    path = str(tmp_path / "index.bin")
+    build_index(path, BOUND, wheel)
+    index = PrimeIndex(path)
+    try:
+        primes = simple_sieve(BOUND)
+        assert index.primes(BOUND) == primes
+        assert index.primes(1000) == simple_sieve(1000)
+        found = set(primes)
+        assert all((n in index) == (n in found) for n in range(BOUND + 2))
+    finally:
+        index.close()
+
+
+@pytest.mark.parametrize("damage", ("payload", "header", "truncate", "empty"))
+def test_index_rejects_damaged_files(tmp_path, damage):
+    path = str(tmp_path / "index.bin")
+    build_index(path, BOUND)
+    if damage == "payload":
+        corrupt(path, HEADER.size + 1000)
+    elif damage == "header":
+        corrupt(path, 0)
+    elif damage == "truncate":
+        truncate(path, HEADER.size + 10)
+    else:
+        truncate(path, 0)
+    with pytest.raises(InvalidIndex):
+        PrimeIndex(path)
+    assert open_index(path, BOUND, rebuild=False) is None
+    index = open_index(path, BOUND)
+    try:
+        assert index.primes(100) == simple_sieve(100)
+    finally:
+        index.close()
+
+
+def test_stale_index_is_rebuilt(tmp_path):
+    path = str(tmp_path / "index.bin")
+    build_index(path, 1000)
+    index = open_index(path, BOUND)
+    try:
+        assert index.bound == BOUND
+    finally:
+        index.close()
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+@pytest.mark.parametrize("low, high", ((0, BOUND), (1, 2), (7, 7), (10 ** 9, 10 ** 9 + 50000), (24, 28)))
+def test_export_round_trip(tmp_path, fmt, low, high):
+    path = str(tmp_path / "primes.out")
+    expected = list(iter_primes(low, high))
+    assert export_primes(path, low, high, fmt) == len(expected)
+    export = PrimeExport(path)
+    try:
+        assert list(export) == expected
+        if fmt != "text":
+            assert (export.low, export.high, export.count) == (low, high, len(expected))
+    finally:
+        export.close()
+
+
+@pytest.mark.parametrize("fmt", ("varint", "wheel30"))
+@pytest.mark.parametrize("damage", ("payload", "truncate"))
+def test_export_rejects_damaged_files(tmp_path, fmt, damage):
+    path = str(tmp_path / "primes.bin")
+    export_primes(path, 0, BOUND, fmt)
+    if damage == "payload":
+        corrupt(path, EXPORT_HEADER.size + 100)
+    else:
+        truncate(path, 200)
+    with pytest.raises(InvalidExport):
+        PrimeExport(path)
+
+
+def test_parallel_sieve_matches_the_serial_sieve():
+    low, high = 10 ** 9, 10 ** 9 + 400000
+    parallel = ParallelSieve(low, high, workers=2, segment_size=4096, segments_per_task=2)
+    assert parallel.is_parallel()
+    serial = SegmentedSieve(low, high, 4096)
+    assert [(start, bytes(flags)) for start, flags in parallel.segments()] == [(start, bytes(flags)) for start, flags in serial.segments()]
+    assert ParallelSieve(low, high, workers=2, segment_size=4096, segments_per_task=2).count() == serial.count()
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+import vectorized
+from primality import is_prime
+from vectorized import SIZE_CLASSES, VECTOR_MIN_SIZE, filter_primes, is_prime_mask
+
+np = pytest.importorskip("numpy")
+
+# Strong pseudoprimes to every base below them in the list; each one is the
+# bound of an entry of MR_BASE_TABLE or just under it.
+PSEUDOPRIMES = (
+    2047, 1373653, 25326001, 3215031751, 2152302898747, 3474749660383, 341550071728321,
+    3825123056546413051,
+)
+CARMICHAEL = (561, 1105, 1729, 41041, 825265, 321197185, 5394826801, 232250619601, 9746347772161)
+
+
+@pytest.fixture(params=["gmpy2", "python"])
+def survivors(request, monkeypatch):
+    # Without gmpy2 the 40 and 48 bit size classes run the limb loop too.
+    if request.param == "gmpy2":
+        if vectorized.gmpy2 is None:
+            pytest.skip("gmpy2 is not installed")
+    else:
+        monkeypatch.setattr(vectorized, "gmpy2", None)
+    return request.param
+
+
+def check(values):
+    mask = is_prime_mask(values)
+    assert isinstance(mask, np.ndarray)
+    assert mask.tolist() == [is_prime(int(v)) for v in values]
+
+
+@pytest.mark.parametrize("bits", SIZE_CLASSES + (56, 64))
+def test_random_values(survivors, bits):
+    rng = random.Random(bits)
+    check([rng.getrandbits(bits) | 1 for _ in range(4 * VECTOR_MIN_SIZE)])
+
+
+@pytest.mark.parametrize("n", PSEUDOPRIMES + CARMICHAEL)
+def test_pseudoprimes(survivors, n):
+    # Padded with the numbers just below n and with copies of n, so the batch
+    # is vectorized and its largest value, which picks the Miller-Rabin
+    # bases, is n.
+    check(list(range(max(0, n - VECTOR_MIN_SIZE), n)) + [n] * VECTOR_MIN_SIZE)
+
+
+def test_small_values_and_edges(survivors):
+    values = list(range(3 * VECTOR_MIN_SIZE))
+    values += [p * p for p in (997, 65521, 4294967291)]
+    values += [(1 << 64) - 59, (1 << 64) - 1, (1 << 48) - 59, (1 << 32) - 5, (1 << 32) + 15]
+    check(values)
+    check(np.asarray(values, dtype=np.uint64))
+
+
+def test_small_and_oversized_inputs():
+    assert is_prime_mask([2, 4, 97]) == [True, False, True]
+    values = [2 ** 89 - 1, 2 ** 64 + 13] + list(range(VECTOR_MIN_SIZE))
+    assert is_prime_mask(values).tolist() == [is_prime(v) for v in values]
+    assert filter_primes(list(range(100, 2 * VECTOR_MIN_SIZE))) == [p for p in range(100, 2 * VECTOR_MIN_SIZE) if is_prime(p)]
@@ -0,0 +1,159 @@
+from primality import SMALL_PRIMES, SMALL_PRIME_LIMIT, gmpy2, is_prime
+
+# NumPy is imported on first use; it adds tens of milliseconds to startup.
+np = None
+_numpy_missing = False
+
+# Candidates below this bound that survive trial division are prime.
+TRIAL_BOUND = SMALL_PRIME_LIMIT * SMALL_PRIME_LIMIT
+
+# Smallest Miller-Rabin base sets that are exact below each bound
+# (Jaeschke; Sorenson & Webster).
+MR_BASE_TABLE = (
+    (3215031751, (2, 3, 5, 7)),
+    (3474749660383, (2, 3, 5, 7, 11, 13)),
+    (341550071728321, (2, 3, 5, 7, 11, 13, 17)),
+    (3825123056546413051, (2, 3, 5, 7, 11, 13, 17, 19, 23)),
+)
+MR_BASES_64 = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+# Moduli are grouped by bit length. Inside a group, a * b mod n is computed
+# limb by limb so every intermediate product fits in uint64: with n < 2**k the
+# limbs are (64 - k) bits wide. Past 48 bits the limb loop costs more than
+# Python's native big-int pow(), so larger survivors go to primality.is_prime.
+SIZE_CLASSES = (32, 40, 48)
+# With gmpy2, is_prime matches the limb loop at 40 bits and beats it at 48
+# (about 28 ms against 47 ms per 8192 values), so only 32 bits stay here.
+GMPY2_SIZE_CLASSES = (32,)
+
+# Below this many values the fixed per-call array overhead outweighs the gain.
+VECTOR_MIN_SIZE = 1024
+
+
+def is_prime_mask(values):
+    # Returns a boolean mask (a NumPy array when NumPy is available, a list
+    # otherwise) telling which of the given non-negative integers are prime.
+    if len(values) < VECTOR_MIN_SIZE or _load_numpy() is None:
+        return [is_prime(int(n)) for n in values]
+
+    if isinstance(values, np.ndarray) and values.dtype == np.uint64:
+        n = values
+    elif all(0 <= int(v) < (1 << 64) for v in values):
+        n = np.asarray([int(v) for v in values], dtype=np.uint64)
+    else:
+        return np.fromiter((is_prime(int(v)) for v in values), dtype=bool, count=len(values))
+
+    result = np.zeros(n.shape, dtype=bool)
+    small = n <= SMALL_PRIME_LIMIT
+    if small.any():
+        table = np.zeros(SMALL_PRIME_LIMIT + 1, dtype=bool)
+        table[SMALL_PRIMES] = True
+        result[small] = table[n[small].astype(np.int64)]
+
+    # Vectorised residue checks remove everything with a factor below 1000;
+    # the candidate array is compacted after every prime so it shrinks fast.
+    idx = np.flatnonzero(~small)
+    vals = n[idx]
+    for p in SMALL_PRIMES:
+        keep = vals % np.uint64(p) != 0
+        idx = idx[keep]
+        vals = vals[keep]
+        if not len(idx):
+            return result
+
+    done = vals < TRIAL_BOUND
+    result[idx[done]] = True
+    idx = idx[~done]
+    vals = vals[~done]
+
+    for k in SIZE_CLASSES if gmpy2 is None else GMPY2_SIZE_CLASSES:
+        group = vals < np.uint64(1 << k)
+        if group.any():
+            result[idx[group]] = _miller_rabin(vals[group], k)
+        idx = idx[~group]
+        vals = vals[~group]
+
+    # Survivors above the largest size class are finished in pure Python.
+    for i, v in zip(idx, vals):
+        result[i] = is_prime(int(v))
+    return result
+
+
+def _load_numpy():
+    global np, _numpy_missing
+    if np is None and not _numpy_missing:
+        try:
+            import numpy
+        except ImportError:
+            _numpy_missing = True
+        else:
+            np = numpy
+    return np
+
+
+def filter_primes(values):
+    mask = is_prime_mask(values)
+    return [v for v, keep in zip(values, mask) if keep]
+
+
+def _bases_for(limit):
+    for bound, bases in MR_BASE_TABLE:
+        if limit < bound:
+            return bases
+    return MR_BASES_64
+
+
+def _mulmod(a, b, n, k):
+    if k <= 32:
+        return a * b % n
+    width = 64 - k
+    limbs = -(-k // width)
+    mask = np.uint64((1 << width) - 1)
+    shift = np.uint64(width)
+    r = np.zeros_like(n)
+    for i in reversed(range(limbs)):
+        chunk = (b >> np.uint64(i * width)) & mask
+        r = (r << shift) % n
+        r = (r + a * chunk % n) % n
+    return r
+
+
+def _powmod(base, exp, n, k):
+    # base is a small Miller-Rabin base, so result * base never overflows.
+    result = np.ones_like(n)
+    base = np.uint64(base)
+    for i in reversed(range(int(exp.max()).bit_length())):
+        result = _mulmod(result, result, n, k)
+        bit = ((exp >> np.uint64(i)) & np.uint64(1)).astype(bool)
+        if bit.any():
+            result = np.where(bit, result * base % n, result)
+    return result
+
+
+def _miller_rabin(n, k):
+    one = np.uint64(1)
+    minus_one = n - one
+    d = minus_one.copy()
+    s = np.zeros(n.shape, dtype=np.int64)
+    while True:
+        even = (d & one) == 0
+        if not even.any():
+            break
+        d[even] >>= one
+        s[even] += 1
+
+    prime = np.ones(n.shape, dtype=bool)
+    for a in _bases_for(int(n.max())):
+        active = prime.copy()
+        x = _powmod(a, d, n, k)
+        passed = (x == one) | (x == minus_one)
+        for r in range(1, int(s.max())):
+            pending = active & ~passed & (r < s)
+            if not pending.any():
+                break
+            x = np.where(pending, _mulmod(x, x, n, k), x)
+            passed |= pending & (x == minus_one)
+        prime &= passed
+        if not prime.any():
+            break
+    return prime